@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .analytics import log_status_change
 from .models import User, Manuscript, Review, Volume, Issue, Article, Announcement
 
 class CustomUserAdmin(UserAdmin):
@@ -11,14 +15,132 @@ class CustomUserAdmin(UserAdmin):
     )
     list_display = UserAdmin.list_display + ('is_researcher', 'is_reviewer', 'is_editor', 'affiliation')
     list_filter = UserAdmin.list_filter + ('is_researcher', 'is_reviewer', 'is_editor')
+    show_full_result_count = False
 
 admin.site.register(User, CustomUserAdmin)
-admin.site.register(Manuscript)
-admin.site.register(Review)
-admin.site.register(Volume)
-admin.site.register(Issue)
-admin.site.register(Article)
-admin.site.register(Announcement)
+
+# The changelists below are built for large tables: related objects are
+# picked by autocomplete instead of a <select> of every row, each page is
+# one query (list_select_related covers every __str__ shown), and the
+# "N total" COUNT(*) is skipped. Searches only ever use an index (below).
+
+class IndexedSearchMixin:
+    """
+    Search that never scans the table: the term is compared for equality with
+    each of ``search_fields``, all unique or indexed columns. Integer columns
+    and foreign keys are only compared when the term is a number. A field on a
+    related model is resolved to ids first and matched on the indexed foreign
+    key, not through a join, so the OR of the lookups uses one index each.
+    Django's own =/^ prefixes compile to LIKE, which scans.
+
+    A field written ``^field`` instead matches titles starting with the term,
+    ignoring case, as a range on an index of LOWER(field).
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = Q()
+        for path in self.get_search_fields(request):
+            if path.startswith('^'):
+                field = path[1:]
+                prefix = term.lower()
+                queryset = queryset.alias(**{f'{field}_lower': Lower(field)})
+                query |= Q(**{f'{field}_lower__gte': prefix, f'{field}_lower__lt': prefix + '\U0010ffff'})
+                continue
+            fields = get_fields_from_path(self.model, path)
+            if fields[-1].get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField', 'ForeignKey',
+                                                  'OneToOneField', 'PositiveIntegerField'):
+                if not term.isdigit():
+                    continue
+                value = int(term)
+            else:
+                value = term
+            if len(fields) == 1:
+                query |= Q(**{path: value})
+                continue
+            head, tail = path.split('__', 1)
+            # Looked up first: a literal IN list keeps SQLite on the foreign key
+            # index, where an IN (subquery) can tip it into a table scan.
+            related = list(fields[0].related_model._default_manager.filter(**{tail: value})
+                           .values_list('pk', flat=True)[:100])
+            if related:
+                query |= Q(**{f'{head}__in': related})
+        return (queryset.filter(query) if query else queryset.none()), False
+
+
+@admin.register(Manuscript)
+class ManuscriptAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('id', 'title', 'author', 'status', 'is_paid', 'submitted_date')
+    list_select_related = ('author',)
+    list_filter = ('status', 'is_paid', 'submitted_date')
+    date_hierarchy = 'submitted_date'
+    # '^title' keeps the manuscript autocompletes on reviews and articles searchable by title.
+    search_fields = ('id', '^title', 'author__username')
+    search_help_text = 'Manuscript id, the start of the title, or the author\'s exact username.'
+    autocomplete_fields = ('author', 'reviewer')
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # A new manuscript is logged as a submission; an edit only if the status changed.
+        previous = form.initial.get('status', '') if change else ''
+        log_status_change(obj, previous, request.user)
+
+@admin.register(Review)
+class ReviewAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('id', 'manuscript_title', 'reviewer', 'date_assigned', 'due_date', 'date_completed', 'recommendation')
+    list_select_related = ('manuscript', 'reviewer')
+    list_filter = ('recommendation', ('date_completed', admin.EmptyFieldListFilter), 'date_assigned')
+    date_hierarchy = 'date_assigned'
+    search_fields = ('id', 'manuscript', 'reviewer__username')
+    search_help_text = 'Review or manuscript id, or the reviewer\'s exact username.'
+    autocomplete_fields = ('manuscript', 'reviewer')
+    show_full_result_count = False
+
+    @admin.display(description='Manuscript', ordering='manuscript__title')
+    def manuscript_title(self, obj):
+        return obj.manuscript.title
+
+@admin.register(Volume)
+class VolumeAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('__str__', 'number', 'year')
+    search_fields = ('number', 'year')
+
+@admin.register(Issue)
+class IssueAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('__str__', 'volume', 'number', 'publication_date')
+    list_select_related = ('volume',)
+    list_filter = ('publication_date',)
+    date_hierarchy = 'publication_date'
+    search_fields = ('id', 'volume__number', 'volume__year')
+    autocomplete_fields = ('volume',)
+
+    def get_queryset(self, request):
+        # Issue.__str__ reads the volume; this also covers the autocomplete results.
+        return super().get_queryset(request).select_related('volume')
+
+@admin.register(Article)
+class ArticleAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('id', 'title', 'issue', 'page_start', 'page_end', 'doi')
+    list_select_related = ('manuscript', 'issue__volume')
+    list_filter = ('issue__publication_date',)
+    search_fields = ('id', 'manuscript', 'doi')
+    search_help_text = 'Article or manuscript id, or the exact DOI.'
+    autocomplete_fields = ('manuscript', 'issue')
+    show_full_result_count = False
+
+    @admin.display(description='Title', ordering='manuscript__title')
+    def title(self, obj):
+        return obj.manuscript.title
+
+@admin.register(Announcement)
+class AnnouncementAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('title', 'category', 'is_active', 'date_created')
+    list_filter = ('category', 'is_active')
+    date_hierarchy = 'date_created'
+    search_fields = ('id',)
 
 # Admin Site Customization
 admin.site.site_header = "JHST Administration"
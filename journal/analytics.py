@@ -0,0 +1,203 @@
+"""
+Editorial analytics: the manuscript status log and the monthly summaries.
+
+Every status change appends a ManuscriptStatusEvent. `aggregate_editorial_stats`
+folds events after its cursor (and reviews completed since the last run) into
+EditorialMonth rows, so the analytics pages only ever read those few rows.
+"""
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .caching import get_or_compute, invalidate_tags
+from .models import AggregationCursor, EditorialMonth, ManuscriptStatusEvent, Review
+
+DECISIONS = ('accepted', 'rejected')
+CURSOR_NAME = 'editorial'
+# Reviews completed this recently wait for the next run: a review saved in a
+# transaction that commits after this run reads the table must not fall
+# behind the cursor.
+REVIEW_LAG = timedelta(minutes=5)
+SUMMARY_TAG = 'editorial_summary'
+MONTH_FIELDS = ['submissions', 'accepted', 'rejected', 'published', 'decision_days', 'publication_days',
+                'reviews_completed', 'review_days', 'updated_at']
+
+
+def log_status_changes(changes, actor=None):
+    """
+    Append an event for every (manuscript, previous status) pair whose status
+    actually changed. Call after setting the new status, in the same transaction.
+    """
+    now = timezone.now()
+    ManuscriptStatusEvent.objects.bulk_create([
+        ManuscriptStatusEvent(manuscript=manuscript, from_status=previous or '', to_status=manuscript.status,
+                              actor=actor, created_at=now)
+        for manuscript, previous in changes
+        if manuscript.status != previous
+    ])
+
+
+def log_status_change(manuscript, previous, actor=None):
+    log_status_changes([(manuscript, previous)], actor)
+
+
+def _month(value):
+    return timezone.localdate(value).replace(day=1)
+
+
+def _days(start, end):
+    return max(0, (end - start).days)
+
+
+def _count(histogram, days):
+    histogram[str(days)] = histogram.get(str(days), 0) + 1
+
+
+def median(histogram):
+    """Median of a {value: count} histogram (keys may be strings), or None if it is empty."""
+    counts = sorted((int(value), n) for value, n in histogram.items() if n)
+    total = sum(n for _, n in counts)
+    if not total:
+        return None
+
+    def value_at(position):
+        for value, n in counts:
+            if position < n:
+                return value
+            position -= n
+
+    middle = (value_at((total - 1) // 2) + value_at(total // 2)) / 2
+    return int(middle) if middle.is_integer() else middle
+
+
+def _months(months):
+    rows = {row.month: row for row in EditorialMonth.objects.filter(month__in=months)}
+    for month in months:
+        rows.setdefault(month, EditorialMonth(month=month))
+    return rows
+
+
+def _save(rows):
+    now = timezone.now()
+    for row in rows:
+        row.updated_at = now
+    EditorialMonth.objects.bulk_create([row for row in rows if row.pk is None])
+    EditorialMonth.objects.bulk_update([row for row in rows if row.pk is not None], MONTH_FIELDS)
+
+
+def _fold_events(cursor, batch_size):
+    events = list(ManuscriptStatusEvent.objects.filter(id__gt=cursor.last_event_id).order_by('id')
+                  .values('id', 'manuscript_id', 'to_status', 'created_at', 'manuscript__submitted_date')
+                  [:batch_size])
+    if not events:
+        return 0
+    # The first accepted/rejected/published event of each manuscript, over the whole log.
+    firsts = {}
+    for manuscript_id, status, first in (
+            ManuscriptStatusEvent.objects
+            .filter(manuscript_id__in={e['manuscript_id'] for e in events if e['to_status'] != 'submitted'},
+                    to_status__in=DECISIONS + ('published',))
+            .values('manuscript_id', 'to_status').annotate(first=Min('id'))
+            .values_list('manuscript_id', 'to_status', 'first')):
+        kind = 'published' if status == 'published' else 'decision'
+        firsts[manuscript_id, kind] = min(first, firsts.get((manuscript_id, kind), first))
+
+    rows = _months({_month(e['created_at']) for e in events})
+    for event in events:
+        row = rows[_month(event['created_at'])]
+        status, days = event['to_status'], _days(event['manuscript__submitted_date'], event['created_at'])
+        if status == 'submitted':
+            row.submissions += 1
+        elif status in DECISIONS and firsts.get((event['manuscript_id'], 'decision')) == event['id']:
+            setattr(row, status, getattr(row, status) + 1)
+            _count(row.decision_days, days)
+        elif status == 'published' and firsts.get((event['manuscript_id'], 'published')) == event['id']:
+            row.published += 1
+            _count(row.publication_days, days)
+    _save(rows.values())
+    cursor.last_event_id = events[-1]['id']
+    return len(events)
+
+
+def _fold_reviews(cursor, until):
+    reviews = Review.objects.filter(date_completed__lte=until)
+    if cursor.last_review_completed:
+        reviews = reviews.filter(date_completed__gt=cursor.last_review_completed)
+    per_month = {}
+    for assigned, completed in reviews.values_list('date_assigned', 'date_completed').iterator(chunk_size=2000):
+        per_month.setdefault(_month(completed), Counter())[_days(assigned, completed)] += 1
+    rows = _months(set(per_month))
+    for month, turnaround in per_month.items():
+        row = rows[month]
+        row.reviews_completed += sum(turnaround.values())
+        for days, n in turnaround.items():
+            row.review_days[str(days)] = row.review_days.get(str(days), 0) + n
+    _save(rows.values())
+    cursor.last_review_completed = until
+    return sum(sum(turnaround.values()) for turnaround in per_month.values())
+
+
+def aggregate(batch_size=5000):
+    """Fold everything new since the last run. Returns (events, reviews) folded."""
+    events = 0
+    while True:
+        with transaction.atomic():
+            cursor, _ = AggregationCursor.objects.get_or_create(name=CURSOR_NAME)
+            folded = _fold_events(cursor, batch_size)
+            cursor.save()
+        events += folded
+        if folded < batch_size:
+            break
+    with transaction.atomic():
+        cursor, _ = AggregationCursor.objects.get_or_create(name=CURSOR_NAME)
+        reviews = _fold_reviews(cursor, timezone.now() - REVIEW_LAG)
+        cursor.save()
+    if events or reviews:
+        invalidate_tags(SUMMARY_TAG)
+    return events, reviews
+
+
+def reset():
+    """Forget every summary so the next aggregate() rebuilds them from the full log."""
+    with transaction.atomic():
+        EditorialMonth.objects.all().delete()
+        AggregationCursor.objects.filter(name=CURSOR_NAME).delete()
+    invalidate_tags(SUMMARY_TAG)
+
+
+def _merge(months):
+    totals = {'submissions': 0, 'accepted': 0, 'rejected': 0, 'published': 0, 'reviews_completed': 0}
+    histograms = {'decision_days': Counter(), 'publication_days': Counter(), 'review_days': Counter()}
+    for row in months:
+        for name in totals:
+            totals[name] += getattr(row, name)
+        for name, histogram in histograms.items():
+            histogram.update({int(days): n for days, n in getattr(row, name).items()})
+    decisions = totals['accepted'] + totals['rejected']
+    totals['acceptance_rate'] = round(100 * totals['accepted'] / decisions) if decisions else None
+    totals['median_decision_days'] = median(histograms['decision_days'])
+    totals['median_publication_days'] = median(histograms['publication_days'])
+    totals['median_review_days'] = median(histograms['review_days'])
+    return totals
+
+
+def _summary(months):
+    today = timezone.localdate()
+    first = today.year * 12 + today.month - 12  # month index of the oldest of the last twelve
+    year_ago = date(first // 12, first % 12 + 1, 1)
+    rows = list(EditorialMonth.objects.all()[:months])
+    return {
+        'months': [dict(_merge([row]), month=row.month) for row in rows],
+        'last_12_months': _merge(row for row in rows if row.month >= year_ago),
+        'all_time': _merge(EditorialMonth.objects.all()),
+        'updated_at': max((row.updated_at for row in rows), default=None),
+    }
+
+
+def editorial_summary(months=24):
+    """Per-month figures (newest first) plus 12-month and all-time totals, from EditorialMonth only."""
+    return get_or_compute(f'journal:editorial_summary:{months}', lambda: _summary(months), 60 * 60,
+                          tags=[SUMMARY_TAG])
@@ -0,0 +1,242 @@
+"""
+Read-only JSON API (v1) for the published catalogue.
+
+Every list is paged by an opaque cursor over the primary key, so partners
+mirroring the catalogue never see rows shift between pages. ``?fields=``
+trims each object to the named fields. Bodies are compact JSON with a
+content-hash ETag and public Cache-Control. Each page is serialised once and
+cached with its ETag until journal.signals invalidates the feeds, so a
+revalidation is answered with a 304 from the cache without querying.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .caching import get_or_compute
+from .feeds import feed_tag
+from .models import Article, Issue, Volume
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Every change to an article, issue or volume bumps both (journal.signals).
+PAGE_CACHE_TAGS = [feed_tag('articles'), feed_tag('issues')]
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _authors(manuscript):
+    names = [manuscript.author.get_full_name() or manuscript.author.username]
+    return names + [name.strip() for name in manuscript.co_authors.split(',') if name.strip()]
+
+
+def _absolute(path):
+    # From SITE_URL, never the request's Host: pages are cached and served to everyone.
+    return settings.SITE_URL.rstrip('/') + path
+
+
+# Per resource: the fixed queryset (one query per page) and field -> getter.
+ARTICLE_FIELDS = {
+    'id': lambda r, a: a.id,
+    'title': lambda r, a: a.manuscript.title,
+    'abstract': lambda r, a: a.manuscript.abstract,
+    'keywords': lambda r, a: [k.strip() for k in a.manuscript.keywords.split(',') if k.strip()],
+    'authors': lambda r, a: _authors(a.manuscript),
+    'affiliations': lambda r, a: a.manuscript.affiliations,
+    'doi': lambda r, a: a.doi,
+    'page_start': lambda r, a: a.page_start,
+    'page_end': lambda r, a: a.page_end,
+    'issue': lambda r, a: a.issue_id,
+    'volume_number': lambda r, a: a.issue.volume.number,
+    'issue_number': lambda r, a: a.issue.number,
+    'publication_date': lambda r, a: a.issue.publication_date.isoformat(),
+    'url': lambda r, a: _absolute(reverse('article_detail', args=[a.id])),
+}
+ISSUE_FIELDS = {
+    'id': lambda r, i: i.id,
+    'volume': lambda r, i: i.volume_id,
+    'volume_number': lambda r, i: i.volume.number,
+    'year': lambda r, i: i.volume.year,
+    'number': lambda r, i: i.number,
+    'publication_date': lambda r, i: i.publication_date.isoformat(),
+    'article_count': lambda r, i: i.article_count,
+    'url': lambda r, i: _absolute(reverse('issue_detail', args=[i.id])),
+}
+VOLUME_FIELDS = {
+    'id': lambda r, v: v.id,
+    'number': lambda r, v: v.number,
+    'year': lambda r, v: v.year,
+    'issue_count': lambda r, v: v.issue_count,
+}
+
+RESOURCES = {
+    'articles': (lambda: Article.objects.select_related('manuscript__author', 'issue__volume'), ARTICLE_FIELDS),
+    'issues': (lambda: Issue.objects.select_related('volume').annotate(article_count=Count('articles')),
+               ISSUE_FIELDS),
+    'volumes': (lambda: Volume.objects.annotate(issue_count=Count('issues')), VOLUME_FIELDS),
+}
+
+
+def _encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise APIError(400, 'Invalid cursor.')
+
+
+def _fields(request, available):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise APIError(400, f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}.")
+    return names
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise APIError(400, 'limit must be an integer.')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _serialize(request, obj, fields, getters):
+    return {name: getters[name](request, obj) for name in fields}
+
+
+def _encode(payload):
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return {'body': body, 'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32]}
+
+
+def _json_response(request, encoded, status=200):
+    body, etag = encoded['body'], encoded['etag']
+    if status == 200:
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.API_CACHE_SECONDS)
+    else:
+        response = HttpResponse(body, content_type='application/json', status=status)
+        patch_cache_control(response, no_store=True)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _page(request, resource, queryset=None):
+    base_queryset, getters = RESOURCES[resource]
+    fields = _fields(request, getters)
+    limit = _limit(request)
+    queryset = (queryset if queryset is not None else base_queryset()).order_by('id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(id__gt=_decode_cursor(cursor))
+
+    rows = list(queryset[:limit + 1])
+    data = [_serialize(request, obj, fields, getters) for obj in rows[:limit]]
+    next_url = None
+    if len(rows) > limit:
+        params = request.GET.copy()
+        params['cursor'] = _encode_cursor(rows[limit - 1].id)
+        next_url = _absolute(f'{request.path}?{params.urlencode()}')
+    return {'data': data, 'next': next_url}
+
+
+def _endpoint(handler):
+    @require_safe
+    @wraps(handler)
+    def view(request, *args, **kwargs):
+        # The body depends on nothing but the path and query string.
+        key = 'journal:api:%s' % hashlib.sha256(request.get_full_path().encode()).hexdigest()
+        try:
+            page = get_or_compute(key, lambda: _encode(handler(request, *args, **kwargs)),
+                                  PAGE_CACHE_TIMEOUT, tags=PAGE_CACHE_TAGS)
+        except APIError as error:
+            return _json_response(request, _encode({'error': error.message}), status=error.status)
+        return _json_response(request, page)
+    return view
+
+
+def _detail(request, resource, pk):
+    base_queryset, getters = RESOURCES[resource]
+    obj = base_queryset().filter(id=pk).first()
+    if obj is None:
+        raise APIError(404, f'No {resource[:-1]} with id {pk}.')
+    return {'data': _serialize(request, obj, _fields(request, getters), getters)}
+
+
+@_endpoint
+def article_list(request):
+    queryset = RESOURCES['articles'][0]()
+    issue = request.GET.get('issue')
+    if issue:
+        if not issue.isdigit():
+            raise APIError(400, 'issue must be an id.')
+        queryset = queryset.filter(issue_id=issue)
+    return _page(request, 'articles', queryset)
+
+
+@_endpoint
+def article_detail(request, article_id):
+    return _detail(request, 'articles', article_id)
+
+
+@_endpoint
+def issue_list(request):
+    queryset = RESOURCES['issues'][0]()
+    volume = request.GET.get('volume')
+    if volume:
+        if not volume.isdigit():
+            raise APIError(400, 'volume must be an id.')
+        queryset = queryset.filter(volume_id=volume)
+    return _page(request, 'issues', queryset)
+
+
+@_endpoint
+def issue_detail(request, issue_id):
+    return _detail(request, 'issues', issue_id)
+
+
+@_endpoint
+def volume_list(request):
+    return _page(request, 'volumes')
+
+
+@_endpoint
+def search(request):
+    query = (request.GET.get('q') or '').strip()
+    if not query:
+        raise APIError(400, 'q is required.')
+    queryset = RESOURCES['articles'][0]().filter(
+        Q(manuscript__title__icontains=query) |
+        Q(manuscript__abstract__icontains=query) |
+        Q(manuscript__keywords__icontains=query) |
+        Q(manuscript__author__username__icontains=query) |
+        Q(manuscript__author__first_name__icontains=query) |
+        Q(manuscript__author__last_name__icontains=query)
+    )
+    return _page(request, 'articles', queryset)
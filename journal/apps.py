@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class JournalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "journal"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .db import configure_sqlite
+        from . import signals
+
+        connection_created.connect(configure_sqlite, dispatch_uid='journal.configure_sqlite')
+        signals.connect()
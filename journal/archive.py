@@ -0,0 +1,57 @@
+"""
+The Volume -> Issue -> article count tree behind the archive pages.
+
+Built from one grouped query and kept in the cache as plain lists and dicts.
+journal.signals invalidates it whenever a Volume, Issue or Article is written.
+"""
+from django.db.models import Count
+
+from .caching import aget_or_compute, get_or_compute, invalidate_tags
+from .models import Volume
+
+ARCHIVE_TREE_KEY = 'journal:archive_tree'
+ARCHIVE_TAG = 'archive'
+# Writes invalidate the tree, so the timeout only bounds drift from writes
+# that bypass the signals (raw SQL, a restored backup).
+ARCHIVE_TREE_TIMEOUT = 60 * 60
+ARCHIVE_TREE_STALE = 5 * 60
+
+
+def build_archive_tree():
+    """
+    Newest volume first. Each volume is a dict with ``id``, ``number``, ``year``
+    and ``issues``; each issue has ``id``, ``number``, ``publication_date`` and
+    ``article_count``.
+    """
+    rows = (Volume.objects
+            .values('id', 'number', 'year', 'issues__id', 'issues__number', 'issues__publication_date')
+            .annotate(article_count=Count('issues__articles'))
+            .order_by('-year', '-number', 'id', 'issues__number', 'issues__id'))
+
+    tree = []
+    for row in rows:
+        if not tree or tree[-1]['id'] != row['id']:
+            tree.append({'id': row['id'], 'number': row['number'], 'year': row['year'], 'issues': []})
+        # A volume without issues comes back as one row of NULL issue columns.
+        if row['issues__id'] is not None:
+            tree[-1]['issues'].append({
+                'id': row['issues__id'],
+                'number': row['issues__number'],
+                'publication_date': row['issues__publication_date'],
+                'article_count': row['article_count'],
+            })
+    return tree
+
+
+def get_archive_tree():
+    return get_or_compute(ARCHIVE_TREE_KEY, build_archive_tree, ARCHIVE_TREE_TIMEOUT,
+                          stale=ARCHIVE_TREE_STALE, tags=[ARCHIVE_TAG])
+
+
+async def aget_archive_tree():
+    return await aget_or_compute(ARCHIVE_TREE_KEY, build_archive_tree, ARCHIVE_TREE_TIMEOUT,
+                                 stale=ARCHIVE_TREE_STALE, tags=[ARCHIVE_TAG])
+
+
+def invalidate_archive_tree():
+    invalidate_tags(ARCHIVE_TAG)
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from .caching import get_or_compute, invalidate_tags
+
+
+def _user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def invalidate_user(user_id):
+    invalidate_tags(_user_tag(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user() (run by AuthenticationMiddleware on every
+    logged-in request) reads the user from the shared cache. journal.signals
+    invalidates the entry whenever the user row is saved or deleted, which covers
+    profile edits, role changes in the admin, password changes and logins.
+    """
+
+    def get_user(self, user_id):
+        return get_or_compute(f'journal:user:{user_id}', lambda: ModelBackend.get_user(self, user_id),
+                              settings.USER_CACHE_SECONDS, tags=[_user_tag(user_id)])
@@ -0,0 +1,110 @@
+"""
+get_or_compute(): how the app caches anything that is expensive to build.
+
+- Single flight: on a miss only the request holding the key's lock (an atomic
+  cache.add) computes; the others wait briefly for its result.
+- Stale-while-revalidate: for ``stale`` seconds after an entry goes stale,
+  one request recomputes it while the rest keep getting the old value.
+- Jittered TTLs, so entries written together don't all expire together.
+- Tags: invalidate_tags() bumps a version stored beside the entries; an entry
+  built under an older version is treated as a miss. Versions are read before
+  computing, so a value built while its data was being changed is never kept.
+- Entries are built from the primary database. A replica-routed request could
+  otherwise store a value from an old snapshot under the current tag versions.
+"""
+import random
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .routers import primary
+
+JITTER = 0.1
+# Longest a computation may hold its key's lock, and so the longest anyone waits for it.
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+
+
+def _tag_key(tag):
+    return f'journal:tag:{tag}'
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def jittered(timeout):
+    return timeout * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def _tag_versions(tags, found):
+    versions = {}
+    for tag in tags:
+        version = found.get(_tag_key(tag))
+        if version is None:
+            # First use, or the version was evicted (which invalidates the tag).
+            cache.add(_tag_key(tag), uuid.uuid4().hex, None)
+            version = cache.get(_tag_key(tag))
+        versions[tag] = version
+    return versions
+
+
+def _compute_and_store(key, compute, timeout, stale, versions):
+    try:
+        with primary():
+            value = compute()
+        fresh = jittered(timeout)
+        entry = {'value': value, 'fresh_until': time.time() + fresh, 'tags': versions}
+        cache.set(key, entry, fresh + stale)
+        return value
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def get_or_compute(key, compute, timeout, stale=0, tags=()):
+    """
+    Return the cached value for ``key``, calling ``compute()`` to build it when
+    it is missing, stale or invalidated. ``timeout`` is how long it is fresh
+    (before jitter); ``stale`` how much longer it may be served while refreshing.
+    """
+    found = cache.get_many([key] + [_tag_key(tag) for tag in tags])
+    versions = _tag_versions(tags, found)
+    entry = found.get(key)
+    if entry is not None and entry['tags'] == versions:
+        if time.time() < entry['fresh_until']:
+            return entry['value']
+        if not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+            return entry['value']
+        return _compute_and_store(key, compute, timeout, stale, versions)
+
+    if cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+        return _compute_and_store(key, compute, timeout, stale, versions)
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry['tags'] == versions:
+            return entry['value']
+        if not cache.has_key(_lock_key(key)):
+            break
+    # The lock holder failed or is too slow; don't keep this request waiting.
+    return compute()
+
+
+async def aget_or_compute(key, compute, timeout, stale=0, tags=()):
+    """
+    get_or_compute() for async views. A fresh entry is read with the async
+    cache API; anything else (and ``compute``, which may query) runs in a thread.
+    """
+    found = await cache.aget_many([key] + [_tag_key(tag) for tag in tags])
+    entry = found.get(key)
+    if (entry is not None and time.time() < entry['fresh_until']
+            and all(entry['tags'].get(tag) == found.get(_tag_key(tag)) for tag in tags)):
+        return entry['value']
+    return await sync_to_async(get_or_compute)(key, compute, timeout, stale, tags)
+
+
+def invalidate_tags(*tags):
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
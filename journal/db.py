@@ -0,0 +1,22 @@
+from django.conf import settings
+
+# Pragmas that only affect how a connection reads; safe on a read-only replica.
+READ_PRAGMAS = ('busy_timeout', 'mmap_size', 'cache_size', 'temp_store')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    connection_created hook: apply settings.SQLITE_PRAGMAS to every new
+    SQLite connection. journal_mode is persistent in the database file, the
+    rest only last as long as the connection.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if 'mode=ro' in str(connection.settings_dict['NAME']):
+        pragmas = {name: value for name, value in pragmas.items() if name in READ_PRAGMAS}
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,102 @@
+"""
+Streaming CSV / JSON Lines exports of the editorial tables.
+
+Rows come from values_list(...).iterator(), never model instances, and are
+written one at a time, so an export starts immediately and holds only one
+chunk in memory however many rows it covers.
+"""
+import csv
+import json
+from datetime import date, datetime
+
+from .models import Review, Article
+
+CHUNK_SIZE = 2000
+
+# dataset -> [(column header, values_list lookup)]
+COLUMNS = {
+    'manuscripts': [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('status', 'status'),
+        ('submitted_date', 'submitted_date'),
+        ('is_paid', 'is_paid'),
+        ('keywords', 'keywords'),
+        ('co_authors', 'co_authors'),
+        ('author_username', 'author__username'),
+        ('author_first_name', 'author__first_name'),
+        ('author_last_name', 'author__last_name'),
+        ('author_email', 'author__email'),
+        ('author_affiliation', 'author__affiliation'),
+        ('reviewer_username', 'reviewer__username'),
+    ],
+    'reviews': [
+        ('id', 'id'),
+        ('manuscript_id', 'manuscript_id'),
+        ('manuscript_title', 'manuscript__title'),
+        ('reviewer_username', 'reviewer__username'),
+        ('reviewer_email', 'reviewer__email'),
+        ('date_assigned', 'date_assigned'),
+        ('due_date', 'due_date'),
+        ('date_completed', 'date_completed'),
+        ('recommendation', 'recommendation'),
+    ],
+    'articles': [
+        ('id', 'id'),
+        ('manuscript_id', 'manuscript_id'),
+        ('title', 'manuscript__title'),
+        ('author_username', 'manuscript__author__username'),
+        ('is_paid', 'manuscript__is_paid'),
+        ('volume', 'issue__volume__number'),
+        ('issue', 'issue__number'),
+        ('publication_date', 'issue__publication_date'),
+        ('page_start', 'page_start'),
+        ('page_end', 'page_end'),
+        ('doi', 'doi'),
+    ],
+}
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    """A file-like object whose write() hands back what it was given, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_rows(dataset, manuscripts):
+    """
+    Rows of ``dataset`` restricted to the ``manuscripts`` queryset (already
+    filtered and ordered like the editor dashboard).
+    """
+    lookups = [lookup for _, lookup in COLUMNS[dataset]]
+    if dataset == 'manuscripts':
+        queryset = manuscripts
+    elif dataset == 'reviews':
+        queryset = Review.objects.filter(manuscript__in=manuscripts.order_by().values('id')).order_by('id')
+    else:
+        queryset = Article.objects.filter(manuscript__in=manuscripts.order_by().values('id')).order_by('id')
+    return queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def stream(dataset, fmt, rows):
+    headers = [header for header, _ in COLUMNS[dataset]]
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow([_plain(value) for value in row])
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(headers, map(_plain, row))), ensure_ascii=False) + '\n'
+
@@ -0,0 +1,182 @@
+"""
+RSS and Atom feeds for announcements, published articles and issues.
+
+Each feed body is rendered once and cached with its ETag and Last-Modified
+until journal.signals invalidates it, so polls are answered from the cache and
+mostly with a 304.
+"""
+import hashlib
+from datetime import datetime, time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.db.models import Max
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+
+from .caching import get_or_compute, invalidate_tags
+from .models import Announcement, Article, Issue
+
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_CACHE_STALE = 10 * 60
+
+
+def _absolute(path):
+    # From SITE_URL, never the request's Host: the rendered feed is cached and served to everyone.
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def _as_datetime(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+class AnnouncementsFeed(Feed):
+    title = f"{settings.JOURNAL_NAME}: Announcements"
+    description = "News, calls for papers and notices from the journal."
+
+    def link(self):
+        return _absolute(reverse('announcements'))
+
+    def items(self):
+        return Announcement.objects.filter(is_active=True).order_by('-date_created')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.short_description
+
+    def item_link(self, item):
+        return _absolute(reverse('announcement_detail', args=[item.id]))
+
+    def item_pubdate(self, item):
+        return item.date_created
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return [item.get_category_display()]
+
+
+class ArticlesFeed(Feed):
+    title = f"{settings.JOURNAL_NAME}: New Articles"
+    description = "Articles as they are published."
+
+    def link(self):
+        return _absolute(reverse('current_issue'))
+
+    def items(self):
+        return (Article.objects.select_related('manuscript__author', 'issue__volume')
+                .order_by('-issue__publication_date', '-id')[:FEED_ITEMS])
+
+    def item_title(self, item):
+        return item.manuscript.title
+
+    def item_description(self, item):
+        return item.manuscript.abstract
+
+    def item_link(self, item):
+        return _absolute(reverse('article_detail', args=[item.id]))
+
+    def item_author_name(self, item):
+        return item.manuscript.author.get_full_name() or item.manuscript.author.username
+
+    def item_pubdate(self, item):
+        return _as_datetime(item.issue.publication_date)
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return [k.strip() for k in item.manuscript.keywords.split(',') if k.strip()]
+
+
+class IssuesFeed(Feed):
+    title = f"{settings.JOURNAL_NAME}: Issues"
+    description = "New issues of the journal."
+
+    def link(self):
+        return _absolute(reverse('archives'))
+
+    def items(self):
+        # Edits to an issue or its volume stamp the issue's articles (journal.signals).
+        return (Issue.objects.select_related('volume').annotate(updated_at=Max('articles__updated_at'))
+                .order_by('-publication_date')[:FEED_ITEMS])
+
+    def item_title(self, item):
+        return f"{item} ({item.publication_date:%B %Y})"
+
+    def item_description(self, item):
+        return f"Volume {item.volume.number} ({item.volume.year}), Issue {item.number}."
+
+    def item_link(self, item):
+        return _absolute(reverse('issue_detail', args=[item.id]))
+
+    def item_pubdate(self, item):
+        return _as_datetime(item.publication_date)
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+    subtitle = property(lambda self: self.description)
+
+
+FEEDS = {
+    'announcements': AnnouncementsFeed,
+    'articles': ArticlesFeed,
+    'issues': IssuesFeed,
+}
+FORMATS = ('rss', 'atom')
+
+
+def _cache_key(kind, fmt):
+    return f'journal:feed:{kind}:{fmt}'
+
+
+def feed_tag(kind):
+    return f'feed:{kind}'
+
+
+def _render(request, kind, fmt):
+    feed_class = FEEDS[kind]
+    if fmt == 'atom':
+        feed_class = type(f'Atom{feed_class.__name__}', (AtomMixin, feed_class), {})
+    # Absolute links are left alone by Feed; relative ones would get the request's host.
+    feed_class = type(feed_class.__name__, (feed_class,),
+                      {'feed_url': _absolute(reverse('syndication_feed', args=[kind, fmt]))})
+    generator = feed_class().get_feed(None, request)
+    content = generator.writeString('utf-8').encode('utf-8')
+    return {
+        'content': content,
+        'content_type': generator.content_type,
+        # Strong: the same bytes always give the same tag, in every worker.
+        'etag': '"%s"' % hashlib.sha256(content).hexdigest()[:32],
+        # The newest pubdate or updateddate of the items, so an edit to an older
+        # item still moves Last-Modified for clients that only send If-Modified-Since.
+        'last_modified': int(generator.latest_post_date().timestamp()),
+    }
+
+
+def feed_response(request, kind, fmt):
+    cached = get_or_compute(_cache_key(kind, fmt), lambda: _render(request, kind, fmt), FEED_CACHE_TIMEOUT,
+                            stale=FEED_CACHE_STALE, tags=[feed_tag(kind)])
+
+    response = get_conditional_response(request, etag=cached['etag'], last_modified=cached['last_modified'])
+    if response is None:
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+    response['ETag'] = cached['etag']
+    response['Last-Modified'] = http_date(cached['last_modified'])
+    return response
+
+
+def invalidate_feeds(*kinds):
+    invalidate_tags(*[feed_tag(kind) for kind in kinds])
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from journal import analytics
+from journal.models import Manuscript, ManuscriptStatusEvent
+
+
+class Command(BaseCommand):
+    help = ('Folds manuscript status events and completed reviews recorded since the last run into '
+            'the monthly editorial summaries read by the analytics and metrics pages')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Events folded per transaction')
+        parser.add_argument('--rebuild', action='store_true', help='Drop the summaries and fold the whole log again')
+        parser.add_argument('--backfill', action='store_true',
+                            help='First log a submission event (at submitted_date) for manuscripts that have none; '
+                                 'for data from before the status log existed')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['backfill']:
+            self._backfill(options['batch_size'])
+        if options['rebuild']:
+            analytics.reset()
+        events, reviews = analytics.aggregate(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Folded {events} status event(s) and {reviews} completed review(s)'))
+
+    def _backfill(self, batch_size):
+        created, last = 0, 0
+        while True:
+            rows = list(Manuscript.objects.filter(pk__gt=last, status_events__isnull=True).order_by('pk')
+                        .values_list('pk', 'submitted_date')[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                ManuscriptStatusEvent.objects.bulk_create([
+                    ManuscriptStatusEvent(manuscript_id=pk, to_status='submitted', created_at=submitted)
+                    for pk, submitted in rows
+                ])
+            created += len(rows)
+            last = rows[-1][0]
+        self.stdout.write(f'Logged {created} submission event(s) for existing manuscripts')
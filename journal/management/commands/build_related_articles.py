@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from journal.related import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the related articles shown on every article page from the current TF-IDF weights'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        indexed = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Related articles computed for {indexed} article(s) in {time.monotonic() - started:.1f}s'
+        ))
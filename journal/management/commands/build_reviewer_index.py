@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from journal.recommender import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the reviewer expertise index used for reviewer recommendations'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed expertise for {indexed} reviewers'))
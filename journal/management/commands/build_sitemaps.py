@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from journal.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Regenerates the sitemap shards whose rows changed, and the sitemap index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every shard, not just the dirty ones')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        built = build_sitemaps(rebuild_all=options['all'])
+        for shard in built:
+            self.stdout.write(f'  {shard.filename}: {shard.url_count} URL(s)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(built)} shard(s) in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journal.metadata_export import FORMATS, DOIConflict, assign_dois, export_issue
+from journal.models import Issue
+
+
+class Command(BaseCommand):
+    help = 'Writes Crossref deposit XML or JATS front matter for every article in an issue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('issue_id', type=int)
+        parser.add_argument('--format', choices=sorted(FORMATS), default='crossref')
+        parser.add_argument('--assign-dois', action='store_true',
+                            help='First give articles without a DOI one from DOI_PATTERN')
+        parser.add_argument('--output', help='File to write (defaults to stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            issue = Issue.objects.select_related('volume').get(id=options['issue_id'])
+        except Issue.DoesNotExist:
+            raise CommandError(f"Issue {options['issue_id']} does not exist")
+
+        if options['assign_dois']:
+            try:
+                assigned = assign_dois(issue)
+            except (ValueError, DOIConflict) as e:
+                raise CommandError(str(e))
+            self.stderr.write(f'Assigned {assigned} DOI(s)')
+
+        out = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for chunk in export_issue(issue, options['format']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
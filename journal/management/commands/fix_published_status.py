@@ -1,18 +1,13 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from journal.models import Manuscript
+
 
 class Command(BaseCommand):
-    help = 'Fixes manuscript statuses for published articles'
+    help = 'Fixes manuscript statuses for published articles (alias for reconcile --check published_status)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
 
     def handle(self, *args, **options):
-        # Find all manuscripts that have an associated article but are not marked as published
-        manuscripts = Manuscript.objects.filter(article__isnull=False).exclude(status='published')
-        
-        updated_count = 0
-        for manuscript in manuscripts:
-            manuscript.status = 'published'
-            manuscript.save()
-            updated_count += 1
-            self.stdout.write(f'Updated {manuscript.title}')
-            
-        self.stdout.write(self.style.SUCCESS(f'Successfully updated {updated_count} manuscripts to published status'))
+        call_command('reconcile', check=['published_status'], dry_run=options['dry_run'],
+                     stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,259 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from journal.archive import invalidate_archive_tree
+from journal.feeds import invalidate_feeds
+from journal.management.utils import manual_timestamps
+from journal.models import User, Manuscript, ManuscriptStatusEvent, Volume, Issue, Article
+from journal.related import add_articles
+from journal.sitemaps import mark_dirty
+
+REQUIRED_COLUMNS = ('title', 'author_name', 'author_email', 'volume', 'year', 'issue', 'publication_date')
+# Imported files are stored by content hash, so re-running never duplicates one.
+ARCHIVE_UPLOAD_DIR = 'manuscripts/archive'
+
+
+class Command(BaseCommand):
+    help = ('Imports back issues from a CSV or JSON manifest plus a directory of files, creating '
+            'authors, volumes, issues, manuscripts and articles. Rows already imported are skipped')
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='CSV with a header row, or a JSON list of objects')
+        parser.add_argument('--files', help='Directory the "file" column is relative to '
+                                            '(defaults to the manifest\'s directory)')
+        parser.add_argument('--workers', type=int, default=8, help='Threads hashing and copying files')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Articles per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and report without writing')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+        started = time.monotonic()
+        self.files_dir = options['files'] or os.path.dirname(os.path.abspath(options['manifest']))
+
+        rows = self._valid_rows(self._read_manifest(options['manifest']))
+        rows = self._new_rows(rows)
+        self.stdout.write(f'{len(rows)} new article(s) to import')
+        if options['dry_run'] or not rows:
+            return
+
+        authors = self._authors(rows)
+        issues = self._issues(rows)
+        files = self._copy_files(rows, options['workers'])
+
+        article_ids = []
+        chunk_size = options['chunk_size']
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            article_ids += self._import_chunk(chunk, authors, issues, files)
+            self.stdout.write(f'  {min(start + chunk_size, len(rows))}/{len(rows)} articles')
+
+        # bulk_create sends no signals, so refresh what they would have.
+        invalidate_archive_tree()
+        invalidate_feeds('articles', 'issues')
+        mark_dirty('articles', article_ids)
+        mark_dirty('issues', {issue.id for issue in issues.values()})
+        add_articles(article_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(article_ids)} article(s) in {time.monotonic() - started:.1f}s'
+        ))
+
+    def _read_manifest(self, path):
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                if path.lower().endswith('.json'):
+                    data = json.load(f)
+                    if not isinstance(data, list):
+                        raise CommandError('A JSON manifest must be a list of objects.')
+                    return data
+                return list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(f'Cannot read manifest: {e}')
+        except json.JSONDecodeError as e:
+            raise CommandError(f'Invalid JSON manifest: {e}')
+
+    def _valid_rows(self, raw_rows):
+        rows, seen_dois = [], set()
+        for line, raw in enumerate(raw_rows, start=1):
+            row = {key.strip(): str(value).strip() for key, value in raw.items() if key and value is not None}
+            missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+            if missing:
+                self.stderr.write(f'  row {line}: missing {", ".join(missing)}; skipped')
+                continue
+            try:
+                row['volume'], row['year'], row['issue'] = int(row['volume']), int(row['year']), int(row['issue'])
+                row['publication_date'] = date.fromisoformat(row['publication_date'])
+                for column in ('page_start', 'page_end'):
+                    row[column] = int(row[column]) if row.get(column) else None
+            except ValueError as e:
+                self.stderr.write(f'  row {line}: {e}; skipped')
+                continue
+            row['author_email'] = row['author_email'].lower()
+            row['doi'] = row.get('doi') or None
+            if row['doi']:
+                if row['doi'] in seen_dois:
+                    self.stderr.write(f'  row {line}: DOI {row["doi"]} repeated in the manifest; skipped')
+                    continue
+                seen_dois.add(row['doi'])
+            if row.get('file') and not os.path.isfile(os.path.join(self.files_dir, row['file'])):
+                self.stderr.write(f'  row {line}: file {row["file"]} not found; skipped')
+                continue
+            row['line'] = line
+            rows.append(row)
+        return rows
+
+    def _new_rows(self, rows):
+        """Drop rows already in the database: same DOI, or same title in the same volume and issue."""
+        existing_dois = set(Article.objects.filter(doi__in=[r['doi'] for r in rows if r['doi']])
+                            .values_list('doi', flat=True))
+        existing_titles = set(Article.objects.filter(manuscript__title__in={r['title'] for r in rows})
+                              .values_list('manuscript__title', 'issue__volume__number', 'issue__number'))
+        new_rows, seen = [], set()
+        for row in rows:
+            key = (row['title'], row['volume'], row['issue'])
+            if row['doi'] in existing_dois or key in existing_titles or key in seen:
+                continue
+            seen.add(key)
+            new_rows.append(row)
+        skipped = len(rows) - len(new_rows)
+        if skipped:
+            self.stdout.write(f'{skipped} row(s) already imported; skipped')
+        return new_rows
+
+    def _authors(self, rows):
+        """email -> User, creating researcher accounts (no usable password) for unknown authors."""
+        emails = {row['author_email']: row for row in rows}
+        # Manifest emails are lower-cased; stored ones may not be.
+        existing = User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=list(emails))
+        authors = {user.email_lower: user for user in existing}
+        taken = set(User.objects.filter(username__in=[e.split('@')[0] for e in emails])
+                    .values_list('username', flat=True))
+
+        new_users = []
+        unusable = make_password(None)
+        for email, row in emails.items():
+            if email in authors:
+                continue
+            username = base = email.split('@')[0][:140]
+            suffix = 1
+            while username in taken:
+                suffix += 1
+                username = f'{base}{suffix}'
+            taken.add(username)
+            first, _, last = row['author_name'].rpartition(' ')
+            new_users.append(User(
+                username=username, email=email, password=unusable, is_researcher=True,
+                first_name=(first or last)[:150], last_name=(last if first else '')[:150],
+                affiliation=row.get('author_affiliation', '')[:255],
+            ))
+        with transaction.atomic():
+            for user in User.objects.bulk_create(new_users, batch_size=500):
+                authors[user.email] = user
+        self.stdout.write(f'{len(new_users)} author account(s) created')
+        return authors
+
+    def _issues(self, rows):
+        """(volume, year, issue) -> Issue, creating missing volumes and issues."""
+        wanted_volumes = {(row['volume'], row['year']) for row in rows}
+        volumes = {(v.number, v.year): v for v in Volume.objects.filter(number__in={n for n, _ in wanted_volumes})}
+        with transaction.atomic():
+            created = Volume.objects.bulk_create(
+                [Volume(number=n, year=y) for n, y in wanted_volumes if (n, y) not in volumes])
+            volumes.update({(v.number, v.year): v for v in created})
+
+            issues = {
+                (i.volume.number, i.volume.year, i.number): i
+                for i in Issue.objects.filter(volume__in=list(volumes.values())).select_related('volume')
+            }
+            new_issues = {}
+            for row in rows:
+                key = (row['volume'], row['year'], row['issue'])
+                if key not in issues and key not in new_issues:
+                    new_issues[key] = Issue(volume=volumes[key[:2]], number=row['issue'],
+                                            publication_date=row['publication_date'])
+            for issue in Issue.objects.bulk_create(list(new_issues.values())):
+                issues[(issue.volume.number, issue.volume.year, issue.number)] = issue
+        self.stdout.write(f'{len(created)} volume(s) and {len(new_issues)} issue(s) created')
+        return issues
+
+    def _store_file(self, relative_path):
+        source = os.path.join(self.files_dir, relative_path)
+        extension = os.path.splitext(relative_path)[1].lower()
+        directory = os.path.join(settings.MEDIA_ROOT, ARCHIVE_UPLOAD_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        # Hash while copying to a temporary name, so each file is read once.
+        with open(source, 'rb') as src, tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp:
+            for block in iter(lambda: src.read(1024 * 1024), b''):
+                digest.update(block)
+                tmp.write(block)
+        name = f'{digest.hexdigest()}{extension}'
+        destination = os.path.join(directory, name)
+        if os.path.exists(destination):
+            os.remove(tmp.name)
+        else:
+            shutil.move(tmp.name, destination)
+        return f'{ARCHIVE_UPLOAD_DIR}/{name}'
+
+    def _copy_files(self, rows, workers):
+        """manifest path -> stored name, hashing and copying on a thread pool (the work is I/O bound)."""
+        paths = sorted({row['file'] for row in rows if row.get('file')})
+        stored = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for done, (path, name) in enumerate(zip(paths, pool.map(self._store_file, paths)), start=1):
+                stored[path] = name
+                if done % 500 == 0 or done == len(paths):
+                    self.stdout.write(f'  {done}/{len(paths)} files copied')
+        return stored
+
+    def _import_chunk(self, chunk, authors, issues, files):
+        manuscripts = [
+            Manuscript(
+                title=row['title'][:255],
+                abstract=row.get('abstract', ''),
+                keywords=row.get('keywords', '')[:255],
+                co_authors=row.get('co_authors', '')[:500],
+                affiliations=row.get('affiliations', ''),
+                author=authors[row['author_email']],
+                file=files.get(row.get('file'), ''),
+                status='published',
+                is_paid=True,
+                submitted_date=timezone.make_aware(datetime.combine(row['publication_date'], dt_time.min)),
+            )
+            for row in chunk
+        ]
+        with transaction.atomic(), manual_timestamps(Manuscript._meta.get_field('submitted_date')):
+            Manuscript.objects.bulk_create(manuscripts)
+            # Back issues enter the editorial statistics in the month they were published.
+            ManuscriptStatusEvent.objects.bulk_create([
+                ManuscriptStatusEvent(manuscript=manuscript, from_status=from_status, to_status=to_status,
+                                      created_at=manuscript.submitted_date)
+                for manuscript in manuscripts
+                for from_status, to_status in (('', 'submitted'), ('submitted', 'published'))
+            ])
+            articles = Article.objects.bulk_create([
+                Article(
+                    manuscript=manuscript,
+                    issue=issues[(row['volume'], row['year'], row['issue'])],
+                    page_start=row['page_start'],
+                    page_end=row['page_end'],
+                    doi=row['doi'],
+                )
+                for manuscript, row in zip(manuscripts, chunk)
+            ])
+        return [article.id for article in articles]
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from journal.query_registry import CANONICAL_QUERYSETS
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN QUERY PLAN over the canonical querysets and flags full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run ANALYZE first so the planner sees current statistics')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan for every query')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if an unexpected full scan is found')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('index_report understands SQLite query plans only.')
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        problems = 0
+        for name, (factory, scan_expected) in CANONICAL_QUERYSETS.items():
+            plan = factory().explain()
+            scans, sorts = [], []
+            for line in plan.splitlines():
+                # Rows look like "<id> <parent> <notused> <detail>".
+                detail = line.split(' ', 3)[-1]
+                if detail.startswith('SCAN ') and ' USING ' not in detail:
+                    scans.append(detail)
+                elif detail.startswith('USE TEMP B-TREE'):
+                    sorts.append(detail)
+
+            if scans and not scan_expected:
+                problems += 1
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}: {"; ".join(scans)}'))
+            elif sorts:
+                self.stdout.write(self.style.WARNING(f'SORT       {name}: {"; ".join(sorts)}'))
+            elif scans:
+                self.stdout.write(f'SCAN (ok)  {name}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK         {name}'))
+
+            if options['verbose_plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'             {line}')
+
+        if problems:
+            message = f'{problems} canonical queryset(s) fall back to a full table scan'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.ERROR(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No unexpected full table scans'))
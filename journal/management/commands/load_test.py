@@ -0,0 +1,185 @@
+import asyncio
+import json
+import random
+import socket
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from journal.management.utils import percentile
+from journal.models import Article, Issue
+
+# Slow clients shrink their receive buffer so the server can't hand the whole
+# page to the kernel and move on: it has to wait for them, as for a slow download.
+SLOW_CLIENT_RCVBUF = 4096
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection, enough for Django's responses."""
+
+    def __init__(self, host, port, rcvbuf=None):
+        self.host, self.port, self.rcvbuf = host, port, rcvbuf
+        self.reader = self.writer = None
+
+    async def _open(self):
+        if not self.rcvbuf:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=2 ** 20)
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (self.host, self.port))
+        self.reader, self.writer = await asyncio.open_connection(sock=sock, limit=2 ** 20)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, path, read_rate=None):
+        """Status code of GET ``path``, reading the body at ``read_rate`` bytes/s if given."""
+        if self.writer is None:
+            await self._open()
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+                          f'User-Agent: Mozilla/5.0 (load_test)\r\n\r\n'.encode())
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split()[1])
+        headers = dict(line.split(': ', 1) for line in head[1:] if ': ' in line)
+        headers = {name.lower(): value for name, value in headers.items()}
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self._read(size + 2, read_rate)
+                if not size:
+                    break
+        elif 'content-length' in headers:
+            await self._read(int(headers['content-length']), read_rate)
+        else:
+            while await self.reader.read(65536):
+                pass
+            keep_alive = False
+        if not keep_alive:
+            self.close()
+        return status
+
+    async def _read(self, size, read_rate):
+        step = max(1, read_rate // 10) if read_rate else size
+        while size > 0:
+            size -= len(await self.reader.readexactly(min(step, size)))
+            if read_rate:
+                await asyncio.sleep(0.1)
+
+
+class Command(BaseCommand):
+    help = ('Drives the public pages of a running server with concurrent keep-alive clients, optionally '
+            'alongside slow clients, and reports requests/sec and tail latency as JSON. Run it against '
+            'the WSGI and the ASGI deployment of the same database to compare them')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test')
+        parser.add_argument('--concurrency', type=int, default=32, help='Clients sending requests back to back')
+        parser.add_argument('--duration', type=float, default=20, help='Seconds to measure')
+        parser.add_argument('--slow-clients', type=int, default=0,
+                            help='Extra clients that download large pages slowly, occupying the server')
+        parser.add_argument('--slow-rate', type=int, default=8192, help='Bytes/s each slow client reads')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds before a request counts as failed')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if min(options['concurrency'], options['duration'], options['slow_rate'], options['timeout']) <= 0:
+            raise CommandError('--concurrency, --duration, --slow-rate and --timeout must be positive')
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('--url must be a plain http:// URL')
+        rng = random.Random(options['seed'])
+        paths, large = self._paths(rng)
+
+        results = asyncio.run(self._run(url.hostname, url.port or 80, paths, large, options, rng))
+        latencies = results['latencies']
+        report = {
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'slow_clients': options['slow_clients'],
+            'slow_rate': options['slow_rate'],
+            'duration': options['duration'],
+            'requests': len(latencies),
+            'errors': results['errors'],
+            'statuses': dict(results['statuses']),
+            'requests_per_second': round(len(latencies) / options['duration'], 1),
+            'latency_ms': {
+                'p50': percentile(latencies, 50),
+                'p90': percentile(latencies, 90),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies, default=None),
+            },
+            'slow_requests_completed': results['slow_completed'],
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    def _paths(self, rng):
+        issue_ids = list(Issue.objects.values_list('id', flat=True))
+        article_ids = list(Article.objects.values_list('id', flat=True))
+        if not issue_ids or not article_ids:
+            raise CommandError('No published articles found; run seed_benchmark first.')
+        # Readers mostly search for something they know exists: titles of sampled articles.
+        titles = Article.objects.filter(id__in=rng.sample(article_ids, min(5, len(article_ids))))
+        searches = [f"{reverse('search')}?{urlencode({'q': title})}"
+                    for title in titles.values_list('manuscript__title', flat=True)]
+        paths = ([reverse('index'), reverse('archives'), reverse('current_issue'), reverse('announcements')]
+                 + [reverse('issue_detail', args=[i]) for i in rng.choices(issue_ids, k=20)]
+                 + [reverse('article_detail', args=[a]) for a in rng.choices(article_ids, k=20)]
+                 + searches)
+        # What slow clients download: a large page that is cheap to produce,
+        # so they cost the server waiting time rather than CPU.
+        return paths, [reverse('archives')]
+
+    async def _run(self, host, port, paths, large, options, rng):
+        deadline = time.monotonic() + options['duration']
+        results = {'latencies': [], 'errors': 0, 'statuses': Counter(), 'slow_completed': 0}
+
+        async def client(seed):
+            local = random.Random(seed)
+            connection = _Connection(host, port)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(connection.get(local.choice(paths)), options['timeout'])
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    connection.close()
+                    results['errors'] += 1
+                    continue
+                results['latencies'].append(round((time.perf_counter() - started) * 1000, 2))
+                results['statuses'][status] += 1
+            connection.close()
+
+        async def slow_client(seed):
+            local = random.Random(seed)
+            connection = _Connection(host, port, rcvbuf=SLOW_CLIENT_RCVBUF)
+            while time.monotonic() < deadline:
+                try:
+                    await connection.get(local.choice(large), read_rate=options['slow_rate'])
+                    results['slow_completed'] += 1
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    connection.close()
+                    await asyncio.sleep(0.1)
+            connection.close()
+
+        slow = [asyncio.create_task(slow_client(rng.random())) for _ in range(options['slow_clients'])]
+        # Let the slow clients take hold of the server before measuring.
+        await asyncio.sleep(min(1, options['duration'] / 10) if slow else 0)
+        deadline = time.monotonic() + options['duration']
+        await asyncio.gather(*(client(rng.random()) for _ in range(options['concurrency'])))
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        return results
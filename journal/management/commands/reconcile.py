@@ -0,0 +1,196 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from journal.analytics import log_status_changes
+from journal.archive import invalidate_archive_tree
+from journal.feeds import invalidate_feeds
+from journal.models import User, Manuscript, Review, Announcement, Article
+from journal.sitemaps import mark_dirty_on_commit
+
+
+class RowCheck:
+    """
+    An invariant fixed by a single set-based UPDATE on the offending rows, or,
+    without ``changes``, only reported because no safe fix exists.
+    """
+
+    def __init__(self, name, description, queryset, changes=None):
+        self.name = name
+        self.description = description
+        self.queryset = queryset
+        self.changes = changes
+
+
+ROW_CHECKS = [
+    RowCheck(
+        'published_status',
+        'Manuscripts with an Article that are not marked published',
+        lambda: Manuscript.objects.filter(article__isnull=False).exclude(status='published'),
+        {'status': 'published'},
+    ),
+    RowCheck(
+        'under_review_without_reviews',
+        'Manuscripts under review with no Review rows (sent back to submitted)',
+        lambda: Manuscript.objects.filter(status='under_review', reviews__isnull=True),
+        {'status': 'submitted'},
+    ),
+    # Reopening would put the review back on the reviewer's list and in the
+    # deadline reminders, and the completion date is all that is left of it.
+    RowCheck(
+        'completed_review_without_recommendation',
+        'Reviews marked completed without a recommendation (reported only; check them by hand)',
+        lambda: Review.objects.filter(date_completed__isnull=False, recommendation=''),
+    ),
+]
+
+# upload_to directory -> (model, FileField name)
+MEDIA_DIRECTORIES = {
+    'manuscripts': (Manuscript, 'file'),
+    'avatars': (User, 'avatar'),
+    'announcements': (Announcement, 'image'),
+}
+ORPHAN_DIRECTORY = 'orphaned'
+# Files this recent are left alone: an upload is written to disk before the
+# transaction saving its row commits.
+ORPHAN_GRACE_SECONDS = 60 * 60
+
+ALL_CHECKS = [check.name for check in ROW_CHECKS] + ['orphaned_media']
+
+
+class Command(BaseCommand):
+    help = 'Finds and fixes data that violates the journal invariants, in chunked set-based updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='append', choices=ALL_CHECKS, default=[],
+                            help='Run only this check (repeatable); defaults to all')
+        parser.add_argument('--dry-run', action='store_true', help='Report problems without fixing them')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        self.dry_run = options['dry_run']
+        self.chunk_size = options['chunk_size']
+        selected = options['check'] or ALL_CHECKS
+
+        total = reported = 0
+        for check in ROW_CHECKS:
+            if check.name not in selected:
+                continue
+            if check.changes is None:
+                reported += self._report_row_check(check)
+            else:
+                total += self._run_row_check(check)
+        if 'orphaned_media' in selected:
+            total += self._run_orphaned_media()
+
+        verb = 'Found' if self.dry_run else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} problem(s)'))
+        if reported:
+            self.stdout.write(self.style.WARNING(f'{reported} row(s) need fixing by hand'))
+
+    def _id_chunks(self, queryset):
+        # Keyset pagination over primary keys: memory stays at one chunk of
+        # ids however large the table is, and fixed rows simply drop out.
+        last = 0
+        while True:
+            ids = list(queryset.filter(pk__gt=last).order_by('pk')
+                       .values_list('pk', flat=True)[:self.chunk_size])
+            if not ids:
+                return
+            yield ids
+            last = ids[-1]
+
+    def _run_row_check(self, check):
+        self.stdout.write(f'[{check.name}] {check.description}')
+        count = 0
+        for ids in self._id_chunks(check.queryset()):
+            if self.dry_run:
+                count += len(ids)
+            else:
+                with transaction.atomic():
+                    # Re-apply the invariant filter so rows fixed concurrently are left alone.
+                    rows = check.queryset().filter(pk__in=ids)
+                    if rows.model is Manuscript and 'status' in check.changes:
+                        count += self._fix_statuses(rows, check.changes)
+                    else:
+                        count += rows.update(**check.changes)
+            self.stdout.write(f'  ...{count}')
+        self.stdout.write(f'  {count} row(s) {"to fix" if self.dry_run else "updated"}')
+        return count
+
+    def _report_row_check(self, check):
+        self.stdout.write(f'[{check.name}] {check.description}')
+        count = 0
+        for ids in self._id_chunks(check.queryset()):
+            self.stdout.write(f'  ids: {", ".join(map(str, ids))}')
+            count += len(ids)
+        self.stdout.write(f'  {count} row(s) to review')
+        return count
+
+    def _fix_statuses(self, rows, changes):
+        # Status changes go into the status log like any other transition.
+        manuscripts = list(rows.only('id', 'status'))
+        logged = [(manuscript, manuscript.status) for manuscript in manuscripts]
+        updated = Manuscript.objects.filter(pk__in=[m.pk for m in manuscripts]).update(**changes)
+        for manuscript in manuscripts:
+            manuscript.status = changes['status']
+        log_status_changes(logged)
+        self._refresh_articles([m.pk for m in manuscripts])
+        return updated
+
+    def _refresh_articles(self, manuscript_ids):
+        # update() sends no post_save, so do what journal.signals would have
+        # done for the articles showing these manuscripts.
+        articles = Article.objects.filter(manuscript_id__in=manuscript_ids)
+        article_ids = list(articles.values_list('id', flat=True))
+        if not article_ids:
+            return
+        articles.update(updated_at=timezone.now())
+        mark_dirty_on_commit('articles', article_ids)
+        transaction.on_commit(lambda: invalidate_feeds('articles'))
+        transaction.on_commit(invalidate_archive_tree)
+
+    def _run_orphaned_media(self):
+        self.stdout.write(f'[orphaned_media] Uploaded files no row refers to (moved to {ORPHAN_DIRECTORY}/)')
+        count = 0
+        for directory, (model, field) in MEDIA_DIRECTORIES.items():
+            batch = []
+            for name in self._walk(directory):
+                batch.append(name)
+                if len(batch) >= self.chunk_size:
+                    count += self._handle_orphans(model, field, batch)
+                    batch = []
+            if batch:
+                count += self._handle_orphans(model, field, batch)
+        self.stdout.write(f'  {count} file(s) {"orphaned" if self.dry_run else "moved"}')
+        return count
+
+    def _walk(self, directory):
+        root = os.path.join(settings.MEDIA_ROOT, directory)
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                # FileFields store paths relative to MEDIA_ROOT with forward slashes.
+                yield os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+    def _handle_orphans(self, model, field, names):
+        referenced = set(model.objects.filter(**{f'{field}__in': names})
+                         .values_list(field, flat=True))
+        orphans = [name for name in names if name not in referenced]
+        for name in orphans:
+            self.stdout.write(f'  {name}')
+            if not self.dry_run:
+                destination = os.path.join(settings.MEDIA_ROOT, ORPHAN_DIRECTORY, name)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.move(os.path.join(settings.MEDIA_ROOT, name), destination)
+        return len(orphans)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from journal.models import User, Review, ReviewReminder, Notification
+
+# Reviews listed by name in an escalation digest; the rest are counted.
+DIGEST_LINES = 50
+
+
+class Command(BaseCommand):
+    help = ('Sends due-soon and overdue reminders for open reviews and escalates long-overdue '
+            'ones to the editors. Safe to run from cron as often as you like')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be sent without sending it')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+
+        now = timezone.now()
+        # Each window is a range over the open part of review_open_due_idx;
+        # completed reviews are never read.
+        windows = [
+            ('due_soon', {'due_date__gt': now,
+                          'due_date__lte': now + timedelta(days=settings.REVIEW_REMINDER_DAYS)}),
+            ('overdue', {'due_date__lte': now}),
+            ('escalated', {'due_date__lte': now - timedelta(days=settings.REVIEW_ESCALATION_DAYS)}),
+        ]
+        self.editors = list(User.objects.filter(is_editor=True).only('id', 'email'))
+        self.sender = getattr(settings, 'EMAIL_HOST_USER', 'noreply@jhst.org')
+        self.connection = get_connection()
+
+        total = 0
+        for kind, due_filter in windows:
+            pending = (Review.objects.filter(date_completed__isnull=True, **due_filter)
+                       .exclude(reminders__kind=kind)
+                       .select_related('manuscript', 'reviewer')
+                       .order_by('due_date', 'pk'))
+            if self.dry_run:
+                count = pending.count()
+            elif kind == 'escalated':
+                count = self._escalate(pending)
+            else:
+                count = self._remind(kind, pending)
+            self.stdout.write(f'[{kind}] {count} review(s)')
+            total += count
+        self.connection.close()
+
+        verb = 'Would send' if self.dry_run else 'Sent'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} reminder(s)'))
+
+    def _remind(self, kind, pending):
+        sent, failed = 0, []
+        while True:
+            # Reviews drop out of ``pending`` once their reminder is recorded;
+            # ones whose mail failed are skipped and retried by the next run.
+            reviews = list(pending.exclude(pk__in=failed)[:self.batch_size])
+            if not reviews:
+                return sent
+
+            delivered = []
+            for review in reviews:
+                if self._deliver(self._reviewer_email(kind, review)):
+                    delivered.append(review)
+                else:
+                    failed.append(review.pk)
+            with transaction.atomic():
+                ReviewReminder.objects.bulk_create(
+                    [ReviewReminder(review=review, kind=kind) for review in delivered],
+                    ignore_conflicts=True,
+                )
+                Notification.objects.bulk_create([
+                    Notification(recipient=review.reviewer, message=self._reviewer_message(kind, review),
+                                 link='/dashboard/')
+                    for review in delivered
+                ])
+            sent += len(delivered)
+
+    def _escalate(self, pending):
+        """One digest per editor covering every review newly past the escalation threshold."""
+        reviews = list(pending)
+        if not reviews:
+            return 0
+        now = timezone.now()
+        lines = [
+            f"- '{review.manuscript.title}' (reviewer {review.reviewer.username}): due "
+            f"{review.due_date.strftime('%Y-%m-%d')}, {(now - review.due_date).days} days ago"
+            for review in reviews
+        ]
+        if len(lines) > DIGEST_LINES:
+            lines = lines[:DIGEST_LINES] + [f'... and {len(lines) - DIGEST_LINES} more']
+        message = f'{len(reviews)} review(s) are more than {settings.REVIEW_ESCALATION_DAYS} days overdue.'
+        body = (f"Dear Editor,\n\n{message}\n\n" + '\n'.join(lines) +
+                "\n\nYou may wish to contact the reviewers or assign others.\n\nJHST System")
+
+        recipients = [editor.email for editor in self.editors if editor.email]
+        subject = f'Overdue Review Escalation: {len(reviews)} review(s)'
+        delivered = [self._deliver(EmailMessage(subject, body, self.sender, [email])) for email in recipients]
+        if recipients and not any(delivered):
+            # Nobody got it; leave the reviews unrecorded so the next run tries again.
+            return 0
+        with transaction.atomic():
+            ReviewReminder.objects.bulk_create(
+                [ReviewReminder(review=review, kind='escalated') for review in reviews],
+                ignore_conflicts=True,
+            )
+            Notification.objects.bulk_create([
+                Notification(recipient=editor, message=message, link='/dashboard/') for editor in self.editors
+            ])
+        return len(reviews)
+
+    def _reviewer_message(self, kind, review):
+        title, due = review.manuscript.title, review.due_date.strftime('%Y-%m-%d')
+        if kind == 'due_soon':
+            return f"Reminder: your review of '{title}' is due on {due}."
+        return f"Your review of '{title}' was due on {due} and is now overdue."
+
+    def _reviewer_email(self, kind, review):
+        reviewer = review.reviewer
+        if not reviewer.email:
+            return None
+        prefix = 'Review Reminder' if kind == 'due_soon' else 'Review Overdue'
+        return EmailMessage(
+            f'{prefix}: {review.manuscript.title}',
+            f"Dear {reviewer.get_full_name()},\n\n{self._reviewer_message(kind, review)}\n\n"
+            f"Please log in to the JHST dashboard to complete it.\n\nBest regards,\nJHST Editorial Team",
+            self.sender, [reviewer.email],
+        )
+
+    def _deliver(self, email):
+        """Send one message; True if it went out (or there was no address to send to)."""
+        if email is None:
+            return True
+        email.connection = self.connection
+        try:
+            # Kept open across messages; a no-op once it is.
+            self.connection.open()
+            email.send(fail_silently=False)
+        except Exception as e:
+            self.stderr.write(f'Error sending email to {", ".join(email.to)}: {e}')
+            return False
+        return True
@@ -0,0 +1,171 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from journal.management.utils import percentile
+from journal.models import User, Manuscript, Review, Issue, Article, Notification
+
+
+class Command(BaseCommand):
+    help = 'Exercises the key views through the test client and reports latency and query counts as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed requests per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', action='append', default=[],
+                            help='Run only the named scenario (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        scenarios = self._build_scenarios(rng)
+        if options['only']:
+            unknown = set(options['only']) - {name for name, *_ in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s[0] in options['only']]
+
+        results = {}
+        # The test client talks to "testserver"; emails triggered by views must
+        # never leave the machine during a benchmark.
+        with override_settings(
+            ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            for name, user, paths in scenarios:
+                self.stderr.write(f'Running {name}...')
+                results[name] = self._run(user, paths, options['iterations'], options['warmup'])
+
+        report = {
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'seed': options['seed'],
+            'dataset': {
+                'users': User.objects.count(),
+                'manuscripts': Manuscript.objects.count(),
+                'reviews': Review.objects.count(),
+                'issues': Issue.objects.count(),
+                'articles': Article.objects.count(),
+                'notifications': Notification.objects.count(),
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    def _build_scenarios(self, rng):
+        issue_ids = list(Issue.objects.values_list('id', flat=True))
+        article_ids = list(Article.objects.values_list('id', flat=True))
+        if not issue_ids or not article_ids:
+            raise CommandError('No published articles found; run seed_benchmark first.')
+
+        # Sample a fixed set of targets so every run hits the same rows.
+        issues = [reverse('issue_detail', args=[i]) for i in rng.choices(issue_ids, k=20)]
+        articles = [reverse('article_detail', args=[a]) for a in rng.choices(article_ids, k=20)]
+        keywords = Manuscript.objects.filter(status='published').values_list('keywords', flat=True)[:20]
+        searches = [f"{reverse('search')}?q={k.split(',')[0].strip()}" for k in keywords]
+
+        editor = User.objects.filter(is_editor=True).order_by('id').first()
+        reviewer = (User.objects.filter(is_reviewer=True)
+                    .order_by('-reviews__id').first())
+        researcher = (User.objects.filter(is_researcher=True)
+                      .order_by('-manuscripts__id').first())
+        submitted = list(Manuscript.objects.filter(status='submitted').order_by('id')
+                         .values_list('id', flat=True)[:20])
+
+        scenarios = [
+            ('index', None, [reverse('index')]),
+            ('archives', None, [reverse('archives')]),
+            ('current_issue', None, [reverse('current_issue')]),
+            ('issue_detail', None, issues),
+            ('article_detail', None, articles),
+            ('search', None, searches),
+            ('announcements', None, [reverse('announcements')]),
+        ]
+        if editor:
+            scenarios += [
+                ('editor_dashboard', editor, [reverse('dashboard'), reverse('dashboard') + '?status=submitted']),
+                ('manage_volumes', editor, [reverse('manage_volumes')]),
+            ]
+            if submitted:
+                scenarios.append(('assign_reviewer', editor,
+                                  [reverse('assign_reviewer', args=[m]) for m in submitted]))
+        if reviewer:
+            scenarios += [
+                ('reviewer_dashboard', reviewer, [reverse('dashboard')]),
+                ('assigned_reviews', reviewer, [reverse('assigned_reviews')]),
+            ]
+        if researcher:
+            scenarios += [
+                ('researcher_dashboard', researcher, [reverse('dashboard')]),
+                ('my_submissions', researcher, [reverse('my_submissions')]),
+            ]
+        return scenarios
+
+    def _run(self, user, paths, iterations, warmup):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        for i in range(warmup):
+            client.get(paths[i % len(paths)])
+
+        timings, queries, statuses = [], [], set()
+        for i in range(iterations):
+            path = paths[i % len(paths)]
+            # The query log is a bounded deque; start each request from empty
+            # so heavy pages are not undercounted once it wraps.
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(path)
+                elapsed = (time.perf_counter() - start) * 1000
+            timings.append(elapsed)
+            queries.append(len(ctx.captured_queries))
+            statuses.add(response.status_code)
+
+        return {
+            'requests': iterations,
+            'status_codes': sorted(statuses),
+            'latency_ms': {
+                'p50': round(percentile(timings, 50), 3),
+                'p95': round(percentile(timings, 95), 3),
+                'p99': round(percentile(timings, 99), 3),
+                'mean': round(statistics.fmean(timings), 3),
+                'max': round(max(timings), 3),
+            },
+            'queries': {
+                'min': min(queries),
+                'median': statistics.median(queries),
+                'max': max(queries),
+            },
+        }
+
+    def _git_commit(self):
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
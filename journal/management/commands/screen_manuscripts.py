@@ -0,0 +1,49 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import minhash
+from journal.models import Manuscript, SimilarityFlag
+from journal.similarity import flag_indexed, index_many, manuscript_source
+
+
+class Command(BaseCommand):
+    help = ('Computes MinHash signatures for manuscripts not yet screened, adds them to the LSH index '
+            'and flags near-duplicate pairs across the whole archive')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every signature and every flag')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes computing signatures')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Manuscripts per transaction')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be positive')
+        started = time.monotonic()
+        manuscripts = Manuscript.objects.only('id', 'title', 'abstract', 'file').order_by('id')
+        if options['all']:
+            SimilarityFlag.objects.all().delete()
+        else:
+            manuscripts = manuscripts.filter(signature__isnull=True)
+
+        done, last = 0, 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                chunk = list(manuscripts.filter(id__gt=last)[:options['chunk_size']])
+                if not chunk:
+                    break
+                texts, paths = zip(*(manuscript_source(manuscript) for manuscript in chunk))
+                results = pool.map(minhash.compute, texts, paths,
+                                   chunksize=max(1, len(chunk) // (options['workers'] * 4)))
+                index_many([(manuscript.id, *result) for manuscript, result in zip(chunk, results)])
+                done += len(chunk)
+                last = chunk[-1].id
+                self.stdout.write(f'  {done} manuscript(s) indexed')
+
+        flagged = flag_indexed()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {done} manuscript(s), {flagged} overlapping pair(s) flagged in {time.monotonic() - started:.1f}s'
+        ))
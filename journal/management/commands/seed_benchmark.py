@@ -0,0 +1,279 @@
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from journal.management.utils import manual_timestamps
+from journal.models import (
+    User, Manuscript, Review, Volume, Issue, Article, Notification, Announcement,
+)
+
+# Everything is generated relative to a fixed epoch so two runs with the same
+# seed produce byte-identical datasets, whatever day they are run on.
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+SPAN_DAYS = 5 * 365
+
+WORDS = (
+    'hydrocarbon reservoir porosity permeability seismic drilling petroleum crude '
+    'refinery catalyst emission sediment basin shale sandstone carbonate fluid '
+    'pressure viscosity pipeline corrosion offshore onshore geochemistry kerogen '
+    'maturation simulation modelling inversion recovery enhanced waterflood polymer '
+    'surfactant nanoparticle biodegradation remediation wellbore fracture stimulation '
+    'logging petrophysics stratigraphy facies diagenesis migration trap seal gas '
+    'condensate asphaltene wax emulsion separation distillation cracking upgrading'
+).split()
+
+# Final manuscript states, weighted roughly like a real editorial pipeline.
+STATUS_WEIGHTS = (
+    ('submitted', 15),
+    ('under_review', 20),
+    ('accepted', 5),
+    ('rejected', 35),
+    ('published', 25),
+)
+
+
+class Command(BaseCommand):
+    help = 'Builds a deterministic synthetic dataset for load and query benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--manuscripts', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=None,
+                            help='Defaults to 5 per manuscript')
+        parser.add_argument('--notifications', type=int, default=None,
+                            help='Defaults to 50 per manuscript')
+        parser.add_argument('--researchers', type=int, default=None,
+                            help='Defaults to one per 4 manuscripts')
+        parser.add_argument('--reviewers', type=int, default=None,
+                            help='Defaults to one per 50 manuscripts')
+        parser.add_argument('--editors', type=int, default=10)
+        parser.add_argument('--announcements', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete all journal data before seeding')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        n_manuscripts = options['manuscripts']
+        n_reviews = options['reviews'] if options['reviews'] is not None else n_manuscripts * 5
+        n_notifications = (options['notifications'] if options['notifications'] is not None
+                           else n_manuscripts * 50)
+        n_researchers = options['researchers'] or max(1, n_manuscripts // 4)
+        n_reviewers = options['reviewers'] or max(1, n_manuscripts // 50)
+
+        if options['flush']:
+            self._flush()
+        elif Manuscript.objects.exists() or User.objects.filter(username__startswith='bench_').exists():
+            raise CommandError('Database already contains data; run against an empty database or pass --flush.')
+
+        researchers, reviewers, editors = self._seed_users(n_researchers, n_reviewers, options['editors'])
+        issues = self._seed_volumes(n_manuscripts)
+        manuscripts = self._seed_manuscripts(n_manuscripts, researchers, reviewers)
+        self._seed_reviews(n_reviews, manuscripts, reviewers)
+        self._seed_articles(manuscripts, issues)
+        self._seed_notifications(n_notifications, researchers + reviewers + editors)
+        self._seed_announcements(options['announcements'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(researchers) + len(reviewers) + len(editors)} users, '
+            f'{len(issues)} issues, {n_manuscripts} manuscripts, {n_reviews} reviews, '
+            f'{n_notifications} notifications'
+        ))
+
+    # Helpers
+
+    def _flush(self):
+        self.stdout.write('Flushing existing journal data...')
+        for model in (Notification, Review, Article, Issue, Volume, Manuscript, Announcement):
+            model.objects.all().delete()
+        User.objects.filter(is_superuser=False).delete()
+
+    def _date(self, start=None, max_days=SPAN_DAYS):
+        start = start or EPOCH
+        return start + timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def _words(self, low, high):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def _bulk(self, model, rows, label):
+        created = []
+        for start in range(0, len(rows), self.batch_size):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(rows[start:start + self.batch_size]))
+        self.stdout.write(f'  {label}: {len(created)}')
+        return created
+
+    def _stream(self, model, total, make_row, label):
+        """Create ``total`` rows without holding more than one batch in memory."""
+        done = 0
+        while done < total:
+            size = min(self.batch_size, total - done)
+            with transaction.atomic():
+                model.objects.bulk_create([make_row() for _ in range(size)])
+            done += size
+            self.stdout.write(f'  {label}: {done}/{total}', ending='\r')
+        self.stdout.write(f'  {label}: {total}/{total}')
+
+    def _seed_users(self, n_researchers, n_reviewers, n_editors):
+        # Hashing is deliberately slow, so every benchmark user shares one hash.
+        password = make_password('benchmark')
+
+        def build(prefix, count, **roles):
+            return [
+                User(
+                    username=f'bench_{prefix}{i}',
+                    email=f'{prefix}{i}@bench.jhst.org',
+                    first_name=prefix.title(),
+                    last_name=str(i),
+                    affiliation=f'University {self.rng.randrange(200)}',
+                    password=password,
+                    date_joined=self._date(),
+                    **roles,
+                )
+                for i in range(count)
+            ]
+
+        researchers = self._bulk(User, build('researcher', n_researchers, is_researcher=True), 'researchers')
+        reviewers = self._bulk(User, build('reviewer', n_reviewers, is_reviewer=True), 'reviewers')
+        editors = self._bulk(User, build('editor', n_editors, is_editor=True, is_staff=True), 'editors')
+        return [u.id for u in researchers], [u.id for u in reviewers], [u.id for u in editors]
+
+    def _seed_volumes(self, n_manuscripts):
+        # Roughly 25 articles per issue, four issues a year.
+        n_issues = max(4, n_manuscripts // 100)
+        n_volumes = (n_issues + 3) // 4
+        volumes = self._bulk(Volume, [
+            Volume(number=v + 1, year=EPOCH.year + v) for v in range(n_volumes)
+        ], 'volumes')
+        issues = []
+        for volume in volumes:
+            for number in range(1, 5):
+                if len(issues) < n_issues:
+                    issues.append(Issue(
+                        volume=volume,
+                        number=number,
+                        publication_date=datetime(volume.year, number * 3, 1).date(),
+                    ))
+        return [i.id for i in self._bulk(Issue, issues, 'issues')]
+
+    def _seed_manuscripts(self, total, researchers, reviewers):
+        statuses = [s for s, _ in STATUS_WEIGHTS]
+        weights = [w for _, w in STATUS_WEIGHTS]
+        # A few prolific authors and many occasional ones.
+        author_weights = [1.0 / (rank + 1) for rank in range(len(researchers))]
+        authors = self.rng.choices(researchers, weights=author_weights, k=total)
+
+        summary = []
+        field = Manuscript._meta.get_field('submitted_date')
+        with manual_timestamps(field):
+            for start in range(0, total, self.batch_size):
+                rows = []
+                for author in authors[start:start + self.batch_size]:
+                    status = self.rng.choices(statuses, weights=weights)[0]
+                    rows.append(Manuscript(
+                        title=self._words(4, 12).capitalize(),
+                        abstract=self._words(120, 250),
+                        file='manuscripts/benchmark.docx',
+                        keywords=', '.join(self.rng.sample(WORDS, 5)),
+                        co_authors=', '.join(f'Co Author {self.rng.randrange(5000)}'
+                                             for _ in range(self.rng.randint(0, 4))),
+                        affiliations=f'University {self.rng.randrange(200)}',
+                        author_id=author,
+                        reviewer_id=(self.rng.choice(reviewers)
+                                     if status != 'submitted' else None),
+                        submitted_date=self._date(),
+                        status=status,
+                        is_paid=status == 'published' or (status == 'accepted' and self.rng.random() < 0.5),
+                    ))
+                with transaction.atomic():
+                    created = Manuscript.objects.bulk_create(rows)
+                summary.extend((m.id, m.status, m.submitted_date) for m in created)
+                self.stdout.write(f'  manuscripts: {len(summary)}/{total}', ending='\r')
+        self.stdout.write(f'  manuscripts: {len(summary)}/{total}')
+        return summary
+
+    def _seed_reviews(self, total, manuscripts, reviewers):
+        reviewed = [m for m in manuscripts if m[1] != 'submitted']
+        if not reviewed or not reviewers:
+            return
+        # Workload is skewed too: a core of reviewers handles most requests.
+        reviewer_weights = list(accumulate(1.0 / (rank + 1) ** 0.5 for rank in range(len(reviewers))))
+        recommendations = ('accept', 'revise', 'reject')
+        field = Review._meta.get_field('date_assigned')
+
+        def make_row():
+            manuscript_id, status, submitted = self.rng.choice(reviewed)
+            assigned = submitted + timedelta(days=self.rng.randint(1, 21))
+            completed = None
+            if status != 'under_review' or self.rng.random() < 0.4:
+                completed = assigned + timedelta(days=self.rng.expovariate(1 / 18.0))
+            return Review(
+                manuscript_id=manuscript_id,
+                reviewer_id=self.rng.choices(reviewers, cum_weights=reviewer_weights)[0],
+                date_assigned=assigned,
+                due_date=assigned + timedelta(days=14),
+                date_completed=completed,
+                comments=self._words(30, 120) if completed else '',
+                recommendation=self.rng.choice(recommendations) if completed else '',
+            )
+
+        with manual_timestamps(field):
+            self._stream(Review, total, make_row, 'reviews')
+
+    def _seed_articles(self, manuscripts, issues):
+        published = sorted((m for m in manuscripts if m[1] == 'published'), key=lambda m: m[2])
+        if not published or not issues:
+            return
+        rows = []
+        per_issue = max(1, (len(published) + len(issues) - 1) // len(issues))
+        for index, (manuscript_id, _, _) in enumerate(published):
+            issue_index = min(index // per_issue, len(issues) - 1)
+            page_start = 1 + (index % per_issue) * 12
+            rows.append(Article(
+                manuscript_id=manuscript_id,
+                issue_id=issues[issue_index],
+                page_start=page_start,
+                page_end=page_start + 11,
+                doi=f'10.99999/bench.{manuscript_id}',
+            ))
+        self._bulk(Article, rows, 'articles')
+
+    def _seed_notifications(self, total, recipients):
+        if not recipients:
+            return
+        weights = list(accumulate(1.0 / (rank + 1) for rank in range(len(recipients))))
+        field = Notification._meta.get_field('created_at')
+
+        def make_row():
+            created = self._date()
+            return Notification(
+                recipient_id=self.rng.choices(recipients, cum_weights=weights)[0],
+                message=f'Benchmark notification: {self._words(5, 15)}',
+                # Older notifications are far more likely to have been read.
+                is_read=self.rng.random() < 0.9 if created < EPOCH + timedelta(days=SPAN_DAYS - 60) else False,
+                created_at=created,
+                link='/dashboard/',
+            )
+
+        with manual_timestamps(field):
+            self._stream(Notification, total, make_row, 'notifications')
+
+    def _seed_announcements(self, total):
+        categories = [c for c, _ in Announcement.CATEGORY_CHOICES]
+        self._bulk(Announcement, [
+            Announcement(
+                title=self._words(3, 8).capitalize(),
+                short_description=self._words(15, 30),
+                content=self._words(100, 300),
+                category=self.rng.choice(categories),
+                date_created=self._date(),
+                is_active=self.rng.random() < 0.8,
+            )
+            for _ in range(total)
+        ], 'announcements')
@@ -0,0 +1,179 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from journal.management.utils import percentile
+
+SCHEMA = """
+CREATE TABLE notification (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    is_read BOOLEAN NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX notification_unread ON notification (recipient_id, created_at) WHERE NOT is_read;
+CREATE TABLE manuscript (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+"""
+
+RECIPIENTS = 2000
+
+
+def _connect(path, profile):
+    # Mirror what Django's SQLite backend does with DATABASES["OPTIONS"].
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None,
+                           check_same_thread=False)
+    for name, value in profile['pragmas'].items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def _is_lock_error(exc):
+    message = str(exc)
+    return 'locked' in message or 'busy' in message
+
+
+def _reader(path, profile, deadline, seed):
+    rng = random.Random(seed)
+    conn = _connect(path, profile)
+    latencies, errors = [], 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.execute(
+                'SELECT id, message FROM notification WHERE recipient_id = ? AND NOT is_read '
+                'ORDER BY created_at DESC LIMIT 5', (rng.randrange(RECIPIENTS),)
+            ).fetchall()
+            conn.execute('SELECT COUNT(*) FROM manuscript WHERE status = ?', ('submitted',)).fetchone()
+        except sqlite3.OperationalError as exc:
+            if not _is_lock_error(exc):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return 'read', latencies, errors
+
+
+def _writer(path, profile, deadline, seed):
+    rng = random.Random(seed)
+    conn = _connect(path, profile)
+    latencies, errors = [], 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            # The shape of a submission: read, then write, in one transaction.
+            conn.execute(profile['begin'])
+            conn.execute('SELECT COUNT(*) FROM manuscript WHERE status = ?', ('submitted',)).fetchone()
+            conn.execute("INSERT INTO manuscript (status, title) VALUES ('submitted', 'Stress test')")
+            conn.executemany(
+                "INSERT INTO notification (recipient_id, message, is_read, created_at) "
+                "VALUES (?, 'stress', 0, datetime('now'))",
+                [(rng.randrange(RECIPIENTS),) for _ in range(5)],
+            )
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError as exc:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            if not _is_lock_error(exc):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.002)
+    conn.close()
+    return 'write', latencies, errors
+
+
+def _run_worker(args):
+    kind, path, profile, deadline, seed = args
+    return (_reader if kind == 'read' else _writer)(path, profile, deadline, seed)
+
+
+class Command(BaseCommand):
+    help = ("Runs a mixed read/write load against a scratch SQLite file, once with SQLite's "
+            "defaults and once with the configured pragmas (and again with deferred transactions if "
+            "another transaction_mode is configured), and reports throughput and lock errors")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each run')
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--rows', type=int, default=200000,
+                            help='Notifications preloaded into the scratch database')
+
+    def handle(self, *args, **options):
+        if not settings.SQLITE_PRAGMAS:
+            raise CommandError('SQLITE_PRAGMAS is empty; nothing to compare against the defaults.')
+
+        db_options = settings.DATABASES['default'].get('OPTIONS', {})
+        configured = {
+            'pragmas': settings.SQLITE_PRAGMAS,
+            'timeout': db_options.get('timeout', 5),
+            'begin': f"BEGIN {db_options.get('transaction_mode', 'DEFERRED')}",
+        }
+        profiles = {
+            # What a bare Django SQLite config does.
+            'default': {'pragmas': {}, 'timeout': 5, 'begin': 'BEGIN'},
+            'configured': configured,
+        }
+        if configured['begin'] != 'BEGIN DEFERRED':
+            # The same pragmas without the transaction mode, to show what the mode alone buys.
+            profiles['configured_deferred'] = dict(configured, begin='BEGIN DEFERRED')
+
+        report = {}
+        for name, profile in profiles.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'stress.sqlite3')
+                self._prepare(path, options['rows'])
+                self.stderr.write(f'Running {name} profile for {options["seconds"]}s...')
+                report[name] = self._run(path, profile, options)
+
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+
+    def _prepare(self, path, rows):
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.executescript(SCHEMA)
+        rng = random.Random(0)
+        conn.execute('BEGIN')
+        conn.executemany(
+            "INSERT INTO notification (recipient_id, message, is_read, created_at) "
+            "VALUES (?, 'seed', ?, datetime('now', ?))",
+            ((rng.randrange(RECIPIENTS), rng.random() < 0.9, f'-{i} seconds') for i in range(rows)),
+        )
+        conn.executemany("INSERT INTO manuscript (status, title) VALUES (?, 'seed')",
+                         ((rng.choice(['submitted', 'published']),) for _ in range(rows // 20)))
+        conn.execute('COMMIT')
+        conn.close()
+
+    def _run(self, path, profile, options):
+        # Separate processes, like Passenger workers, so the GIL is not the bottleneck.
+        deadline = time.monotonic() + options['seconds']
+        jobs = ([('read', path, profile, deadline, i) for i in range(options['readers'])] +
+                [('write', path, profile, deadline, 1000 + i) for i in range(options['writers'])])
+        with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+            results = pool.map(_run_worker, jobs)
+
+        summary = {}
+        for kind in ('read', 'write'):
+            latencies = [ms for k, values, _ in results if k == kind for ms in values]
+            errors = sum(e for k, _, e in results if k == kind)
+            summary[kind] = {
+                'completed': len(latencies),
+                'per_second': round(len(latencies) / options['seconds'], 1),
+                'lock_errors': errors,
+                'p50_ms': round(percentile(latencies, 50) or 0, 3),
+                'p99_ms': round(percentile(latencies, 99) or 0, 3),
+            }
+        return summary
@@ -0,0 +1,24 @@
+"""Helpers shared by the management commands."""
+from contextlib import contextmanager
+
+
+@contextmanager
+def manual_timestamps(*fields):
+    """Let bulk_create keep the given dates instead of stamping now() on auto_now_add fields."""
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; stable for the small samples we collect."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
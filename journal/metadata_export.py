@@ -0,0 +1,197 @@
+"""
+Deposit metadata for an issue: Crossref 5.3.1 deposit XML and JATS front matter.
+
+Both formats are generators over a single select_related query read with
+.iterator(), so an issue of any size is written out in one pass. DOIs can be
+filled in from settings.DOI_PREFIX / settings.DOI_PATTERN beforehand.
+"""
+from collections import Counter
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Article
+
+FORMATS = {
+    'crossref': 'application/vnd.crossref.deposit+xml',
+    'jats': 'application/jats+xml',
+}
+
+
+class DOIConflict(Exception):
+    def __init__(self, dois):
+        super().__init__(f"DOI(s) already in use: {', '.join(sorted(dois))}")
+        self.dois = dois
+
+
+def issue_articles(issue):
+    return (Article.objects.filter(issue=issue)
+            .select_related('manuscript__author', 'issue__volume')
+            .order_by('page_start', 'id')
+            .iterator(chunk_size=200))
+
+
+def generate_doi(article_id, issue):
+    return settings.DOI_PATTERN.format(
+        prefix=settings.DOI_PREFIX, volume=issue.volume.number, issue=issue.number, article=article_id,
+    )
+
+
+def assign_dois(issue):
+    """
+    Give every article in ``issue`` without a DOI one built from DOI_PATTERN.
+    All candidates are checked against existing DOIs in one query; on any
+    clash nothing is written and DOIConflict lists the clashing DOIs.
+    Returns the number of DOIs assigned.
+    """
+    if not settings.DOI_PREFIX:
+        raise ValueError('Set DOI_PREFIX (JHST_DOI_PREFIX) to assign DOIs.')
+    missing = list(Article.objects.filter(Q(doi__isnull=True) | Q(doi=''), issue=issue).only('id', 'doi'))
+    if not missing:
+        return 0
+    for article in missing:
+        article.doi = generate_doi(article.id, issue)
+
+    candidates = [article.doi for article in missing]
+    clashes = {doi for doi, n in Counter(candidates).items() if n > 1}
+    clashes |= set(Article.objects.filter(doi__in=candidates).values_list('doi', flat=True))
+    if clashes:
+        raise DOIConflict(clashes)
+    with transaction.atomic():
+        Article.objects.bulk_update(missing, ['doi'], batch_size=500)
+    return len(missing)
+
+
+def _split_name(full_name):
+    parts = full_name.split()
+    if len(parts) < 2:
+        return '', full_name.strip()
+    return ' '.join(parts[:-1]), parts[-1]
+
+
+def _contributors(manuscript):
+    """(given, surname, affiliation) for the author then each co-author."""
+    author = manuscript.author
+    given, surname = author.first_name, author.last_name
+    if not surname:
+        given, surname = _split_name(author.get_full_name() or author.username)
+    people = [(given, surname, author.affiliation)]
+    for name in manuscript.co_authors.split(','):
+        if name.strip():
+            people.append(_split_name(name) + ('',))
+    return people
+
+
+def _article_url(article):
+    return settings.SITE_URL.rstrip('/') + reverse('article_detail', args=[article.id])
+
+
+def _date_parts(value, tag, media_type='online'):
+    return (f'<{tag} media_type="{media_type}"><month>{value.month:02d}</month>'
+            f'<day>{value.day:02d}</day><year>{value.year}</year></{tag}>')
+
+
+def crossref_xml(issue, articles):
+    """Crossref deposit for one issue. Articles without a DOI are left out with a comment."""
+    now = timezone.now()
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield ('<doi_batch version="5.3.1" xmlns="http://www.crossref.org/schema/5.3.1" '
+           'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+           'xmlns:jats="http://www.ncbi.nlm.nih.gov/JATS1" '
+           'xsi:schemaLocation="http://www.crossref.org/schema/5.3.1 '
+           'https://www.crossref.org/schemas/crossref5.3.1.xsd">\n')
+    yield (f'<head><doi_batch_id>jhst-issue-{issue.id}-{now:%Y%m%d%H%M%S}</doi_batch_id>'
+           f'<timestamp>{now:%Y%m%d%H%M%S}</timestamp>'
+           f'<depositor><depositor_name>{escape(settings.JOURNAL_NAME)}</depositor_name>'
+           f'<email_address>{escape(settings.JOURNAL_CONTACT_EMAIL)}</email_address></depositor>'
+           f'<registrant>{escape(settings.JOURNAL_NAME)}</registrant></head>\n')
+    yield '<body><journal>\n'
+    issn = f'<issn media_type="electronic">{escape(settings.JOURNAL_ISSN)}</issn>' if settings.JOURNAL_ISSN else ''
+    yield (f'<journal_metadata language="en"><full_title>{escape(settings.JOURNAL_NAME)}</full_title>'
+           f'<abbrev_title>JHST</abbrev_title>{issn}</journal_metadata>\n')
+    yield (f'<journal_issue>{_date_parts(issue.publication_date, "publication_date")}'
+           f'<journal_volume><volume>{issue.volume.number}</volume></journal_volume>'
+           f'<issue>{issue.number}</issue></journal_issue>\n')
+
+    for article in articles:
+        manuscript = article.manuscript
+        if not article.doi:
+            yield f'<!-- article {article.id} skipped: no DOI -->\n'
+            continue
+        people = []
+        for index, (given, surname, affiliation) in enumerate(_contributors(manuscript)):
+            sequence = 'first' if index == 0 else 'additional'
+            person = f'<person_name sequence="{sequence}" contributor_role="author">'
+            if given:
+                person += f'<given_name>{escape(given)}</given_name>'
+            person += f'<surname>{escape(surname)}</surname>'
+            if affiliation:
+                person += f'<affiliation>{escape(affiliation)}</affiliation>'
+            people.append(person + '</person_name>')
+        pages = ''
+        if article.page_start:
+            pages = f'<pages><first_page>{article.page_start}</first_page>'
+            if article.page_end:
+                pages += f'<last_page>{article.page_end}</last_page>'
+            pages += '</pages>'
+        yield (f'<journal_article publication_type="full_text">'
+               f'<titles><title>{escape(manuscript.title)}</title></titles>'
+               f'<contributors>{"".join(people)}</contributors>'
+               f'<jats:abstract><jats:p>{escape(manuscript.abstract)}</jats:p></jats:abstract>'
+               f'{_date_parts(issue.publication_date, "publication_date")}{pages}'
+               f'<doi_data><doi>{escape(article.doi)}</doi>'
+               f'<resource>{escape(_article_url(article))}</resource></doi_data>'
+               f'</journal_article>\n')
+    yield '</journal></body></doi_batch>\n'
+
+
+def jats_xml(issue, articles):
+    """
+    JATS 1.3 <front> for each article. JATS has no multi-article root, so the
+    articles are wrapped in <articles>; each child is a complete <article>.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<articles xmlns:xlink="http://www.w3.org/1999/xlink">\n'
+    journal = (f'<journal-meta><journal-title-group><journal-title>{escape(settings.JOURNAL_NAME)}'
+               f'</journal-title></journal-title-group>')
+    if settings.JOURNAL_ISSN:
+        journal += f'<issn pub-type="epub">{escape(settings.JOURNAL_ISSN)}</issn>'
+    journal += f'<publisher><publisher-name>{escape(settings.JOURNAL_NAME)}</publisher-name></publisher></journal-meta>'
+    published = issue.publication_date
+
+    for article in articles:
+        manuscript = article.manuscript
+        contribs = ''.join(
+            f'<contrib contrib-type="author"><name><surname>{escape(surname)}</surname>'
+            + (f'<given-names>{escape(given)}</given-names>' if given else '')
+            + '</name>' + (f'<aff>{escape(affiliation)}</aff>' if affiliation else '') + '</contrib>'
+            for given, surname, affiliation in _contributors(manuscript)
+        )
+        doi = f'<article-id pub-id-type="doi">{escape(article.doi)}</article-id>' if article.doi else ''
+        pages = ''
+        if article.page_start:
+            pages = f'<fpage>{article.page_start}</fpage>'
+            if article.page_end:
+                pages += f'<lpage>{article.page_end}</lpage>'
+        keywords = ''.join(f'<kwd>{escape(k.strip())}</kwd>' for k in manuscript.keywords.split(',') if k.strip())
+        yield (f'<article article-type="research-article" dtd-version="1.3" xml:lang="en"><front>{journal}'
+               f'<article-meta>{doi}'
+               f'<title-group><article-title>{escape(manuscript.title)}</article-title></title-group>'
+               f'<contrib-group>{contribs}</contrib-group>'
+               f'<pub-date publication-format="electronic" date-type="pub"><day>{published.day:02d}</day>'
+               f'<month>{published.month:02d}</month><year>{published.year}</year></pub-date>'
+               f'<volume>{issue.volume.number}</volume><issue>{issue.number}</issue>{pages}'
+               f'<self-uri xlink:href="{escape(_article_url(article))}"/>'
+               f'<abstract><p>{escape(manuscript.abstract)}</p></abstract>'
+               + (f'<kwd-group>{keywords}</kwd-group>' if keywords else '')
+               + '</article-meta></front></article>\n')
+    yield '</articles>\n'
+
+
+def export_issue(issue, fmt):
+    writer = crossref_xml if fmt == 'crossref' else jats_xml
+    return writer(issue, issue_articles(issue))
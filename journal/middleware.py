@@ -0,0 +1,85 @@
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .routers import _use_replica, replica_alias
+
+STICKY_COOKIE = 'jhst_primary'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serves anonymous GET/HEAD requests for the public pages listed in
+    settings.REPLICA_VIEWS from the read replica.
+
+    Any other method marks the client "sticky" to the primary for
+    REPLICA_STICKY_SECONDS, so a visitor always reads their own writes even
+    while the replica snapshot is behind.
+
+    Works in both handler modes: under ASGI it stays on the event loop, so
+    the async views behind it never pay for a thread switch here.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django calls process_view in the handler's mode; a sync one would
+            # also set the ContextVar in a worker thread's copy of the context.
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self._reset(request)
+        return self._mark_sticky(request, response)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._reset(request)
+        return self._mark_sticky(request, response)
+
+    def _reset(self, request):
+        token = getattr(request, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+
+    def _mark_sticky(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 30),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Decided here, not in __call__: the URL name is known by now, and the
+        # session/user lookups made by earlier middleware have gone to the primary.
+        if self._may_use_replica(request) and not request.user.is_authenticated:
+            request._replica_token = _use_replica.set(True)
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self._may_use_replica(request) and not (await request.auser()).is_authenticated:
+            request._replica_token = _use_replica.set(True)
+
+    def _may_use_replica(self, request):
+        """Everything but the user check, which differs between the sync and async paths."""
+        alias = replica_alias()
+        if alias is None or request.method not in ('GET', 'HEAD'):
+            return False
+        if request.COOKIES.get(STICKY_COOKIE):
+            return False
+        match = request.resolver_match
+        if match is None or match.url_name not in getattr(settings, 'REPLICA_VIEWS', ()):
+            return False
+        # Until the first refresh_replica run there is nothing to read from.
+        return os.path.exists(settings.READ_REPLICA_PATH)
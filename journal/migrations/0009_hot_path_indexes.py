@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0008_announcement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date_created'], name='announcement_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['publication_date'], name='issue_publication_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manuscript',
+            index=models.Index(fields=['author', 'submitted_date'], name='manuscript_author_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manuscript',
+            index=models.Index(fields=['status', 'submitted_date'], name='manuscript_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient', 'created_at'], name='notification_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewer', 'date_assigned'], name='review_reviewer_assigned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewer', 'date_completed'], name='review_reviewer_completed_idx'),
+        ),
+    ]
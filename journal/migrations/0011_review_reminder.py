@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0010_reviewer_term'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due_soon', 'Due soon'), ('overdue', 'Overdue'), ('escalated', 'Escalated to editors')], max_length=20)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['date_completed', 'due_date'], name='review_open_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='reviewreminder',
+            name='review',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='journal.review'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewreminder',
+            constraint=models.UniqueConstraint(fields=('review', 'kind'), name='review_reminder_unique'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0011_review_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('number', models.PositiveIntegerField()),
+                ('is_dirty', models.BooleanField(default=True)),
+                ('url_count', models.PositiveIntegerField(default=0)),
+                ('lastmod', models.DateField(blank=True, null=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['section', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('section', 'number'), name='sitemap_shard_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0012_sitemap_shard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('downloads', models.PositiveIntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='journal.article')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='article_stat_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'date'), name='article_stat_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0 on 2026-10-19 21:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0014_editorial_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManuscriptSignature',
+            fields=[
+                ('manuscript', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='journal.manuscript')),
+                ('signature', models.BinaryField(null=True)),
+                ('shingle_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('manuscript', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='journal.manuscript')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='lsh_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('manuscript', 'band'), name='lsh_bucket_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarityFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('manuscript', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_flags', to='journal.manuscript')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='journal.manuscript')),
+            ],
+            options={
+                'ordering': ['-similarity'],
+                'constraints': [models.UniqueConstraint(fields=('manuscript', 'match'), name='similarity_flag_unique')],
+            },
+        ),
+    ]
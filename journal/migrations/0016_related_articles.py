@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0015_similarity_screening'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='journal.article')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='journal.article')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['article', '-score'], name='related_article_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'related'), name='related_article_unique')],
+            },
+        ),
+    ]
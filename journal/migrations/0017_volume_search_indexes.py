@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-20 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0016_related_articles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volume',
+            index=models.Index(fields=['number'], name='volume_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volume',
+            index=models.Index(fields=['year'], name='volume_year_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-20 10:05
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def stamp_from_publication(apps, schema_editor):
+    # Harvesters have been given the issue's publication date so far; keep
+    # it for existing records rather than reporting them all as changed today.
+    Article = apps.get_model('journal', 'Article')
+    Issue = apps.get_model('journal', 'Issue')
+    for issue_id, published in Issue.objects.values_list('id', 'publication_date'):
+        stamp = datetime.datetime.combine(published, datetime.time(), tzinfo=datetime.timezone.utc)
+        Article.objects.filter(issue_id=issue_id).update(updated_at=stamp)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0017_volume_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(stamp_from_publication, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['updated_at'], name='article_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-20 14:10
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def stamp_from_creation(apps, schema_editor):
+    # Existing announcements are reported as last changed when they were posted.
+    Announcement = apps.get_model('journal', 'Announcement')
+    Announcement.objects.update(updated_at=F('date_created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0018_article_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(stamp_from_creation, migrations.RunPython.noop),
+    ]
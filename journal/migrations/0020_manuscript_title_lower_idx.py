@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-20 14:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0019_announcement_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='manuscript',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='manuscript_title_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+"""
+MinHash signatures for near-duplicate screening (journal.similarity).
+
+Only NumPy and the standard library: no Django imports, so compute() can run
+in a worker process of its own. The permutations come from a fixed seed; every
+process and every release must produce the same signature for the same text.
+"""
+import hashlib
+import html
+import re
+import zipfile
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Word 5-grams: long enough that shared ones mean shared sentences, not shared vocabulary.
+SHINGLE_SIZE = 5
+MAX_TEXT_CHARS = 2_000_000
+MAX_DOCX_XML_BYTES = 50 * 1024 * 1024
+# Shingles hashed per NumPy block; bounds memory at NUM_PERM * CHUNK values.
+CHUNK = 4096
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_MASK = np.uint64(0xFFFFFFFF)
+_rng = np.random.default_rng(104729)
+# a * x + b stays below 2**64 for 32-bit a, b and x, so nothing wraps.
+_A = _rng.integers(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)[:, None]
+
+WORD_RE = re.compile(r'\w+')
+# Text runs and paragraph ends of word/document.xml.
+DOCX_RE = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>|(</w:p>)')
+
+
+def docx_text(path):
+    """Body text of a .docx, one line per paragraph; '' if the file can't be read."""
+    try:
+        with zipfile.ZipFile(path) as docx:
+            if docx.getinfo('word/document.xml').file_size > MAX_DOCX_XML_BYTES:
+                return ''
+            xml = docx.read('word/document.xml').decode('utf-8', 'replace')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return ''
+    return html.unescape(''.join(text if end is None else '\n' for text, end in DOCX_RE.findall(xml)))
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the distinct word SHINGLE_SIZE-grams of ``text``."""
+    words = WORD_RE.findall(text[:MAX_TEXT_CHARS].lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    grams = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def signature(hashes):
+    """NUM_PERM minimum hash values (uint32) over ``hashes``."""
+    result = np.full(NUM_PERM, _MASK, dtype=np.uint64)
+    for start in range(0, len(hashes), CHUNK):
+        block = hashes[None, start:start + CHUNK]
+        np.minimum(result, ((_A * block + _B) % _PRIME & _MASK).min(axis=1), out=result)
+    return result.astype(np.uint32)
+
+
+def compute(text, path=None):
+    """
+    (signature bytes, shingle count) for ``text`` plus the body of the .docx at
+    ``path``, if any. The signature is None when there is no text at all.
+    """
+    if path and path.lower().endswith('.docx'):
+        text = f'{text}\n{docx_text(path)}'
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None, 0
+    return signature(hashes).tobytes(), len(hashes)
+
+
+def band_hashes(signature_bytes):
+    """One 64-bit bucket id per band. The band number is hashed in, so ids never collide across bands."""
+    values = np.frombuffer(signature_bytes, dtype=np.uint32)
+    return [
+        int.from_bytes(hashlib.blake2b(bytes([band]) + values[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                       digest_size=8).digest(), 'big', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def similarities(signature_bytes, others):
+    """Estimated Jaccard similarity of one signature against each of ``others``."""
+    if not others:
+        return np.zeros(0)
+    matrix = np.frombuffer(b''.join(others), dtype=np.uint32).reshape(len(others), NUM_PERM)
+    return (matrix == np.frombuffer(signature_bytes, dtype=np.uint32)).mean(axis=1)
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -33,6 +34,14 @@ class Manuscript(models.Model):
     keywords = models.CharField(max_length=255, help_text="Comma-separated keywords")
     is_paid = models.BooleanField(default=False, help_text="Has the publication fee been paid?")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'submitted_date'], name='manuscript_author_date_idx'),
+            models.Index(fields=['status', 'submitted_date'], name='manuscript_status_date_idx'),
+            # Admin title search (a case-insensitive prefix, see journal.admin.IndexedSearchMixin).
+            models.Index(Lower('title'), name='manuscript_title_lower_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -67,13 +76,48 @@ class Review(models.Model):
     comments = models.TextField(blank=True)
     recommendation = models.CharField(max_length=20, choices=RECOMMENDATION_CHOICES, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['reviewer', 'date_assigned'], name='review_reviewer_assigned_idx'),
+            models.Index(fields=['reviewer', 'date_completed'], name='review_reviewer_completed_idx'),
+            # review_deadlines: open reviews (date_completed IS NULL) by due date, as one range scan.
+            models.Index(fields=['date_completed', 'due_date'], name='review_open_due_idx'),
+        ]
+
     def __str__(self):
         return f"Review of {self.manuscript.title} by {self.reviewer.username}"
 
+class ReviewReminder(models.Model):
+    """A deadline reminder that has been sent, so review_deadlines never sends it twice."""
+    KIND_CHOICES = [
+        ('due_soon', 'Due soon'),
+        ('overdue', 'Overdue'),
+        ('escalated', 'Escalated to editors'),
+    ]
+
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['review', 'kind'], name='review_reminder_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for review {self.review_id}"
+
 class Volume(models.Model):
     number = models.IntegerField()
     year = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            # Admin search matches either column on its own.
+            models.Index(fields=['number'], name='volume_number_idx'),
+            models.Index(fields=['year'], name='volume_year_idx'),
+        ]
+
     def __str__(self):
         return f"Vol {self.number} ({self.year})"
 
@@ -82,6 +126,11 @@ class Issue(models.Model):
     number = models.IntegerField()
     publication_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['publication_date'], name='issue_publication_date_idx'),
+        ]
+
     def __str__(self):
         return f"Vol {self.volume.number}, Issue {self.number}"
 
@@ -91,6 +140,14 @@ class Article(models.Model):
     page_start = models.IntegerField(null=True, blank=True)
     page_end = models.IntegerField(null=True, blank=True)
     doi = models.CharField(max_length=100, unique=True, blank=True, null=True)
+    # When the record last changed, for OAI-PMH datestamps. Edits to the
+    # manuscript, issue or volume it shows are stamped by journal.signals.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='article_updated_idx'),
+        ]
 
     def __str__(self):
         return self.manuscript.title
@@ -104,6 +161,13 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Partial rather than (recipient, is_read, created_at): Django renders
+            # ``is_read=False`` as ``NOT is_read``, which SQLite can only match
+            # against an index predicate, never against an index column.
+            models.Index(fields=['recipient', 'created_at'], condition=models.Q(is_read=False),
+                         name='notification_unread_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.recipient.username}: {self.message}"
@@ -123,9 +187,15 @@ class Announcement(models.Model):
     image = models.ImageField(upload_to='announcements/', blank=True, null=True)
     date_created = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
+    # For the announcements feed's Last-Modified.
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-date_created']
+        indexes = [
+            models.Index(fields=['date_created'], condition=models.Q(is_active=True),
+                         name='announcement_active_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -174,3 +244,185 @@ class Announcement(models.Model):
         elif self.category == 'maintenance':
             return 'bg-amber-600 text-white'
         return 'bg-gray-600 text-white'
+
+class ReviewerTerm(models.Model):
+    """
+    One row of the reviewer expertise index: how strongly a term features in
+    the manuscripts a reviewer has reviewed. Maintained by journal.recommender.
+    """
+    reviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expertise_terms')
+    term = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+    # Sublinear term frequency, L2-normalised across the reviewer's terms.
+    weight = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'reviewer'], name='reviewer_term_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.reviewer_id})"
+
+class SitemapShard(models.Model):
+    """
+    One gzipped sitemap file covering a fixed id range of one section.
+    Written by journal.sitemaps; ``is_dirty`` is set when rows in the range change.
+    """
+    section = models.CharField(max_length=20)
+    number = models.PositiveIntegerField()
+    is_dirty = models.BooleanField(default=True)
+    url_count = models.PositiveIntegerField(default=0)
+    lastmod = models.DateField(null=True, blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['section', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['section', 'number'], name='sitemap_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.section} #{self.number}"
+
+    @property
+    def filename(self):
+        return f"sitemap-{self.section}-{self.number}.xml.gz"
+
+class ArticleStat(models.Model):
+    """
+    Views and downloads of one article on one day. Written only in batches by
+    journal.stats, never once per request.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    downloads = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'date'], name='article_stat_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='article_stat_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} on {self.date}"
+
+class ManuscriptStatusEvent(models.Model):
+    """
+    Append-only log of manuscript status changes, written alongside every
+    transition (journal.analytics.log_status_changes). ``from_status`` is
+    empty for the submission itself.
+    """
+    manuscript = models.ForeignKey(Manuscript, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, choices=Manuscript.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['manuscript', 'to_status'], name='status_event_manuscript_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.manuscript_id}: {self.from_status or '-'} -> {self.to_status}"
+
+class EditorialMonth(models.Model):
+    """
+    Editorial statistics for one calendar month, folded incrementally from
+    ManuscriptStatusEvent and completed reviews by `aggregate_editorial_stats`.
+    The *_days fields are histograms ({days: count}) so medians stay exact
+    as months are topped up.
+    """
+    month = models.DateField(unique=True, help_text="First day of the month")
+    submissions = models.PositiveIntegerField(default=0)
+    # First decisions only: a manuscript decided twice counts once.
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    published = models.PositiveIntegerField(default=0)
+    decision_days = models.JSONField(default=dict)
+    publication_days = models.JSONField(default=dict)
+    reviews_completed = models.PositiveIntegerField(default=0)
+    review_days = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month']
+
+    def __str__(self):
+        return self.month.strftime('%B %Y')
+
+class AggregationCursor(models.Model):
+    """How far an incremental aggregation job has read: the last event id and review completion time."""
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    last_review_completed = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+class ManuscriptSignature(models.Model):
+    """MinHash signature of a manuscript's title, abstract and .docx body (journal.minhash)."""
+    manuscript = models.OneToOneField(Manuscript, on_delete=models.CASCADE, primary_key=True,
+                                      related_name='signature')
+    # NUM_PERM uint32 values; null when the manuscript has no text to screen.
+    signature = models.BinaryField(null=True)
+    shingle_count = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Signature of {self.manuscript_id}"
+
+class LSHBucket(models.Model):
+    """One band of a signature. Manuscripts sharing any bucket are compared; no others are."""
+    manuscript = models.ForeignKey(Manuscript, on_delete=models.CASCADE, related_name='+')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['manuscript', 'band'], name='lsh_bucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='lsh_bucket_idx'),
+        ]
+
+class SimilarityFlag(models.Model):
+    """A pair of manuscripts whose estimated text overlap reached SIMILARITY_THRESHOLD."""
+    # The later submission; ``match`` is the earlier one it overlaps.
+    manuscript = models.ForeignKey(Manuscript, on_delete=models.CASCADE, related_name='similarity_flags')
+    match = models.ForeignKey(Manuscript, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-similarity']
+        constraints = [
+            models.UniqueConstraint(fields=['manuscript', 'match'], name='similarity_flag_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.manuscript_id} ~ {self.match_id} ({self.similarity:.0%})"
+
+class RelatedArticle(models.Model):
+    """One of an article's nearest neighbours by TF-IDF cosine similarity. Maintained by journal.related."""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'related'], name='related_article_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['article', '-score'], name='related_article_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id} ({self.score:.2f})"
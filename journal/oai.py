@@ -0,0 +1,272 @@
+"""
+OAI-PMH 2.0 data provider for published articles (Dublin Core only).
+
+Responses are streamed: each page is read with ``.iterator()`` and written
+out record by record. Resumption tokens carry the last article id served
+(keyset paging), so records published mid-harvest never shift a page and a
+full harvest holds one page of rows in memory at a time.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.db.models import Min
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Article
+from .streaming import streaming_response
+
+METADATA_FORMATS = {
+    'oai_dc': ('http://www.openarchives.org/OAI/2.0/oai_dc.xsd',
+               'http://www.openarchives.org/OAI/2.0/oai_dc/'),
+}
+
+# Legal arguments per verb, besides ``verb`` itself.
+VERBS = {
+    'Identify': (set(), set()),
+    'ListMetadataFormats': (set(), {'identifier'}),
+    'GetRecord': ({'identifier', 'metadataPrefix'}, set()),
+    'ListIdentifiers': ({'metadataPrefix'}, {'from', 'until', 'set'}),
+    'ListRecords': ({'metadataPrefix'}, {'from', 'until', 'set'}),
+}
+LIST_VERBS = ('ListIdentifiers', 'ListRecords')
+
+
+class OAIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _identifier(article_id):
+    return f'oai:{settings.OAI_REPOSITORY_IDENTIFIER}:article/{article_id}'
+
+
+def _article_id(identifier):
+    prefix = f'oai:{settings.OAI_REPOSITORY_IDENTIFIER}:article/'
+    if identifier.startswith(prefix) and identifier[len(prefix):].isdigit():
+        return int(identifier[len(prefix):])
+    raise OAIError('idDoesNotExist', f'Unknown identifier {identifier}.')
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        # Granularity is YYYY-MM-DD, so finer timestamps are also a bad argument.
+        raise OAIError('badArgument', f'{name} must be a YYYY-MM-DD date.')
+
+
+def _encode_token(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _decode_token(token):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not (isinstance(state, dict) and state.get('p') in METADATA_FORMATS and isinstance(state.get('a'), int)):
+            raise ValueError
+        _parse_date(state.get('f'), 'from')
+        _parse_date(state.get('u'), 'until')
+    except (ValueError, binascii.Error, OAIError):
+        raise OAIError('badResumptionToken', 'The resumptionToken is invalid or has expired.')
+    return state
+
+
+def _articles():
+    return Article.objects.select_related('manuscript__author', 'issue__volume')
+
+
+def _check_arguments(verb, params):
+    if verb not in VERBS:
+        raise OAIError('badVerb', 'Illegal or missing verb.')
+    required, optional = VERBS[verb]
+    given = set(params) - {'verb'}
+    if any(len(params.getlist(key)) > 1 for key in params):
+        raise OAIError('badArgument', 'Arguments may not be repeated.')
+    if verb in LIST_VERBS and 'resumptionToken' in given:
+        if given != {'resumptionToken'}:
+            raise OAIError('badArgument', 'resumptionToken is an exclusive argument.')
+        return
+    if not required <= given:
+        raise OAIError('badArgument', f'Missing argument(s): {", ".join(sorted(required - given))}.')
+    if given - required - optional:
+        raise OAIError('badArgument', f'Illegal argument(s): {", ".join(sorted(given - required - optional))}.')
+    prefix = params.get('metadataPrefix')
+    if prefix is not None and prefix not in METADATA_FORMATS:
+        raise OAIError('cannotDisseminateFormat', f'Unsupported metadataPrefix {prefix}.')
+
+
+def _envelope(request, params, verb, body):
+    base_url = request.build_absolute_uri(reverse('oai_pmh'))
+    # Echo the arguments only for a well-formed request, as the spec asks.
+    attributes = ''.join(f' {key}={quoteattr(value)}' for key, value in sorted(params.items())) if verb else ''
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield ('<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/" '
+           'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+           'xsi:schemaLocation="http://www.openarchives.org/OAI/2.0/ '
+           'http://www.openarchives.org/OAI/2.0/OAI-PMH.xsd">\n')
+    yield f'<responseDate>{timezone.now().strftime("%Y-%m-%dT%H:%M:%SZ")}</responseDate>\n'
+    yield f'<request{attributes}>{escape(base_url)}</request>\n'
+    yield from body
+    yield '</OAI-PMH>\n'
+
+
+def _datestamp(moment):
+    return moment.astimezone(dt_timezone.utc).date().isoformat()
+
+
+def _utc_midnight(day):
+    return datetime.combine(day, time(), tzinfo=dt_timezone.utc)
+
+
+def _header(article):
+    return (f'<header><identifier>{_identifier(article.id)}</identifier>'
+            f'<datestamp>{_datestamp(article.updated_at)}</datestamp></header>')
+
+
+def _dublin_core(request, article):
+    manuscript, issue = article.manuscript, article.issue
+    fields = [('title', manuscript.title)]
+    creators = [manuscript.author.get_full_name() or manuscript.author.username]
+    creators += [name.strip() for name in manuscript.co_authors.split(',') if name.strip()]
+    fields += [('creator', name) for name in creators]
+    fields += [('subject', keyword.strip()) for keyword in manuscript.keywords.split(',') if keyword.strip()]
+    fields += [
+        ('description', manuscript.abstract),
+        ('publisher', settings.JOURNAL_NAME),
+        ('date', issue.publication_date.isoformat()),
+        ('type', 'Text'),
+        ('type', 'info:eu-repo/semantics/article'),
+        ('identifier', request.build_absolute_uri(reverse('article_detail', args=[article.id]))),
+    ]
+    if article.doi:
+        fields.append(('identifier', f'https://doi.org/{article.doi}'))
+    source = f'{settings.JOURNAL_NAME}; Vol. {issue.volume.number}, No. {issue.number} ({issue.volume.year})'
+    if article.page_start and article.page_end:
+        source += f'; {article.page_start}-{article.page_end}'
+    fields += [('source', source), ('language', 'en')]
+
+    body = ''.join(f'<dc:{name}>{escape(value)}</dc:{name}>' for name, value in fields if value)
+    return ('<metadata><oai_dc:dc xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://www.openarchives.org/OAI/2.0/oai_dc/ '
+            f'http://www.openarchives.org/OAI/2.0/oai_dc.xsd">{body}</oai_dc:dc></metadata>')
+
+
+def _identify(request):
+    earliest = Article.objects.aggregate(earliest=Min('updated_at'))['earliest']
+    yield '<Identify>'
+    yield f'<repositoryName>{escape(settings.JOURNAL_NAME)}</repositoryName>'
+    yield f'<baseURL>{escape(request.build_absolute_uri(reverse("oai_pmh")))}</baseURL>'
+    yield '<protocolVersion>2.0</protocolVersion>'
+    yield f'<adminEmail>{escape(settings.JOURNAL_CONTACT_EMAIL)}</adminEmail>'
+    yield f'<earliestDatestamp>{_datestamp(earliest or timezone.now())}</earliestDatestamp>'
+    yield '<deletedRecord>no</deletedRecord>'
+    yield '<granularity>YYYY-MM-DD</granularity>'
+    yield '</Identify>\n'
+
+
+def _list_metadata_formats(params):
+    if 'identifier' in params and not _articles().filter(id=_article_id(params['identifier'])).exists():
+        raise OAIError('idDoesNotExist', f'Unknown identifier {params["identifier"]}.')
+    yield '<ListMetadataFormats>'
+    for prefix, (schema, namespace) in METADATA_FORMATS.items():
+        yield (f'<metadataFormat><metadataPrefix>{prefix}</metadataPrefix><schema>{schema}</schema>'
+               f'<metadataNamespace>{namespace}</metadataNamespace></metadataFormat>')
+    yield '</ListMetadataFormats>\n'
+
+
+def _get_record(request, params):
+    article = _articles().filter(id=_article_id(params['identifier'])).first()
+    if article is None:
+        raise OAIError('idDoesNotExist', f'Unknown identifier {params["identifier"]}.')
+    yield f'<GetRecord><record>{_header(article)}{_dublin_core(request, article)}</record></GetRecord>\n'
+
+
+def _list(request, verb, params):
+    if 'resumptionToken' in params:
+        state = _decode_token(params['resumptionToken'])
+    else:
+        if 'set' in params:
+            raise OAIError('noSetHierarchy', 'This repository does not support sets.')
+        state = {'p': params['metadataPrefix'], 'f': params.get('from'), 'u': params.get('until'), 'a': 0}
+    start, end = _parse_date(state.get('f'), 'from'), _parse_date(state.get('u'), 'until')
+    if start and end and start > end:
+        raise OAIError('badArgument', 'from must not be later than until.')
+
+    articles = _articles().filter(id__gt=state['a']).order_by('id')
+    # Datestamps are UTC days; compare against the instants bounding them so
+    # the updated_at index serves the range.
+    if start:
+        articles = articles.filter(updated_at__gte=_utc_midnight(start))
+    if end:
+        articles = articles.filter(updated_at__lt=_utc_midnight(end + timedelta(days=1)))
+
+    page_size = settings.OAI_PAGE_SIZE
+    # One row past the page tells us whether to hand out a token, without a COUNT.
+    rows = articles[:page_size + 1].iterator(chunk_size=page_size + 1)
+    first = next(rows, None)
+    if first is None:
+        raise OAIError('noRecordsMatch', 'No records match the request.')
+    return _list_body(request, verb, state, first, rows, page_size)
+
+
+def _list_body(request, verb, state, first, rows, page_size):
+    yield f'<{verb}>\n'
+    article, served, last_id = first, 0, None
+    while article is not None:
+        if served == page_size:
+            yield f'<resumptionToken>{_encode_token(dict(state, a=last_id))}</resumptionToken>\n'
+            break
+        if verb == 'ListRecords':
+            yield f'<record>{_header(article)}{_dublin_core(request, article)}</record>\n'
+        else:
+            yield _header(article) + '\n'
+        served, last_id = served + 1, article.id
+        article = next(rows, None)
+    else:
+        if state['a']:
+            # An empty token marks the last page of a resumed list.
+            yield '<resumptionToken/>\n'
+    yield f'</{verb}>\n'
+
+
+def _error(error):
+    yield f'<error code="{error.code}">{escape(error.message)}</error>\n'
+
+
+def respond(request, params):
+    verb = params.get('verb')
+    try:
+        _check_arguments(verb, params)
+        if verb == 'Identify':
+            body = _identify(request)
+        elif verb == 'ListMetadataFormats':
+            body = _list_metadata_formats(params)
+        elif verb == 'GetRecord':
+            body = _get_record(request, params)
+        else:
+            body = _list(request, verb, params)
+        # Errors surface on the first element, before anything is streamed.
+        first = next(body)
+        body = _chain(first, body)
+    except OAIError as error:
+        echo = verb if error.code not in ('badVerb', 'badArgument') else None
+        return _response(request, _envelope(request, params, echo, _error(error)))
+    return _response(request, _envelope(request, params, verb, body))
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _response(request, content):
+    return streaming_response(request, content, content_type='text/xml; charset=utf-8')
@@ -0,0 +1,185 @@
+"""
+Reviewer recommendations from an inverted expertise index.
+
+ReviewerTerm holds, for every reviewer, the terms of the manuscripts they
+have completed reviews for, weighted by TF-IDF and L2-normalised when the
+reviewer's profile is written. A new manuscript is weighted the same way
+with IDF from the current index, so its cosine similarity with a reviewer
+is a plain dot product; that is then divided by a penalty for the
+reviewer's open reviews. Profiles keep the IDF they were written with
+until `build_reviewer_index` refreshes them all.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import User, Review, ReviewerTerm
+from .text import manuscript_terms
+
+# Terms held by more than this share of reviewers say nothing about expertise
+# and would pull the whole pool into the candidate set. Small pools keep them.
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_POOL_FOR_CUTOFF = 50
+# Only the most distinctive query terms are looked up.
+MAX_QUERY_TERMS = 40
+
+
+def _reviewer_count():
+    return User.objects.filter(is_reviewer=True).count() or 1
+
+
+def _idf(document_frequency, total_reviewers):
+    return math.log((1 + total_reviewers) / (1 + document_frequency)) + 1
+
+
+def _index_idf(terms, total_reviewers):
+    """{term: IDF} for ``terms`` over the reviewer profiles currently in the index."""
+    document_frequency = dict(
+        ReviewerTerm.objects.filter(term__in=list(terms))
+        .values('term').annotate(df=Count('id')).values_list('term', 'df')
+    )
+    return {term: _idf(document_frequency.get(term, 0), total_reviewers) for term in terms}
+
+
+def _normalised_weights(counts, idf):
+    weights = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items() if count > 0}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+def _write_reviewer_terms(reviewer_id, counts, idf):
+    weights = _normalised_weights(counts, idf)
+    ReviewerTerm.objects.bulk_create(
+        [ReviewerTerm(reviewer_id=reviewer_id, term=term, count=counts[term], weight=weight)
+         for term, weight in weights.items()],
+        update_conflicts=True,
+        unique_fields=['term', 'reviewer'],
+        update_fields=['count', 'weight'],
+    )
+
+
+def index_review(review):
+    """
+    Fold a newly completed review's manuscript into its reviewer's profile.
+    Only that reviewer's rows are touched, so this is cheap enough to call
+    from the request that completes the review.
+    """
+    manuscript = review.manuscript
+    added = manuscript_terms(manuscript.title, manuscript.abstract, manuscript.keywords)
+    with transaction.atomic():
+        counts = Counter(dict(
+            ReviewerTerm.objects.filter(reviewer_id=review.reviewer_id).values_list('term', 'count')
+        ))
+        counts.update(added)
+        _write_reviewer_terms(review.reviewer_id, counts, _index_idf(counts, _reviewer_count()))
+
+
+def _profiles(rows):
+    """Merge (reviewer id, term counts) rows, grouped by reviewer, into one Counter per reviewer."""
+    # One profile is in memory at a time.
+    current, counts = None, Counter()
+    for reviewer_id, terms in rows:
+        if reviewer_id != current:
+            if current is not None:
+                yield current, counts
+            current, counts = reviewer_id, Counter()
+        counts.update(terms)
+    if current is not None:
+        yield current, counts
+
+
+def rebuild_index(chunk_size=2000):
+    """Rebuild the whole index from completed reviews. Returns the number of reviewers indexed."""
+    def profiles():
+        rows = (Review.objects.filter(date_completed__isnull=False)
+                .order_by('reviewer_id')
+                .values_list('reviewer_id', 'manuscript__title', 'manuscript__abstract', 'manuscript__keywords')
+                .iterator(chunk_size=chunk_size))
+        return _profiles((reviewer_id, manuscript_terms(title, abstract, keywords))
+                         for reviewer_id, title, abstract, keywords in rows)
+
+    # The reviews are read twice: weights need every term's document frequency first.
+    document_frequency = Counter()
+    for _, counts in profiles():
+        document_frequency.update(counts.keys())
+    total_reviewers = _reviewer_count()
+    idf = {term: _idf(df, total_reviewers) for term, df in document_frequency.items()}
+
+    indexed = 0
+    with transaction.atomic():
+        ReviewerTerm.objects.all().delete()
+        for reviewer_id, counts in profiles():
+            _write_reviewer_terms(reviewer_id, counts, idf)
+            indexed += 1
+    return indexed
+
+
+def _co_author_names(manuscript):
+    return {' '.join(name.lower().split()) for name in (manuscript.co_authors or '').split(',') if name.strip()}
+
+
+def recommend_reviewers(manuscript, limit=10, exclude_ids=()):
+    """
+    Top ``limit`` reviewers for ``manuscript`` as User objects annotated with
+    ``match_score`` (TF-IDF similarity), ``pending_reviews`` and ``score``
+    (similarity after the workload penalty).
+    The author, co-authors and ``exclude_ids`` are never suggested.
+    """
+    query = manuscript_terms(manuscript.title, manuscript.abstract, manuscript.keywords)
+    if not query:
+        return []
+
+    total_reviewers = _reviewer_count()
+    document_frequency = dict(
+        ReviewerTerm.objects.filter(term__in=list(query))
+        .values('term').annotate(df=Count('id')).values_list('term', 'df')
+    )
+    cutoff = (MAX_DOCUMENT_FREQUENCY * total_reviewers
+              if total_reviewers >= MIN_POOL_FOR_CUTOFF else total_reviewers)
+    idf = {term: _idf(df, total_reviewers) for term, df in document_frequency.items() if df <= cutoff}
+    if not idf:
+        return []
+
+    query_weights = {term: (1 + math.log(query[term])) * idf[term] for term in idf}
+    query_terms = heapq.nlargest(MAX_QUERY_TERMS, query_weights, key=query_weights.get)
+    query_norm = math.sqrt(sum(query_weights[t] ** 2 for t in query_terms)) or 1.0
+
+    # Stored weights already carry the reviewer side's IDF.
+    similarity = defaultdict(float)
+    for reviewer_id, term, weight in (ReviewerTerm.objects.filter(term__in=query_terms)
+                                      .values_list('reviewer_id', 'term', 'weight')):
+        similarity[reviewer_id] += query_weights[term] * weight
+
+    excluded = set(exclude_ids) | {manuscript.author_id}
+    for reviewer_id in excluded:
+        similarity.pop(reviewer_id, None)
+    if not similarity:
+        return []
+
+    pending = dict(
+        Review.objects.filter(reviewer_id__in=list(similarity), date_completed__isnull=True)
+        .values('reviewer_id').annotate(n=Count('id')).values_list('reviewer_id', 'n')
+    )
+    penalty = getattr(settings, 'REVIEWER_LOAD_PENALTY', 0.25)
+    scores = {
+        reviewer_id: (sim / query_norm) / (1 + penalty * pending.get(reviewer_id, 0))
+        for reviewer_id, sim in similarity.items()
+    }
+
+    # Over-fetch a little: some candidates are dropped as co-authors below.
+    shortlist = heapq.nlargest(limit * 2, scores, key=scores.get)
+    co_authors = _co_author_names(manuscript)
+    reviewers = []
+    for reviewer in User.objects.filter(id__in=shortlist, is_reviewer=True):
+        if co_authors and ' '.join(reviewer.get_full_name().lower().split()) in co_authors:
+            continue
+        reviewer.match_score = similarity[reviewer.id] / query_norm
+        reviewer.pending_reviews = pending.get(reviewer.id, 0)
+        reviewer.score = scores[reviewer.id]
+        reviewers.append(reviewer)
+    reviewers.sort(key=lambda r: r.score, reverse=True)
+    return reviewers[:limit]
@@ -0,0 +1,217 @@
+"""
+Related-article recommendations from precomputed TF-IDF neighbours.
+
+Every published article is a row of a sparse TF-IDF matrix over its title,
+abstract and keywords (journal.text). The TOP_K rows with the highest cosine
+similarity are stored in RelatedArticle, so the article page reads its
+recommendations with one indexed query and never scores anything itself.
+
+The matrix, its vocabulary and the document frequencies are kept in
+RELATED_INDEX_PATH. Publishing vectorises only the new articles against
+them, gives each its own neighbour lists and lets them into the lists of
+existing articles they now beat. Existing rows keep the weights they were
+built with; `build_related_articles` recomputes everything from scratch
+and is run nightly to absorb the drift and any edits.
+"""
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Article, RelatedArticle
+from .text import manuscript_terms
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 5
+# Below this an article shares little more than common vocabulary.
+MIN_SCORE = 0.05
+# Rows scored per block; bounds memory at CHUNK * articles dense scores.
+CHUNK = 256
+
+
+def _documents(articles):
+    """(ids, term counts) of ``articles`` in id order."""
+    rows = (articles.order_by('id')
+            .values_list('id', 'manuscript__title', 'manuscript__abstract', 'manuscript__keywords')
+            .iterator(chunk_size=2000))
+    ids, documents = [], []
+    for article_id, title, abstract, keywords in rows:
+        ids.append(article_id)
+        documents.append(manuscript_terms(title, abstract, keywords))
+    return np.asarray(ids, dtype=np.int64), documents
+
+
+def _count(documents, vocabulary, document_frequency):
+    """Add ``documents`` to ``vocabulary`` (in place) and return the updated document frequencies."""
+    indices = [vocabulary.setdefault(term, len(vocabulary)) for terms in documents for term in terms]
+    added = np.bincount(np.asarray(indices, dtype=np.int64), minlength=len(vocabulary))
+    added[:len(document_frequency)] += document_frequency
+    return added
+
+
+def _weigh(documents, vocabulary, document_frequency, total):
+    """L2-normalised TF-IDF rows (CSR) of ``documents``, idf taken over ``total`` articles."""
+    indptr, indices, counts = [0], [], []
+    for terms in documents:
+        indices.extend(vocabulary[term] for term in terms)
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+    indices = np.asarray(indices, dtype=np.int32)
+    idf = np.log((1 + total) / (1 + document_frequency)) + 1
+    data = (1 + np.log(np.asarray(counts, dtype=np.float64))) * idf[indices]
+    matrix = sparse.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(documents), len(vocabulary)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+@contextmanager
+def _locked():
+    # Publishing in several workers at once must not lose each other's rows of the index.
+    with open(f'{settings.RELATED_INDEX_PATH}.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _load_index():
+    """(matrix, ids, vocabulary, document frequencies) as last saved, or None."""
+    try:
+        with np.load(settings.RELATED_INDEX_PATH) as index:
+            matrix = sparse.csr_matrix((index['data'], index['indices'], index['indptr']),
+                                       shape=tuple(index['shape']))
+            vocabulary = {str(term): position for position, term in enumerate(index['terms'])}
+            return matrix, index['ids'], vocabulary, index['document_frequency']
+    except FileNotFoundError:
+        return None
+
+
+def _save_index(matrix, ids, vocabulary, document_frequency):
+    tmp_path = f'{settings.RELATED_INDEX_PATH}.tmp.npz'
+    np.savez(tmp_path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+             shape=np.asarray(matrix.shape), ids=ids, terms=np.asarray(list(vocabulary), dtype=str),
+             document_frequency=document_frequency)
+    os.replace(tmp_path, settings.RELATED_INDEX_PATH)
+
+
+def _neighbours(matrix, ids, rows, cols):
+    """
+    For each position in ``rows``, its TOP_K best (article id, score) among the
+    positions in ``cols``, itself excluded, best first.
+    """
+    targets = matrix[cols].T.tocsc()
+    col_ids = ids[cols]
+    result = {}
+    for start in range(0, len(rows), CHUNK):
+        block = rows[start:start + CHUNK]
+        scores = (matrix[block] @ targets).toarray()
+        scores[ids[block][:, None] == col_ids[None, :]] = 0
+        if scores.shape[1] > TOP_K:
+            best = np.argpartition(-scores, TOP_K - 1, axis=1)[:, :TOP_K]
+        else:
+            best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        for row, article_id, candidates in zip(scores, ids[block], best):
+            ranked = sorted(((float(row[c]), int(col_ids[c])) for c in candidates if row[c] >= MIN_SCORE),
+                            reverse=True)
+            result[int(article_id)] = [(related_id, score) for score, related_id in ranked]
+    return result
+
+
+def _links(neighbours):
+    return [RelatedArticle(article_id=article_id, related_id=related_id, score=score)
+            for article_id, ranked in neighbours.items() for related_id, score in ranked]
+
+
+def _rebuild():
+    ids, documents = _documents(Article.objects.all())
+    vocabulary = {}
+    document_frequency = _count(documents, vocabulary, np.zeros(0, dtype=np.int64))
+    matrix = _weigh(documents, vocabulary, document_frequency, len(ids))
+    everything = np.arange(len(ids))
+    links = _links(_neighbours(matrix, ids, everything, everything)) if len(ids) else []
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        RelatedArticle.objects.bulk_create(links, batch_size=1000)
+    _save_index(matrix, ids, vocabulary, document_frequency)
+    return len(ids)
+
+
+def rebuild():
+    """Recompute every article's neighbours and the saved index. Returns the number of articles indexed."""
+    with _locked():
+        return _rebuild()
+
+
+def add_articles(article_ids):
+    """
+    Index newly published articles: give each its own neighbours and put it
+    into existing articles' lists where it scores higher than their current ones.
+    Articles already in the index are left alone. Returns the number added.
+    """
+    with _locked():
+        index = _load_index()
+        if index is None:
+            return _rebuild()
+        matrix, ids, vocabulary, document_frequency = index
+        requested = np.setdiff1d(np.asarray(list(article_ids), dtype=np.int64), ids)
+        # Also anything published since the index was saved that a failed update missed.
+        new_ids, documents = _documents(Article.objects.filter(Q(id__in=requested.tolist())
+                                                               | Q(id__gt=ids.max(initial=0))))
+        if not len(new_ids):
+            return 0
+        # Deleted articles stay in the index until the next rebuild, but must not be linked to.
+        alive = np.isin(ids, list(Article.objects.values_list('id', flat=True)))
+        matrix, ids = matrix[alive], ids[alive]
+
+        document_frequency = _count(documents, vocabulary, document_frequency)
+        matrix = sparse.vstack([
+            sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(len(ids), len(vocabulary))),
+            _weigh(documents, vocabulary, document_frequency, len(ids) + len(new_ids)),
+        ]).tocsr()
+        ids = np.concatenate([ids, new_ids])
+        new = np.arange(len(ids) - len(new_ids), len(ids))
+        old = np.arange(len(ids) - len(new_ids))
+        own = _neighbours(matrix, ids, new, np.arange(len(ids)))
+        # The best new articles for each existing one, to merge with its stored list.
+        offers = {article_id: ranked for article_id, ranked in _neighbours(matrix, ids, old, new).items() if ranked}
+
+        current = {}
+        for article_id, related_id, score in (RelatedArticle.objects.filter(article_id__in=list(offers))
+                                              .values_list('article_id', 'related_id', 'score')):
+            current.setdefault(article_id, []).append((related_id, score))
+        merged = {}
+        for article_id, ranked in offers.items():
+            stored = current.get(article_id, [])
+            listed = {related_id for related_id, _ in stored}
+            fresh = [(related_id, score) for related_id, score in ranked if related_id not in listed]
+            best = sorted(stored + fresh, key=lambda pair: pair[1], reverse=True)[:TOP_K]
+            if best != sorted(stored, key=lambda pair: pair[1], reverse=True)[:TOP_K]:
+                merged[article_id] = best
+
+        with transaction.atomic():
+            RelatedArticle.objects.filter(article_id__in=list(own) + list(merged)).delete()
+            RelatedArticle.objects.bulk_create(_links({**own, **merged}), batch_size=1000)
+        _save_index(matrix, ids, vocabulary, document_frequency)
+        return len(own)
+
+
+def index_published(article_ids):
+    """add_articles() for the request that published them; a failure waits for the nightly rebuild."""
+    try:
+        add_articles(article_ids)
+    except Exception:
+        logger.exception('Could not update related articles for %s', list(article_ids))
+
+
+async def arelated_articles(article):
+    """The stored neighbours of ``article`` as RelatedArticle rows, best first, with what the page shows."""
+    links = (RelatedArticle.objects.filter(article=article)
+             .select_related('related__manuscript__author', 'related__issue__volume')[:TOP_K])
+    return [link async for link in links]
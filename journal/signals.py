@@ -0,0 +1,79 @@
+"""Invalidation for data derived from the journal models. Connected in JournalConfig.ready()."""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from .archive import invalidate_archive_tree
+from .backends import invalidate_user
+from .feeds import invalidate_feeds
+from .models import Volume, Issue, Article, Announcement, Manuscript, User
+from .related import index_published
+from .sitemaps import mark_dirty_on_commit
+
+
+def _touch_articles(articles):
+    # What an OAI-PMH record shows changed, so harvesters asking ``from`` today pick it up again.
+    articles.update(updated_at=timezone.now())
+
+
+def archive_changed(sender, **kwargs):
+    # After commit, so a request can't re-cache the tree from the old rows in between.
+    transaction.on_commit(invalidate_archive_tree)
+
+
+def article_changed(sender, instance, **kwargs):
+    mark_dirty_on_commit('articles', [instance.pk])
+    transaction.on_commit(lambda: invalidate_feeds('articles'))
+    if kwargs.get('created'):
+        transaction.on_commit(lambda: index_published([instance.pk]))
+
+
+def issue_changed(sender, instance, **kwargs):
+    mark_dirty_on_commit('issues', [instance.pk])
+    transaction.on_commit(lambda: invalidate_feeds('issues', 'articles'))
+    # Article lastmod comes from the issue's publication date.
+    if kwargs.get('signal') is post_save:
+        mark_dirty_on_commit('articles', instance.articles.values_list('id', flat=True))
+        _touch_articles(instance.articles.all())
+
+
+def announcement_changed(sender, instance, **kwargs):
+    mark_dirty_on_commit('announcements', [instance.pk])
+    transaction.on_commit(lambda: invalidate_feeds('announcements'))
+
+
+def published_manuscript_changed(sender, instance, **kwargs):
+    # Titles, abstracts and keywords of published manuscripts appear in the articles feed.
+    if instance.status == 'published':
+        transaction.on_commit(lambda: invalidate_feeds('articles'))
+        if kwargs.get('signal') is post_save:
+            _touch_articles(Article.objects.filter(manuscript=instance))
+
+
+def volume_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_feeds('issues', 'articles'))
+    if kwargs.get('signal') is post_save:
+        _touch_articles(Article.objects.filter(issue__volume=instance))
+
+
+def user_changed(sender, instance, **kwargs):
+    # Read now: by the time the transaction commits, delete() has set pk to None.
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_user(pk))
+
+
+def _connect(handler, model):
+    for signal in (post_save, post_delete):
+        signal.connect(handler, sender=model,
+                       dispatch_uid=f'journal.{handler.__name__}.{signal is post_save}.{model.__name__}')
+
+
+def connect():
+    for model in (Volume, Issue, Article):
+        _connect(archive_changed, model)
+    _connect(article_changed, Article)
+    _connect(issue_changed, Issue)
+    _connect(announcement_changed, Announcement)
+    _connect(published_manuscript_changed, Manuscript)
+    _connect(volume_changed, Volume)
+    _connect(user_changed, User)
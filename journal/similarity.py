@@ -0,0 +1,144 @@
+"""
+Near-duplicate screening of submissions.
+
+Each manuscript's MinHash signature (journal.minhash) is cut into BANDS
+bucket ids stored in LSHBucket. A manuscript is only ever compared with the
+manuscripts sharing one of its buckets, one indexed lookup, so screening cost
+does not grow with the archive. Pairs whose estimated Jaccard similarity
+reaches SIMILARITY_THRESHOLD become SimilarityFlags for the editors.
+
+Signatures are computed in a process pool, never in the request.
+"""
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+
+from . import minhash
+from .models import LSHBucket, ManuscriptSignature, SimilarityFlag
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def manuscript_source(manuscript):
+    """The (text, path) compute() screens for a manuscript."""
+    path = manuscript.file.path if manuscript.file else None
+    return f'{manuscript.title}\n{manuscript.abstract}', path
+
+
+def _flag(pairs):
+    """Save a flag for each (id, id, similarity) at or above the threshold; returns how many."""
+    flags = [
+        SimilarityFlag(manuscript_id=max(a, b), match_id=min(a, b), similarity=score)
+        for a, b, score in pairs
+        if score >= settings.SIMILARITY_THRESHOLD
+    ]
+    SimilarityFlag.objects.bulk_create(flags, batch_size=500, update_conflicts=True,
+                                       unique_fields=['manuscript', 'match'], update_fields=['similarity'])
+    return len(flags)
+
+
+def _save_signatures(results):
+    """Store signatures and replace their buckets; ``results`` is [(manuscript_id, signature, count)]."""
+    ids = [manuscript_id for manuscript_id, _, _ in results]
+    ManuscriptSignature.objects.bulk_create(
+        [ManuscriptSignature(manuscript_id=manuscript_id, signature=signature, shingle_count=count)
+         for manuscript_id, signature, count in results],
+        batch_size=500, update_conflicts=True, unique_fields=['manuscript'],
+        update_fields=['signature', 'shingle_count', 'computed_at'],
+    )
+    LSHBucket.objects.filter(manuscript_id__in=ids).delete()
+    LSHBucket.objects.bulk_create(
+        [LSHBucket(manuscript_id=manuscript_id, band=band, bucket=bucket)
+         for manuscript_id, signature, _ in results if signature is not None
+         for band, bucket in enumerate(minhash.band_hashes(signature))],
+        batch_size=2000,
+    )
+
+
+def store(manuscript_id, signature, shingle_count):
+    """Index one manuscript and flag its overlaps with everything already indexed."""
+    with transaction.atomic():
+        _save_signatures([(manuscript_id, signature, shingle_count)])
+        if signature is None:
+            return 0
+        candidates = (LSHBucket.objects.filter(bucket__in=minhash.band_hashes(signature))
+                      .exclude(manuscript_id=manuscript_id).values('manuscript_id'))
+        others = list(ManuscriptSignature.objects.filter(manuscript_id__in=candidates)
+                      .values_list('manuscript_id', 'signature'))
+        scores = minhash.similarities(signature, [bytes(other) for _, other in others])
+        return _flag((manuscript_id, other_id, score) for (other_id, _), score in zip(others, scores))
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.SIMILARITY_WORKERS)
+        return _executor
+
+
+def _store_result(manuscript_id, future):
+    # Runs on the executor's result thread, which has database connections of its own.
+    try:
+        store(manuscript_id, *future.result())
+    except Exception:
+        logger.exception('Similarity screening failed for manuscript %s', manuscript_id)
+    finally:
+        connections.close_all()
+
+
+def screen_in_background(manuscript):
+    """Compute the signature in the process pool; index and flag once it is ready."""
+    text, path = manuscript_source(manuscript)
+    future = _pool().submit(minhash.compute, text, path)
+    future.add_done_callback(lambda done: _store_result(manuscript.id, done))
+
+
+def index_many(results):
+    """Backfill: store a chunk of signatures without comparing them yet (see flag_indexed)."""
+    with transaction.atomic():
+        _save_signatures(results)
+
+
+def flag_indexed():
+    """
+    Flag every overlapping pair in the index from the shared buckets alone:
+    only manuscripts that share a bucket are ever compared. Returns the flags written.
+    """
+    shared = (LSHBucket.objects.values('bucket').annotate(n=Count('id')).filter(n__gt=1).values('bucket'))
+    members = defaultdict(set)
+    for bucket, manuscript_id in LSHBucket.objects.filter(bucket__in=shared).values_list('bucket', 'manuscript_id'):
+        members[bucket].add(manuscript_id)
+    pairs = {pair for ids in members.values() for pair in combinations(sorted(ids), 2)}
+    if not pairs:
+        return 0
+    signatures = dict(ManuscriptSignature.objects.filter(manuscript_id__in={i for pair in pairs for i in pair})
+                      .values_list('manuscript_id', 'signature'))
+    by_first = defaultdict(list)
+    for a, b in pairs:
+        by_first[a].append(b)
+    scored = []
+    for a, others in by_first.items():
+        scores = minhash.similarities(bytes(signatures[a]), [bytes(signatures[b]) for b in others])
+        scored.extend(zip([a] * len(others), others, scores))
+    with transaction.atomic():
+        return _flag(scored)
+
+
+def flags_for(manuscript):
+    """Flags involving ``manuscript`` as (other manuscript, similarity, other is earlier), highest first."""
+    flags = (SimilarityFlag.objects.filter(manuscript=manuscript) | SimilarityFlag.objects.filter(match=manuscript))
+    return [
+        (flag.match if flag.manuscript_id == manuscript.id else flag.manuscript, flag.similarity,
+         flag.manuscript_id == manuscript.id)
+        for flag in flags.select_related('manuscript__author', 'match__author')
+    ]
@@ -0,0 +1,185 @@
+"""
+Sitemaps written to disk: a sitemap index plus gzipped shards.
+
+Each section is cut into shards by fixed primary-key ranges
+(SITEMAP_SHARD_SIZE ids per shard), so a row always lives in the same shard
+and a change only dirties that one file. Signals mark shards dirty; the
+build_sitemaps command rewrites the dirty ones and the index.
+"""
+import gzip
+import os
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Article, Issue, Announcement, SitemapShard
+
+INDEX_FILENAME = 'sitemap.xml'
+
+# Public pages with no backing rows; they all fit in shard 0 of 'pages'.
+STATIC_PAGES = [
+    'index', 'about', 'aim_scope', 'editorial_team', 'publication_schedule', 'publication_fees',
+    'contact', 'publications', 'current_issue', 'archives', 'indexing', 'metrics', 'guidelines',
+    'author_guidelines', 'reviewer_guidelines', 'policies', 'ethics_malpractice', 'open_access_policy',
+    'editorial_policy', 'peer_review_policy', 'archiving_policy', 'subscription_advertising',
+    'plagiarism_policy', 'announcements', 'jhst_journals',
+]
+
+
+def _articles(lo, hi):
+    return (Article.objects.filter(id__gte=lo, id__lt=hi).order_by('id')
+            .values_list('id', 'issue__publication_date'))
+
+
+def _issues(lo, hi):
+    return Issue.objects.filter(id__gte=lo, id__lt=hi).order_by('id').values_list('id', 'publication_date')
+
+
+def _announcements(lo, hi):
+    return (Announcement.objects.filter(id__gte=lo, id__lt=hi, is_active=True).order_by('id')
+            .values_list('id', 'date_created'))
+
+
+# section -> (model, rows in an id range as (id, lastmod), URL name)
+SECTIONS = {
+    'articles': (Article, _articles, 'article_detail'),
+    'issues': (Issue, _issues, 'issue_detail'),
+    'announcements': (Announcement, _announcements, 'announcement_detail'),
+}
+
+
+def shard_number(pk):
+    return (pk - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def mark_dirty(section, ids):
+    """Flag the shards holding ``ids`` of ``section`` for regeneration."""
+    numbers = {shard_number(pk) for pk in ids}
+    if not numbers:
+        return
+    SitemapShard.objects.bulk_create(
+        [SitemapShard(section=section, number=number, is_dirty=True) for number in numbers],
+        update_conflicts=True,
+        unique_fields=['section', 'number'],
+        update_fields=['is_dirty'],
+    )
+
+
+def mark_dirty_on_commit(section, ids):
+    ids = list(ids)
+    transaction.on_commit(lambda: mark_dirty(section, ids))
+
+
+def _absolute(path):
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _write_atomic(path, write):
+    tmp_path = f'{path}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_shard(shard, urls):
+    def write(tmp_path):
+        # mtime=0 keeps the bytes identical when nothing changed.
+        with gzip.GzipFile(tmp_path, 'wb', mtime=0) as raw:
+            raw.write(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                      b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for loc, lastmod in urls:
+                entry = f'<url><loc>{escape(loc)}</loc>'
+                if lastmod:
+                    entry += f'<lastmod>{lastmod.isoformat()}</lastmod>'
+                raw.write((entry + '</url>\n').encode())
+            raw.write(b'</urlset>\n')
+    _write_atomic(os.path.join(settings.SITEMAP_ROOT, shard.filename), write)
+
+
+def _shard_urls(shard, stats):
+    """Yield (loc, lastmod) for one shard, recording the count and newest lastmod in ``stats``."""
+    if shard.section == 'pages':
+        for name in STATIC_PAGES:
+            stats['count'] += 1
+            yield _absolute(reverse(name)), None
+        return
+    _, rows, url_name = SECTIONS[shard.section]
+    size = settings.SITEMAP_SHARD_SIZE
+    lo = shard.number * size + 1
+    for pk, lastmod in rows(lo, lo + size).iterator(chunk_size=2000):
+        lastmod = _as_date(lastmod)
+        stats['count'] += 1
+        if lastmod and (stats['lastmod'] is None or lastmod > stats['lastmod']):
+            stats['lastmod'] = lastmod
+        yield _absolute(reverse(url_name, args=[pk])), lastmod
+
+
+def build_shard(shard):
+    # Clear the flag before reading the rows: a change committed while the
+    # file is written marks the shard dirty again instead of being lost.
+    SitemapShard.objects.filter(pk=shard.pk, is_dirty=True).update(is_dirty=False)
+    stats = {'count': 0, 'lastmod': None}
+    try:
+        _write_shard(shard, _shard_urls(shard, stats))
+    except BaseException:
+        mark_dirty(shard.section, [shard.number * settings.SITEMAP_SHARD_SIZE + 1])
+        raise
+    if not stats['count']:
+        # Every row in the range is gone; drop the file rather than list an empty sitemap.
+        os.remove(os.path.join(settings.SITEMAP_ROOT, shard.filename))
+    shard.url_count = stats['count']
+    shard.lastmod = stats['lastmod']
+    shard.generated_at = timezone.now()
+    shard.save(update_fields=['url_count', 'lastmod', 'generated_at'])
+
+
+def build_index():
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                      '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for shard in SitemapShard.objects.filter(url_count__gt=0):
+                out.write(f'<sitemap><loc>{escape(_absolute(reverse("sitemap_file", args=[shard.filename])))}</loc>')
+                if shard.lastmod:
+                    out.write(f'<lastmod>{shard.lastmod.isoformat()}</lastmod>')
+                out.write('</sitemap>\n')
+            out.write('</sitemapindex>\n')
+    _write_atomic(os.path.join(settings.SITEMAP_ROOT, INDEX_FILENAME), write)
+
+
+def ensure_shards():
+    """Create (dirty) shard rows for every id range that has rows but no shard yet."""
+    for section, (model, _, _) in SECTIONS.items():
+        last_id = model.objects.aggregate(last=Max('id'))['last']
+        if last_id:
+            known = set(SitemapShard.objects.filter(section=section).values_list('number', flat=True))
+            missing = set(range(shard_number(last_id) + 1)) - known
+            SitemapShard.objects.bulk_create(
+                [SitemapShard(section=section, number=number) for number in missing],
+                ignore_conflicts=True,
+            )
+    SitemapShard.objects.get_or_create(section='pages', number=0)
+
+
+def build_sitemaps(rebuild_all=False):
+    """Regenerate dirty (or all) shards and the index. Returns the shards written."""
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    ensure_shards()
+    shards = SitemapShard.objects.all() if rebuild_all else SitemapShard.objects.filter(is_dirty=True)
+    built = []
+    for shard in shards:
+        build_shard(shard)
+        built.append(shard)
+    if built or not os.path.exists(os.path.join(settings.SITEMAP_ROOT, INDEX_FILENAME)):
+        build_index()
+    return built
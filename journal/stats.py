@@ -0,0 +1,158 @@
+"""
+Article view and download counting.
+
+Hits are added up in this process's memory, one counter pair per article
+and day, and written to ArticleStat in a single batch at most once every
+STATS_FLUSH_SECONDS (and when the worker exits). A page view never writes
+to the database by itself. Crawlers and prefetches are not counted.
+"""
+import atexit
+import logging
+import re
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .caching import get_or_compute
+from .models import Article, ArticleStat
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('views', 'downloads')
+BOT_PATTERN = re.compile(
+    r'bot|crawl|spider|slurp|archiver|fetch|scrape|monitor|preview|python-requests|curl|wget|httpclient|headless',
+    re.IGNORECASE,
+)
+
+USAGE_CACHE_KEY = 'journal:metrics:usage'
+USAGE_CACHE_TIMEOUT = 15 * 60
+USAGE_DAYS = 30
+TOP_ARTICLES = 10
+
+_lock = threading.Lock()
+# (article_id, date) -> [views, downloads]
+_buffer = {}
+_last_flush = time.monotonic()
+
+
+def is_bot(request):
+    if request.method != 'GET':
+        return True
+    if 'prefetch' in (request.headers.get('Sec-Purpose', '') + request.headers.get('Purpose', '')).lower():
+        return True
+    agent = request.headers.get('User-Agent', '')
+    return not agent or bool(BOT_PATTERN.search(agent))
+
+
+def _count(request, article_id, kind):
+    """Add the hit to the buffer; returns whether a flush is due."""
+    if is_bot(request):
+        return False
+    key = (article_id, timezone.localdate())
+    with _lock:
+        _buffer.setdefault(key, [0, 0])[KINDS.index(kind)] += 1
+        return time.monotonic() - _last_flush >= settings.STATS_FLUSH_SECONDS
+
+
+def record(request, article_id, kind):
+    """Count one view or download of ``article_id``; flushes the buffer when it is due."""
+    if _count(request, article_id, kind):
+        flush()
+
+
+async def arecord(request, article_id, kind):
+    """record() for async views; only the occasional flush leaves the event loop."""
+    if _count(request, article_id, kind):
+        await sync_to_async(flush)()
+
+
+def _write(pending):
+    using = DEFAULT_DB_ALIAS
+    # An article deleted since it was counted would break the foreign key.
+    live = set(Article.objects.using(using).filter(id__in={article_id for article_id, _ in pending})
+               .values_list('id', flat=True))
+    rows = [(views, downloads, article_id, day)
+            for (article_id, day), (views, downloads) in pending.items() if article_id in live]
+    if not rows:
+        return
+    table = connections[using].ops.quote_name(ArticleStat._meta.db_table)
+    with transaction.atomic(using=using):
+        ArticleStat.objects.using(using).bulk_create(
+            [ArticleStat(article_id=article_id, date=day) for _, _, article_id, day in rows],
+            ignore_conflicts=True,
+            batch_size=500,
+        )
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {table} SET views = views + %s, downloads = downloads + %s '
+                f'WHERE article_id = %s AND date = %s',
+                rows,
+            )
+
+
+def flush():
+    """Write the buffered counts. Returns the number of (article, day) rows written."""
+    global _buffer, _last_flush
+    with _lock:
+        pending, _buffer = _buffer, {}
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    try:
+        _write(pending)
+    except DatabaseError:
+        logger.exception('Could not flush article stats; keeping them for the next flush')
+        with _lock:
+            for key, (views, downloads) in pending.items():
+                counts = _buffer.setdefault(key, [0, 0])
+                counts[0] += views
+                counts[1] += downloads
+        return 0
+    return len(pending)
+
+
+atexit.register(flush)
+
+
+def _usage_summary():
+    today = timezone.localdate()
+    since = today - timedelta(days=USAGE_DAYS - 1)
+    year = ArticleStat.objects.filter(date__gt=today - timedelta(days=365)).aggregate(
+        views=Sum('views'), downloads=Sum('downloads'))
+
+    per_day = {row['date']: row for row in ArticleStat.objects.filter(date__gte=since)
+               .values('date').annotate(views=Sum('views'), downloads=Sum('downloads'))}
+    days = []
+    for offset in range(USAGE_DAYS):
+        day = since + timedelta(days=offset)
+        row = per_day.get(day, {})
+        days.append({'date': day, 'views': row.get('views', 0), 'downloads': row.get('downloads', 0)})
+    peak = max([day['views'] + day['downloads'] for day in days] + [1])
+    for day in days:
+        day['views_pct'] = round(100 * day['views'] / peak, 1)
+        day['downloads_pct'] = round(100 * day['downloads'] / peak, 1)
+
+    top = list(ArticleStat.objects.filter(date__gte=since).values('article')
+               .annotate(views=Sum('views'), downloads=Sum('downloads'))
+               .order_by('-views', '-downloads', 'article')[:TOP_ARTICLES])
+    titles = dict(Article.objects.filter(id__in=[row['article'] for row in top])
+                  .values_list('id', 'manuscript__title'))
+    return {
+        'views': year['views'] or 0,
+        'downloads': year['downloads'] or 0,
+        'days': days,
+        'top_articles': [{'id': row['article'], 'title': titles.get(row['article'], ''),
+                          'views': row['views'], 'downloads': row['downloads']} for row in top],
+        'generated_at': timezone.now(),
+    }
+
+
+def usage_summary():
+    """Twelve-month totals, the last USAGE_DAYS days and the top articles, for the metrics page."""
+    return get_or_compute(USAGE_CACHE_KEY, _usage_summary, USAGE_CACHE_TIMEOUT, stale=USAGE_CACHE_TIMEOUT)
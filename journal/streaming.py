@@ -0,0 +1,29 @@
+"""
+StreamingHttpResponse for bodies that query as they go (exports, OAI-PMH lists).
+
+Under ASGI Django reads a synchronous iterator with sync_to_async(list), so
+the whole body would be built in memory before the first byte is sent. There
+the iterator is wrapped in an async one that builds a batch of chunks at a
+time in the request's sync thread, the one the view's queries ran on.
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+# Chunks built per trip to the sync thread.
+BATCH_SIZE = 100
+
+
+async def _aiter(iterator):
+    next_batch = sync_to_async(lambda: list(islice(iterator, BATCH_SIZE)))
+    while batch := await next_batch():
+        for chunk in batch:
+            yield chunk
+
+
+def streaming_response(request, content, **kwargs):
+    if isinstance(request, ASGIRequest):
+        content = _aiter(iter(content))
+    return StreamingHttpResponse(content, **kwargs)
@@ -1,3 +1,659 @@
-from django.test import TestCase
+import csv
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import analytics, caching, minhash, similarity, stats
+from .archive import ARCHIVE_TAG
+from .backends import CachedModelBackend
+from .cache_backend import SQLiteCache
+from .caching import get_or_compute, invalidate_tags
+from .feeds import feed_tag
+from .models import (
+    Article, ArticleStat, EditorialMonth, Issue, Manuscript, ManuscriptStatusEvent, Notification, RelatedArticle,
+    Review, ReviewReminder, SimilarityFlag, SitemapShard, User, Volume,
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def _manuscript(author, **fields):
+    fields.setdefault('title', 'A study of reservoir pressure')
+    return Manuscript.objects.create(author=author, abstract='Abstract.', keywords='oil', file='manuscripts/m.docx',
+                                     **fields)
+
+
+class MedianTests(SimpleTestCase):
+    def test_odd_histogram(self):
+        self.assertEqual(analytics.median({'1': 2, '10': 1}), 1)
+        self.assertEqual(analytics.median({'3': 1, '1': 1, '7': 1}), 3)
+
+    def test_even_histogram_averages_the_middle_pair(self):
+        self.assertEqual(analytics.median({'2': 1, '4': 1}), 3)
+        self.assertEqual(analytics.median({'1': 1, '2': 1}), 1.5)
+        self.assertEqual(analytics.median({'5': 2}), 5)
+
+    def test_empty_histogram(self):
+        self.assertIsNone(analytics.median({}))
+        self.assertIsNone(analytics.median({'4': 0}))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AggregateTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author', is_researcher=True)
+        submitted = timezone.now() - timedelta(days=40)
+        for status in ('accepted', 'rejected'):
+            manuscript = _manuscript(author, status=status)
+            Manuscript.objects.filter(pk=manuscript.pk).update(submitted_date=submitted)
+            ManuscriptStatusEvent.objects.create(manuscript=manuscript, to_status='submitted', created_at=submitted)
+            ManuscriptStatusEvent.objects.create(manuscript=manuscript, from_status='under_review',
+                                                 to_status=status, created_at=submitted + timedelta(days=10))
+
+    def _months(self):
+        return list(EditorialMonth.objects.order_by('month').values(
+            'month', 'submissions', 'accepted', 'rejected', 'published', 'decision_days', 'publication_days',
+            'reviews_completed', 'review_days'))
+
+    def test_rerunning_folds_nothing_twice(self):
+        self.assertEqual(analytics.aggregate(), (4, 0))
+        first = self._months()
+        self.assertEqual(sum(month['submissions'] for month in first), 2)
+        self.assertEqual(sum(month['accepted'] + month['rejected'] for month in first), 2)
+
+        self.assertEqual(analytics.aggregate(), (0, 0))
+        self.assertEqual(self._months(), first)
+
+
+class MinHashTests(TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        words = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(400)]
+        self.text = ' '.join(rng.choice(words) for _ in range(600))
+        edited = self.text.split()
+        edited[300] = 'changed'
+        self.near_copy = ' '.join(edited)
+        self.unrelated = ' '.join(rng.choice(words) for _ in range(600))
+
+    def test_near_identical_texts_share_a_band(self):
+        original, _ = minhash.compute(self.text)
+        copy, _ = minhash.compute(self.near_copy)
+        other, _ = minhash.compute(self.unrelated)
+        self.assertTrue(set(minhash.band_hashes(original)) & set(minhash.band_hashes(copy)))
+        self.assertFalse(set(minhash.band_hashes(original)) & set(minhash.band_hashes(other)))
+        self.assertGreater(minhash.similarities(original, [copy])[0], 0.9)
+
+    def test_near_identical_submission_is_flagged(self):
+        author = User.objects.create_user('author', is_researcher=True)
+        first, copy, other = (_manuscript(author) for _ in range(3))
+        self.assertEqual(similarity.store(first.id, *minhash.compute(self.text)), 0)
+        self.assertEqual(similarity.store(other.id, *minhash.compute(self.unrelated)), 0)
+        self.assertEqual(similarity.store(copy.id, *minhash.compute(self.near_copy)), 1)
+
+        flag = SimilarityFlag.objects.get()
+        self.assertEqual((flag.manuscript_id, flag.match_id), (copy.id, first.id))
+        self.assertGreater(flag.similarity, 0.9)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StatsFlushTests(TestCase):
+    def setUp(self):
+        stats.flush()
+        author = User.objects.create_user('author', is_researcher=True)
+        issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                     publication_date=date(2020, 1, 1))
+        self.article = Article.objects.create(manuscript=_manuscript(author, status='published'), issue=issue)
+        self.request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0')
+
+    def test_failed_flush_keeps_its_counts(self):
+        stats.record(self.request, self.article.id, 'views')
+        stats.record(self.request, self.article.id, 'views')
+        stats.record(self.request, self.article.id, 'downloads')
+
+        with mock.patch.object(stats, '_write', side_effect=DatabaseError('locked')), \
+                self.assertLogs('journal.stats', 'ERROR'):
+            self.assertEqual(stats.flush(), 0)
+        self.assertFalse(ArticleStat.objects.exists())
+
+        stats.record(self.request, self.article.id, 'views')
+        self.assertEqual(stats.flush(), 1)
+        row = ArticleStat.objects.get(article=self.article)
+        self.assertEqual((row.views, row.downloads), (3, 1))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedUserTests(TestCase):
+    def test_deleted_user_is_not_served_from_the_cache(self):
+        user = User.objects.create_user('reader')
+        backend = CachedModelBackend()
+        self.assertEqual(backend.get_user(user.pk), user)
+
+        pk = user.pk
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            user.delete()
+        self.assertIsNone(backend.get_user(pk))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkEditorViewTests(TestCase):
+    def setUp(self):
+        # Ids repeat between tests, so a user cached by an earlier test would fail the session hash check.
+        cache.clear()
+        self.editor = User.objects.create_user('editor', is_editor=True)
+        self.reviewer = User.objects.create_user('reviewer', email='reviewer@example.org', is_reviewer=True)
+        author = User.objects.create_user('author', email='author@example.org', is_researcher=True)
+        self.manuscripts = [_manuscript(author, title=f'Paper {n}') for n in range(2)]
+        self.own = _manuscript(self.reviewer, title='By the reviewer')
+        self.client.force_login(self.editor)
+
+    def _post(self, name, **data):
+        data.setdefault('manuscript_ids', [m.id for m in self.manuscripts + [self.own]])
+        return self.client.post(f'/bulk/{name}/', data)
+
+    def test_assign_reviewer_skips_authors_and_existing_assignments(self):
+        response = self._post('assign_reviewer', reviewer=self.reviewer.id, due_date='2030-01-31')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Review.objects.filter(reviewer=self.reviewer).count(), 2)
+        self.assertFalse(Review.objects.filter(manuscript=self.own).exists())
+        self.assertEqual(set(Manuscript.objects.filter(reviews__isnull=False).values_list('status', flat=True)),
+                         {'under_review'})
+        self.assertEqual(len(mail.outbox), 1)
+
+        self._post('assign_reviewer', reviewer=self.reviewer.id)
+        self.assertEqual(Review.objects.filter(reviewer=self.reviewer).count(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_assign_reviewer_rejects_bad_input(self):
+        self.assertEqual(self._post('assign_reviewer', reviewer='x').status_code, 400)
+        self.assertEqual(self._post('assign_reviewer').status_code, 400)
+        self.assertEqual(self._post('assign_reviewer', reviewer=self.editor.id).status_code, 404)
+        self.assertEqual(self._post('assign_reviewer', reviewer=self.reviewer.id, due_date='31/01/2030').status_code,
+                         400)
+        self.assertFalse(Review.objects.exists())
+
+    def test_non_editors_change_nothing(self):
+        self.client.force_login(self.reviewer)
+        self._post('assign_reviewer', reviewer=self.reviewer.id)
+        self._post('make_decision', decision='accepted')
+        self.assertFalse(Review.objects.exists())
+        self.assertFalse(Manuscript.objects.exclude(status='submitted').exists())
+
+    def test_make_decision(self):
+        self._post('make_decision', decision='accepted', manuscript_ids=[m.id for m in self.manuscripts])
+        self.assertEqual(Manuscript.objects.filter(status='accepted').count(), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+        self._post('make_decision', decision='published')
+        self.assertEqual(Manuscript.objects.filter(status='accepted').count(), 2)
+
+    def test_publish_continues_the_issue_page_numbers(self):
+        issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                     publication_date=date(2020, 1, 1))
+        Manuscript.objects.filter(pk__in=[m.pk for m in self.manuscripts]).update(status='accepted')
+        Article.objects.create(manuscript=self.own, issue=issue, page_start=1, page_end=8)
+
+        self.assertEqual(self._post('publish_articles', issue='x').status_code, 400)
+        self.assertEqual(self._post('publish_articles', issue=issue.id + 1).status_code, 404)
+        self._post('publish_articles', issue=issue.id, pages_per_article=5)
+        pages = list(Article.objects.filter(manuscript__in=self.manuscripts)
+                     .order_by('page_start').values_list('page_start', 'page_end'))
+        self.assertEqual(pages, [(9, 13), (14, 18)])
+        self.assertEqual(Manuscript.objects.filter(status='published').count(), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ReconcileTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author', is_researcher=True)
+        reviewer = User.objects.create_user('reviewer', is_reviewer=True)
+        issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                     publication_date=date(2020, 1, 1))
+        self.unpublished = _manuscript(author, status='accepted')
+        self.article = Article.objects.create(manuscript=self.unpublished, issue=issue)
+        self.unreviewed = _manuscript(author, status='under_review')
+        self.blank_review = Review.objects.create(manuscript=_manuscript(author, status='under_review'),
+                                                  reviewer=reviewer, date_completed=timezone.now())
+
+    def _reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile', *args, '--check', 'published_status', '--check', 'under_review_without_reviews',
+                     '--check', 'completed_review_without_recommendation', stdout=out)
+        return out.getvalue()
+
+    def _statuses(self):
+        return dict(Manuscript.objects.values_list('id', 'status'))
+
+    def test_dry_run_changes_nothing(self):
+        before = self._statuses()
+        output = self._reconcile('--dry-run')
+        self.assertIn('Found 2 problem(s)', output)
+        self.assertEqual(self._statuses(), before)
+
+    def test_fixes_statuses_and_refreshes_what_shows_them(self):
+        builds = []
+        cached = lambda: get_or_compute('test:derived', lambda: builds.append(1), 60,
+                                        tags=[feed_tag('articles'), ARCHIVE_TAG])
+        cached()
+        stamped = Article.objects.get().updated_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            output = self._reconcile()
+        self.assertIn('Fixed 2 problem(s)', output)
+        self.assertIn('1 row(s) need fixing by hand', output)
+        self.assertEqual(Manuscript.objects.get(pk=self.unpublished.pk).status, 'published')
+        self.assertEqual(Manuscript.objects.get(pk=self.unreviewed.pk).status, 'submitted')
+        self.assertEqual(Review.objects.get().recommendation, '')
+        self.assertEqual(set(ManuscriptStatusEvent.objects.values_list('from_status', 'to_status')),
+                         {('accepted', 'published'), ('under_review', 'submitted')})
+
+        cached()
+        self.assertEqual(len(builds), 2)
+        self.assertGreater(Article.objects.get().updated_at, stamped)
+        self.assertTrue(SitemapShard.objects.get(section='articles').is_dirty)
+
+        self.assertIn('Fixed 0 problem(s)', self._reconcile())
+
+    def test_moves_only_old_unreferenced_media(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            os.makedirs(os.path.join(root, 'manuscripts'))
+            old = time.time() - 2 * 60 * 60
+            for name, mtime in (('m.docx', old), ('orphan.docx', old), ('uploading.docx', time.time())):
+                path = os.path.join(root, 'manuscripts', name)
+                open(path, 'w').close()
+                os.utime(path, (mtime, mtime))
+
+            call_command('reconcile', '--check', 'orphaned_media', stdout=StringIO())
+            self.assertEqual(sorted(os.listdir(os.path.join(root, 'manuscripts'))), ['m.docx', 'uploading.docx'])
+            self.assertTrue(os.path.exists(os.path.join(root, 'orphaned', 'manuscripts', 'orphan.docx')))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ALLOWED_HOSTS=['*'])
+class FeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('author', is_researcher=True)
+        issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                     publication_date=date(2020, 1, 1))
+        self.articles = [Article.objects.create(manuscript=_manuscript(author, status='published', title=f'Paper {n}'),
+                                                issue=issue) for n in range(2)]
+        self.edited = timezone.now() - timedelta(days=3)
+        Article.objects.filter(pk=self.articles[0].pk).update(updated_at=self.edited - timedelta(days=1))
+        Article.objects.filter(pk=self.articles[1].pk).update(updated_at=self.edited)
+
+    def test_conditional_get(self):
+        response = self.client.get('/feeds/articles/rss/', HTTP_HOST='evil.example')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Last-Modified'], http_date(self.edited.timestamp()))
+        self.assertIn(b'https://jhst.org/', response.content)
+        self.assertNotIn(b'evil.example', response.content)
+
+        for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+            revalidated = self.client.get('/feeds/articles/rss/', **headers)
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.content, b'')
+
+    def test_editing_an_older_item_moves_last_modified(self):
+        response = self.client.get('/feeds/articles/atom/')
+        manuscript = self.articles[0].manuscript
+        manuscript.title = 'Paper 0, revised'
+        with self.captureOnCommitCallbacks(execute=True):
+            manuscript.save()
+
+        changed = self.client.get('/feeds/articles/atom/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(b'Paper 0, revised', changed.content)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AdminSearchTests(TestCase):
+    def test_manuscript_autocomplete_matches_a_title_prefix(self):
+        cache.clear()
+        admin = User.objects.create_superuser('admin', 'admin@example.org', 'pw')
+        match = _manuscript(admin, title='Reservoir pressure in tight sands')
+        _manuscript(admin, title='A study of reservoir pressure')
+        self.client.force_login(admin)
+
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'journal', 'model_name': 'review', 'field_name': 'manuscript', 'term': 'reservoir p'})
+        self.assertEqual([result['id'] for result in response.json()['results']], [str(match.id)])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsgiStreamingTests(TestCase):
+    async def test_oai_body_is_streamed_by_an_async_iterator(self):
+        response = await self.async_client.get('/oai/', {'verb': 'Identify'})
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b'<Identify>', body)
+        self.assertTrue(body.endswith(b'</OAI-PMH>\n'))
+
+
+OAI = '{http://www.openarchives.org/OAI/2.0/}'
+
+
+@override_settings(CACHES=LOCMEM_CACHE, OAI_PAGE_SIZE=2)
+class OAIPMHTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author', is_researcher=True)
+        issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                     publication_date=date(2020, 1, 1))
+        self.articles = [Article.objects.create(manuscript=_manuscript(author, status='published'), issue=issue)
+                         for _ in range(3)]
+        Article.objects.filter(pk=self.articles[0].pk).update(
+            updated_at=datetime(2021, 3, 1, 23, 30, tzinfo=dt_timezone.utc))
+        Article.objects.exclude(pk=self.articles[0].pk).update(
+            updated_at=datetime(2021, 3, 2, 0, 30, tzinfo=dt_timezone.utc))
+
+    def _oai(self, **params):
+        response = self.client.get('/oai/', params)
+        self.assertEqual(response.status_code, 200)
+        return ElementTree.fromstring(b''.join(response.streaming_content))
+
+    def _error(self, **params):
+        error = self._oai(**params).find(f'{OAI}error')
+        return error.get('code') if error is not None else None
+
+    def _identifiers(self, root):
+        return [element.text for element in root.iter(f'{OAI}identifier')]
+
+    def test_argument_errors(self):
+        self.assertEqual(self._error(verb='Nope'), 'badVerb')
+        self.assertEqual(self._error(verb='ListRecords'), 'badArgument')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='oai_dc', extra='1'), 'badArgument')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix=['oai_dc', 'oai_dc']), 'badArgument')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='oai_dc', resumptionToken='x'),
+                         'badArgument')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='marc'), 'cannotDisseminateFormat')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='oai_dc', set='a'), 'noSetHierarchy')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='oai_dc', **{'from': '2021-03-01T00:00:00Z'}),
+                         'badArgument')
+        self.assertEqual(self._error(verb='ListRecords', metadataPrefix='oai_dc',
+                                     **{'from': '2021-03-02', 'until': '2021-03-01'}), 'badArgument')
+        self.assertEqual(self._error(verb='ListIdentifiers', resumptionToken='not-a-token'), 'badResumptionToken')
+        self.assertEqual(self._error(verb='GetRecord', metadataPrefix='oai_dc', identifier='oai:jhst.org:article/0'),
+                         'idDoesNotExist')
+        self.assertEqual(self._error(verb='ListIdentifiers', metadataPrefix='oai_dc', **{'from': '2030-01-01'}),
+                         'noRecordsMatch')
+
+    def test_resumption_tokens_page_through_every_record(self):
+        root = self._oai(verb='ListIdentifiers', metadataPrefix='oai_dc')
+        identifiers = self._identifiers(root)
+        token = root.find(f'.//{OAI}resumptionToken').text
+        self.assertEqual(len(identifiers), 2)
+
+        root = self._oai(verb='ListIdentifiers', resumptionToken=token)
+        identifiers += self._identifiers(root)
+        self.assertIsNone(root.find(f'.//{OAI}resumptionToken').text)
+        self.assertEqual(identifiers, [f'oai:jhst.org:article/{article.id}' for article in self.articles])
+
+    def test_from_and_until_select_utc_days(self):
+        def harvested(**dates):
+            return self._identifiers(self._oai(verb='ListIdentifiers', metadataPrefix='oai_dc', **dates))
+
+        self.assertEqual(harvested(until='2021-03-01'), [f'oai:jhst.org:article/{self.articles[0].id}'])
+        self.assertEqual(len(harvested(**{'from': '2021-03-02'})), 2)
+        datestamps = [element.text for element in self._oai(
+            verb='GetRecord', metadataPrefix='oai_dc',
+            identifier=f'oai:jhst.org:article/{self.articles[0].id}').iter(f'{OAI}datestamp')]
+        self.assertEqual(datestamps, ['2021-03-01'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class APITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('author', first_name='Ada', last_name='Lovelace', is_researcher=True)
+        self.issue = Issue.objects.create(volume=Volume.objects.create(number=1, year=2020), number=1,
+                                          publication_date=date(2020, 1, 1))
+        self.articles = [Article.objects.create(manuscript=_manuscript(author, title=f'Paper {n}', status='published'),
+                                                issue=self.issue) for n in range(5)]
+
+    def _get(self, path, **params):
+        response = self.client.get(path, params)
+        return response, response.json()
+
+    def test_cursor_pages_through_every_article(self):
+        seen = []
+        response, payload = self._get('/api/v1/articles/', limit=2, fields='id,title')
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen += payload['data']
+            if payload['next'] is None:
+                break
+            self.assertTrue(payload['next'].startswith('https://jhst.org/api/v1/articles/?'))
+            response = self.client.get(payload['next'].removeprefix('https://jhst.org'))
+            payload = response.json()
+        self.assertEqual(seen, [{'id': a.id, 'title': a.manuscript.title} for a in self.articles])
+
+    def test_bad_arguments_are_400_and_not_cached(self):
+        for params in ({'fields': 'id,secret'}, {'cursor': '!!'}, {'limit': 'ten'}, {'issue': 'x'}):
+            response = self.client.get('/api/v1/articles/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+            self.assertIn('no-store', response['Cache-Control'])
+        self.assertEqual(self.client.get(f'/api/v1/articles/{self.articles[-1].id + 1}/').status_code, 404)
+
+    def test_revalidation_is_a_304_without_queries(self):
+        response, payload = self._get('/api/v1/issues/')
+        self.assertEqual(payload['data'][0]['article_count'], 5)
+        with CaptureQueriesContext(connection) as queries:
+            revalidated = self.client.get('/api/v1/issues/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.articles[0].delete()
+        changed = self.client.get('/api/v1/issues/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['data'][0]['article_count'], 4)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, REVIEW_REMINDER_DAYS=3, REVIEW_ESCALATION_DAYS=7)
+class ReviewDeadlineTests(TestCase):
+    def setUp(self):
+        User.objects.create_user('editor', email='editor@example.org', is_editor=True)
+        author = User.objects.create_user('author', is_researcher=True)
+        reviewer = User.objects.create_user('reviewer', email='reviewer@example.org', is_reviewer=True)
+        now = timezone.now()
+        for days in (1, -2, -30):
+            Review.objects.create(manuscript=_manuscript(author), reviewer=reviewer, due_date=now + timedelta(days=days))
+        Review.objects.create(manuscript=_manuscript(author), reviewer=reviewer, due_date=now - timedelta(days=30),
+                              date_completed=now, recommendation='accept')
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('review_deadlines', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_reruns_send_nothing_twice(self):
+        self.assertIn('Would send 4 reminder(s)', self._run('--dry-run'))
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertIn('Sent 4 reminder(s)', self._run())
+        self.assertEqual(sorted(ReviewReminder.objects.values_list('kind', flat=True)),
+                         ['due_soon', 'escalated', 'overdue', 'overdue'])
+        # Three reviewer reminders and one digest for the editor.
+        self.assertEqual(len(mail.outbox), 4)
+
+        self.assertIn('Sent 0 reminder(s)', self._run())
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(ReviewReminder.objects.count(), 4)
+
+    def test_failed_mail_is_retried_by_the_next_run(self):
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('connection refused')):
+            self.assertIn('Sent 0 reminder(s)', self._run())
+        self.assertFalse(ReviewReminder.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+        self.assertIn('Sent 4 reminder(s)', self._run())
+        self.assertEqual(len(mail.outbox), 4)
+
+
+def _race(workers, target):
+    """Run ``target`` in ``workers`` threads released together; return the results."""
+    barrier = threading.Barrier(workers)
+    results = [None] * workers
+
+    def run(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SQLiteCache(os.path.join(directory.name, 'cache.sqlite3'), {})
+
+    def test_add_only_replaces_an_expired_entry(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+
+        self.cache.set('key', 'expired', 0)
+        self.assertTrue(self.cache.add('key', 'third'))
+        self.assertEqual(self.cache.get('key'), 'third')
+
+    def test_concurrent_adds_have_one_winner(self):
+        # Each thread has its own connection, as separate worker processes would.
+        for attempt in range(5):
+            won = _race(8, lambda: self.cache.add(f'lock:{attempt}', 1))
+            self.assertEqual(won.count(True), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def _compute(self, value='value', delay=0):
+        def compute():
+            self.calls.append(value)
+            time.sleep(delay)
+            return value
+        return compute
+
+    def _expire(self, key):
+        entry = cache.get(key)
+        entry['fresh_until'] = 0
+        cache.set(key, entry)
+
+    def test_concurrent_misses_compute_once(self):
+        results = _race(8, lambda: get_or_compute('test:key', self._compute(delay=0.2), 60))
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_stale_entry_is_served_while_another_request_refreshes(self):
+        get_or_compute('test:key', self._compute('old'), 60, stale=60)
+        self._expire('test:key')
+
+        cache.add(caching._lock_key('test:key'), 1)
+        self.assertEqual(get_or_compute('test:key', self._compute('new'), 60, stale=60), 'old')
+        self.assertEqual(self.calls, ['old'])
+
+        cache.delete(caching._lock_key('test:key'))
+        self.assertEqual(get_or_compute('test:key', self._compute('new'), 60, stale=60), 'new')
+        self.assertEqual(get_or_compute('test:key', self._compute('newer'), 60, stale=60), 'new')
+        self.assertFalse(cache.has_key(caching._lock_key('test:key')))
+
+    def test_invalidated_tag_forces_a_rebuild(self):
+        get_or_compute('test:key', self._compute('old'), 60, tags=['thing'])
+        invalidate_tags('thing')
+        self.assertEqual(get_or_compute('test:key', self._compute('new'), 60, tags=['thing']), 'new')
+
+    def test_failed_compute_releases_the_lock(self):
+        with self.assertRaises(ZeroDivisionError):
+            get_or_compute('test:key', lambda: 1 / 0, 60)
+        self.assertEqual(get_or_compute('test:key', self._compute(), 60), 'value')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ImportArchiveTests(TestCase):
+    COLUMNS = ['title', 'author_name', 'author_email', 'volume', 'year', 'issue', 'publication_date', 'doi', 'file',
+               'abstract', 'keywords']
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        for name in ('media', 'files'):
+            os.makedirs(os.path.join(self.root, name))
+        settings = override_settings(MEDIA_ROOT=os.path.join(self.root, 'media'),
+                                     RELATED_INDEX_PATH=os.path.join(self.root, 'related.npz'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for name in ('a.pdf', 'copy-of-a.pdf'):
+            with open(os.path.join(self.root, 'files', name), 'wb') as f:
+                f.write(b'%PDF same bytes')
+        self.existing = User.objects.create_user('ada', email='Ada@Example.org', is_researcher=True)
+
+        row = dict(author_name='Ada Lovelace', author_email='ada@example.org', volume='3', year='1990', issue='1',
+                   publication_date='1990-03-01', abstract='Pressure transients in reservoirs.', keywords='oil, gas')
+        self.manifest = os.path.join(self.root, 'manifest.csv')
+        with open(self.manifest, 'w', newline='') as f:
+            writer = csv.DictWriter(f, self.COLUMNS, restval='')
+            writer.writeheader()
+            writer.writerows([
+                dict(row, title='Reservoir pressure', doi='10.1/a', file='files/a.pdf'),
+                dict(row, title='Well testing', doi='10.1/b', file='files/copy-of-a.pdf'),
+                dict(row, title='Gas lift', author_name='Grace Hopper', author_email='grace@example.org', issue='2',
+                     publication_date='1990-06-01'),
+                dict(row, title='Same DOI again', doi='10.1/a'),
+                dict(row, title='Missing file', file='files/none.pdf'),
+                dict(row, title=''),
+            ])
+
+    def _import(self, *args):
+        out = StringIO()
+        call_command('import_archive', self.manifest, *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        self.assertIn('3 new article(s) to import', self._import('--dry-run'))
+        self.assertFalse(Article.objects.exists())
+
+    def test_imports_once(self):
+        self.assertIn('Imported 3 article(s)', self._import('--chunk-size', '2'))
+        articles = Article.objects.select_related('manuscript__author', 'issue__volume').order_by('id')
+        self.assertEqual([a.manuscript.title for a in articles], ['Reservoir pressure', 'Well testing', 'Gas lift'])
+        self.assertEqual({(a.issue.volume.number, a.issue.number) for a in articles}, {(3, 1), (3, 2)})
+        self.assertEqual(articles[0].manuscript.author, self.existing)
+        self.assertEqual(articles[2].manuscript.author.get_full_name(), 'Grace Hopper')
+        self.assertFalse(articles[2].manuscript.author.has_usable_password())
+        self.assertEqual(set(Manuscript.objects.values_list('status', flat=True)), {'published'})
+        self.assertEqual(ManuscriptStatusEvent.objects.count(), 6)
+        # Identical files are stored once, under their content hash.
+        self.assertEqual(articles[0].manuscript.file.name, articles[1].manuscript.file.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'media', 'manuscripts', 'archive'))), 1)
+        self.assertTrue(SitemapShard.objects.filter(section='articles', is_dirty=True).exists())
+        self.assertTrue(RelatedArticle.objects.exists())
+
+        self.assertIn('0 new article(s) to import', self._import())
+        self.assertEqual(Article.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 2)
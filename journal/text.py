@@ -0,0 +1,51 @@
+"""
+Text normalisation shared by the similarity features (reviewer matching,
+related articles, duplicate screening).
+"""
+import re
+from collections import Counter
+
+STOPWORDS = frozenset("""
+a about above after again against all also although among an and any are as at be because
+been before being between both but by can could did do does doing during each either et
+from further had has have having here how however if in into is it its itself may more most
+much must no nor not of off on once only or other our out over own paper per results same
+shall should show shown so some study such than that the their them then there these they
+this those through thus to too under until upon using used very via was we were what when
+where whether which while who whom why will with within without would
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9\-]{2,}")
+MAX_TERM_LENGTH = 100
+
+# How much a term counts depending on where it appears.
+KEYWORD_WEIGHT = 3
+TITLE_WEIGHT = 2
+ABSTRACT_WEIGHT = 1
+
+
+def tokenize(text):
+    """Lower-cased word tokens of three or more characters, stopwords removed."""
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def normalize_keywords(keywords):
+    """Split a comma/semicolon separated keyword field into normalised phrases."""
+    phrases = []
+    for raw in re.split(r'[,;]', keywords or ''):
+        phrase = ' '.join(raw.lower().split())
+        if phrase and len(phrase) <= MAX_TERM_LENGTH:
+            phrases.append(phrase)
+    return phrases
+
+
+def manuscript_terms(title, abstract, keywords):
+    """Weighted bag of terms describing one manuscript."""
+    terms = Counter()
+    for phrase in normalize_keywords(keywords):
+        terms[phrase] += KEYWORD_WEIGHT
+    for token in tokenize(title):
+        terms[token] += TITLE_WEIGHT
+    for token in tokenize(abstract):
+        terms[token] += ABSTRACT_WEIGHT
+    return terms
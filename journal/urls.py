@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api
 from .forms import UserLoginForm
 from django.contrib.auth import views as auth_views
 from django.views.generic import TemplateView
@@ -15,19 +15,28 @@ urlpatterns = [
     path('dashboard/my-submissions/<int:manuscript_id>/', views.my_submission_detail, name='my_submission_detail'),
     path('dashboard/review-assignment/<int:manuscript_id>/', views.reviewer_manuscript_detail, name='reviewer_manuscript_detail'),
     path('dashboard/assigned-reviews/', views.assigned_reviews, name='assigned_reviews'),
+    path('dashboard/analytics/', views.editorial_analytics, name='editorial_analytics'),
     path('profile/', views.profile, name='profile'),
     path('submit/', views.submit_manuscript, name='submit_manuscript'),
     path('assign_reviewer/<int:manuscript_id>/', views.assign_reviewer, name='assign_reviewer'),
+    path('reviewers/lookup/', views.reviewer_lookup, name='reviewer_lookup'),
     path('submit_review/<int:manuscript_id>/', views.submit_review, name='submit_review'),
     path('make_decision/<int:manuscript_id>/', views.make_decision, name='make_decision'),
     path('publish_article/<int:manuscript_id>/', views.publish_article, name='publish_article'),
     path('mark_as_paid/<int:manuscript_id>/', views.mark_as_paid, name='mark_as_paid'),
+    path('bulk/assign_reviewer/', views.bulk_assign_reviewer, name='bulk_assign_reviewer'),
+    path('bulk/make_decision/', views.bulk_make_decision, name='bulk_make_decision'),
+    path('bulk/publish_articles/', views.bulk_publish_articles, name='bulk_publish_articles'),
+    path('export/<slug:dataset>/', views.editorial_export, name='editorial_export'),
     path('create_issue/', views.create_issue, name='create_issue'),
     path('create_volume/', views.create_volume, name='create_volume'),
     path('manage_volumes/', views.manage_volumes, name='manage_volumes'),
     path('manage_volumes/issue/<int:issue_id>/', views.manage_issue, name='manage_issue'),
+    path('manage_volumes/issue/<int:issue_id>/metadata/', views.export_issue_metadata, name='export_issue_metadata'),
+    path('manage_volumes/issue/<int:issue_id>/assign_dois/', views.assign_issue_dois, name='assign_issue_dois'),
     path('issues/<int:issue_id>/', views.issue_detail, name='issue_detail'),
     path('article/<int:article_id>/', views.article_detail, name='article_detail'),
+    path('article/<int:article_id>/download/', views.article_download, name='article_download'),
     path('search/', views.search, name='search'),
     path('notifications/read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
 
@@ -42,8 +51,20 @@ urlpatterns = [
     path('publications/current/', views.current_issue, name='current_issue'),
     path('publications/archives/', views.archives, name='archives'),
     path('indexing/', TemplateView.as_view(template_name='journal/indexing.html'), name='indexing'),
+    path('oai/', views.oai_pmh, name='oai_pmh'),
+    path('feeds/<slug:kind>/<slug:fmt>/', views.syndication_feed, name='syndication_feed'),
 
-    path('metrics/', TemplateView.as_view(template_name='journal/metrics.html'), name='metrics'),
+    # Read-only JSON API
+    path('api/v1/articles/', api.article_list, name='api_articles'),
+    path('api/v1/articles/<int:article_id>/', api.article_detail, name='api_article_detail'),
+    path('api/v1/issues/', api.issue_list, name='api_issues'),
+    path('api/v1/issues/<int:issue_id>/', api.issue_detail, name='api_issue_detail'),
+    path('api/v1/volumes/', api.volume_list, name='api_volumes'),
+    path('api/v1/search/', api.search, name='api_search'),
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path('sitemaps/<str:filename>', views.sitemap_file, name='sitemap_file'),
+
+    path('metrics/', views.metrics, name='metrics'),
     path('guidelines/', TemplateView.as_view(template_name='journal/guidelines.html'), name='guidelines'),
     path('guidelines/author/', TemplateView.as_view(template_name='journal/author_guidelines.html'), name='author_guidelines'),
     path('guidelines/reviewer/', TemplateView.as_view(template_name='journal/reviewer_guidelines.html'), name='reviewer_guidelines'),
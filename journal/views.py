@@ -1,13 +1,31 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import os
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Max, Count, Avg, F, Prefetch
+from django.http import JsonResponse, FileResponse, Http404, HttpResponseBadRequest
 from django.contrib import messages
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
+from django.views.decorators.http import require_POST, require_http_methods
+from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from .forms import ResearcherRegistrationForm, ManuscriptForm, ReviewForm, VolumeForm, IssueForm, UserProfileForm
-from .models import Manuscript, Review, User, Issue, Article, Volume, Notification, Announcement
+from .models import Manuscript, Review, User, Issue, Article, Notification, Announcement
+from .recommender import index_review, recommend_reviewers
+from .related import index_published, arelated_articles
+from .archive import aget_archive_tree, get_archive_tree, invalidate_archive_tree
+from .analytics import editorial_summary, log_status_change, log_status_changes
+from . import oai, stats
+from .similarity import flags_for, screen_in_background
+from .streaming import streaming_response
+from .feeds import FEEDS, FORMATS as FEED_FORMATS, feed_response, invalidate_feeds
+from .exports import COLUMNS as EXPORT_COLUMNS, FORMATS as EXPORT_FORMATS, export_rows, stream as stream_export
+from .sitemaps import INDEX_FILENAME, mark_dirty_on_commit
+from .metadata_export import FORMATS as METADATA_FORMATS, DOIConflict, assign_dois, export_issue
 
 def _send_notification_email(subject, message, recipient_list):
     """
@@ -22,6 +40,21 @@ def _send_notification_email(subject, message, recipient_list):
         print(f"Error sending email: {e}")
 
 
+def _send_notification_emails(batch):
+    """
+    Send many (subject, message, recipient_list) emails over one connection.
+    Used by the bulk editorial actions; errors are printed like the single helper.
+    """
+    if not batch:
+        return
+    try:
+        sender = getattr(settings, 'EMAIL_HOST_USER', 'noreply@jhst.org')
+        send_mass_mail([(subject, message, sender, recipients) for subject, message, recipients in batch],
+                       fail_silently=False)
+    except Exception as e:
+        print(f"Error sending emails: {e}")
+
+
 def register(request):
     if request.method == 'POST':
         form = ResearcherRegistrationForm(request.POST)
@@ -52,35 +85,45 @@ def profile(request):
 
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 
+def _filtered_submissions(request):
+    """
+    The editor dashboard's manuscript list, filtered by ?status=, ?search= and
+    ordered by ?sort=. Returns (queryset, status, search, sort); also used by
+    the exports so a download matches what the editor is looking at.
+    """
+    submissions_list = Manuscript.objects.all()
+
+    # Filtering
+    status_filter = request.GET.get('status')
+    if status_filter and status_filter != 'all':
+        submissions_list = submissions_list.filter(status=status_filter)
+
+    # Search
+    search_query = request.GET.get('search')
+    if search_query:
+        submissions_list = submissions_list.filter(
+            Q(title__icontains=search_query) | 
+            Q(author__username__icontains=search_query)
+        )
+
+    # Sorting
+    sort_by = request.GET.get('sort', 'date_desc')
+    if sort_by == 'date_asc':
+        submissions_list = submissions_list.order_by('submitted_date')
+    elif sort_by == 'title':
+        submissions_list = submissions_list.order_by('title')
+    else: # date_desc
+        submissions_list = submissions_list.order_by('-submitted_date')
+
+    return submissions_list, status_filter, search_query, sort_by
+
 @login_required
 def dashboard(request):
     # Always get personal submissions
     my_submissions = Manuscript.objects.filter(author=request.user).order_by('-submitted_date')
 
     if request.user.is_editor:
-        submissions_list = Manuscript.objects.all()
-        
-        # Filtering
-        status_filter = request.GET.get('status')
-        if status_filter and status_filter != 'all':
-            submissions_list = submissions_list.filter(status=status_filter)
-            
-        # Search
-        search_query = request.GET.get('search')
-        if search_query:
-            submissions_list = submissions_list.filter(
-                Q(title__icontains=search_query) | 
-                Q(author__username__icontains=search_query)
-            )
-            
-        # Sorting
-        sort_by = request.GET.get('sort', 'date_desc')
-        if sort_by == 'date_asc':
-            submissions_list = submissions_list.order_by('submitted_date')
-        elif sort_by == 'title':
-            submissions_list = submissions_list.order_by('title')
-        else: # date_desc
-            submissions_list = submissions_list.order_by('-submitted_date')
+        submissions_list, status_filter, search_query, sort_by = _filtered_submissions(request)
 
         # Pagination
         paginator = Paginator(submissions_list, 10) # 10 items per page
@@ -97,13 +140,18 @@ def dashboard(request):
         
         return render(request, 'dashboard/editor_dashboard.html', {
             'submissions': submissions,
+            # Choices for the bulk action bar; reviewers come from reviewer_lookup.
+            'issues': Issue.objects.select_related('volume').order_by('-publication_date'),
             'my_submissions': my_submissions,
             'unassigned_count': unassigned_count,
             'total_count': total_count,
             'notifications': Notification.objects.filter(recipient=request.user, is_read=False)[:5],
             'current_status': status_filter,
             'current_sort': sort_by,
-            'current_search': search_query
+            'current_search': search_query,
+            'export_query': urlencode({key: value for key, value in (
+                ('status', status_filter), ('search', search_query), ('sort', sort_by)) if value}),
+            'export_datasets': [('manuscripts', 'Manuscripts'), ('reviews', 'Reviews'), ('articles', 'Articles')],
         })
     elif request.user.is_reviewer:
         # Check if user is a reviewer
@@ -221,30 +269,38 @@ def submit_manuscript(request):
         if form.is_valid():
             manuscript = form.save(commit=False)
             manuscript.author = request.user
-            manuscript.save()
-            
+
+            # Keep the write transaction short: rows only, emails afterwards.
+            with transaction.atomic():
+                manuscript.save()
+                log_status_change(manuscript, '', request.user)
+                # Duplicate screening runs in a worker process once the row is committed.
+                transaction.on_commit(lambda: screen_in_background(manuscript))
+
+                # In-app notification for Author
+                Notification.objects.create(
+                    recipient=manuscript.author,
+                    message=f"Submission Received: Your manuscript '{manuscript.title}' has been successfully submitted.",
+                    link='/dashboard/my-submissions/'
+                )
+
+                # Notify Editors
+                Notification.objects.bulk_create([
+                    Notification(
+                        recipient=editor,
+                        message=f"New Submission: '{manuscript.title}' by {manuscript.author.get_full_name()}.",
+                        link='/dashboard/'
+                    )
+                    for editor in User.objects.filter(is_editor=True)
+                ])
+
             # Send notification to author
             _send_notification_email(
                 f"Submission Received: {manuscript.title}",
                 f"Dear {manuscript.author.get_full_name()},\n\nYour manuscript '{manuscript.title}' has been successfully submitted to JHST. You can track its status in your dashboard.\n\nBest regards,\nJHST Editorial Team",
                 [manuscript.author.email]
             )
-            
-            # In-app notification for Author
-            Notification.objects.create(
-                recipient=manuscript.author,
-                message=f"Submission Received: Your manuscript '{manuscript.title}' has been successfully submitted.",
-                link='/dashboard/my-submissions/'
-            )
-            
-            # Notify Editors
-            for editor in User.objects.filter(is_editor=True):
-                 Notification.objects.create(
-                    recipient=editor,
-                    message=f"New Submission: '{manuscript.title}' by {manuscript.author.get_full_name()}.",
-                    link='/dashboard/'
-                )
-            
+
             messages.success(request, "Your manuscript has been submitted successfully!")
             return redirect('dashboard')
         else:
@@ -261,7 +317,7 @@ def assign_reviewer(request, manuscript_id):
     manuscript = get_object_or_404(Manuscript, id=manuscript_id)
     
     # Get all reviews for this manuscript to see who is already assigned
-    existing_reviews = Review.objects.filter(manuscript=manuscript)
+    existing_reviews = Review.objects.filter(manuscript=manuscript).select_related('reviewer')
     assigned_reviewer_ids = existing_reviews.values_list('reviewer_id', flat=True)
     
     if request.method == 'POST':
@@ -278,36 +334,130 @@ def assign_reviewer(request, manuscript_id):
                 else:
                     due_date = timezone.now().date() + timezone.timedelta(days=14)
                 
-                Review.objects.create(manuscript=manuscript, reviewer=reviewer, due_date=due_date)
-                
+                with transaction.atomic():
+                    Review.objects.create(manuscript=manuscript, reviewer=reviewer, due_date=due_date)
+
+                    # In-app notification for Reviewer
+                    Notification.objects.create(
+                        recipient=reviewer,
+                        message=f"New Review Assignment: You have been assigned to review '{manuscript.title}'. Due in 14 days.",
+                        link='/dashboard/'
+                    )
+
+                    # Update manuscript status if it was just submitted
+                    previous_status = manuscript.status
+                    manuscript.status = 'under_review'
+                    manuscript.save(update_fields=['status'])
+                    log_status_change(manuscript, previous_status, request.user)
+
                 # Notify Reviewer
                 _send_notification_email(
                     f"Review Invitation: {manuscript.title}",
                     f"Dear {reviewer.get_full_name()},\n\nYou have been assigned to review the manuscript: '{manuscript.title}'.\nPlease log in to the JHST dashboard to accept and complete this review by {due_date.strftime('%Y-%m-%d')}.\n\nBest regards,\nJHST Editorial Team",
                     [reviewer.email]
                 )
-
-                # In-app notification for Reviewer
-                Notification.objects.create(
-                    recipient=reviewer,
-                    message=f"New Review Assignment: You have been assigned to review '{manuscript.title}'. Due in 14 days.",
-                    link='/dashboard/'
-                )
-                
-            # Update manuscript status if it was just submitted
-                manuscript.status = 'under_review'
-                manuscript.save()
             
             messages.success(request, f"Reviewer {reviewer.username} assigned successfully.")
             return redirect('dashboard')
     
-    # Filter out reviewers who are already assigned
-    reviewers = User.objects.filter(is_reviewer=True).exclude(id__in=assigned_reviewer_ids)
-    
+    # The reviewer picker itself is loaded page by page from reviewer_lookup.
     return render(request, 'dashboard/assign_reviewer.html', {
         'manuscript': manuscript, 
-        'reviewers': reviewers, 
-        'existing_reviews': existing_reviews
+        'existing_reviews': existing_reviews,
+        'suggested_reviewers': recommend_reviewers(manuscript, limit=5, exclude_ids=assigned_reviewer_ids),
+    })
+
+@login_required
+def editorial_analytics(request):
+    if not request.user.is_editor:
+        return redirect('dashboard')
+    # Summary rows only; `aggregate_editorial_stats` keeps them current.
+    return render(request, 'dashboard/editorial_analytics.html', {'summary': editorial_summary()})
+
+REVIEWER_LOOKUP_PAGE_SIZE = 20
+
+@login_required
+def editorial_export(request, dataset):
+    if not request.user.is_editor:
+        return redirect('dashboard')
+    fmt = request.GET.get('format', 'csv')
+    if dataset not in EXPORT_COLUMNS or fmt not in EXPORT_FORMATS:
+        raise Http404("Unknown export")
+
+    manuscripts, _, _, _ = _filtered_submissions(request)
+    response = streaming_response(request, stream_export(dataset, fmt, export_rows(dataset, manuscripts)),
+                                  content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="jhst-{dataset}-{timezone.now():%Y%m%d}.{fmt}"'
+    )
+    return response
+
+@login_required
+def reviewer_lookup(request):
+    """
+    JSON page of reviewers for the assignment pickers, with workload stats.
+    ?q= searches name/username/affiliation; ?manuscript= leaves out that
+    manuscript's author and already-assigned reviewers.
+    """
+    if not request.user.is_editor:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+
+    reviewers = User.objects.filter(is_reviewer=True)
+
+    manuscript_id = request.GET.get('manuscript', '')
+    if manuscript_id.isdigit():
+        manuscript = get_object_or_404(Manuscript, id=manuscript_id)
+        reviewers = reviewers.exclude(id=manuscript.author_id).exclude(
+            id__in=Review.objects.filter(manuscript=manuscript).values('reviewer_id')
+        )
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        reviewers = reviewers.filter(
+            Q(username__icontains=query) |
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(affiliation__icontains=query)
+        )
+
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    offset = (page - 1) * REVIEWER_LOOKUP_PAGE_SIZE
+
+    pending = Q(reviews__date_completed__isnull=True)
+    completed = Q(reviews__date_completed__isnull=False)
+    # One aggregate query; fetching one extra row tells us whether there is a next page.
+    rows = list(
+        reviewers.annotate(
+            pending_count=Count('reviews', filter=pending),
+            completed_count=Count('reviews', filter=completed),
+            avg_turnaround=Avg(F('reviews__date_completed') - F('reviews__date_assigned'), filter=completed),
+        )
+        .order_by('pending_count', 'username')
+        .values('id', 'username', 'first_name', 'last_name', 'affiliation',
+                'pending_count', 'completed_count', 'avg_turnaround')
+        [offset:offset + REVIEWER_LOOKUP_PAGE_SIZE + 1]
+    )
+
+    results = [
+        {
+            'id': row['id'],
+            'username': row['username'],
+            'name': f"{row['first_name']} {row['last_name']}".strip(),
+            'affiliation': row['affiliation'],
+            'pending': row['pending_count'],
+            'completed': row['completed_count'],
+            'avg_turnaround_days': (round(row['avg_turnaround'].total_seconds() / 86400, 1)
+                                    if row['avg_turnaround'] is not None else None),
+        }
+        for row in rows[:REVIEWER_LOOKUP_PAGE_SIZE]
+    ]
+    return JsonResponse({
+        'results': results,
+        'page': page,
+        'has_next': len(rows) > REVIEWER_LOOKUP_PAGE_SIZE,
     })
 
 @login_required
@@ -317,11 +467,17 @@ def submit_review(request, manuscript_id):
     manuscript = review.manuscript
     
     if request.method == 'POST':
+        first_completion = review.date_completed is None
         form = ReviewForm(request.POST, instance=review)
         if form.is_valid():
             review = form.save(commit=False)
-            review.date_completed = timezone.now()
+            # Keep the first completion time: it is the reviewer's turnaround.
+            if first_completion:
+                review.date_completed = timezone.now()
             review.save()
+            # Edits to an already-submitted review must not count twice.
+            if first_completion:
+                index_review(review)
             messages.success(request, "Your review has been submitted. Thank you!")
             return redirect('dashboard')
     else:
@@ -337,9 +493,19 @@ def make_decision(request, manuscript_id):
     if request.method == 'POST':
         decision = request.POST.get('decision')
         if decision in ['accepted', 'rejected']:
-            manuscript.status = decision
-            manuscript.save()
-            
+            with transaction.atomic():
+                previous_status = manuscript.status
+                manuscript.status = decision
+                manuscript.save(update_fields=['status'])
+                log_status_change(manuscript, previous_status, request.user)
+
+                # In-app notification for Author
+                Notification.objects.create(
+                    recipient=manuscript.author,
+                    message=f"Decision Reached: Your manuscript '{manuscript.title}' has been {decision.upper()}.",
+                    link='/dashboard/my-submissions/'
+                )
+
             # Notify Author
             _send_notification_email(
                 f"Decision on Manuscript: {manuscript.title}",
@@ -347,13 +513,6 @@ def make_decision(request, manuscript_id):
                 [manuscript.author.email]
             )
 
-            # In-app notification for Author
-            Notification.objects.create(
-                recipient=manuscript.author,
-                message=f"Decision Reached: Your manuscript '{manuscript.title}' has been {decision.upper()}.",
-                link='/dashboard/my-submissions/'
-            )
-            
             messages.success(request, f"Decision '{decision}' recorded for {manuscript.title}.")
         return redirect('dashboard')
     
@@ -367,21 +526,22 @@ def mark_as_paid(request, manuscript_id):
         return redirect('dashboard')
     
     manuscript = get_object_or_404(Manuscript, id=manuscript_id)
-    manuscript.is_paid = True
-    manuscript.save()
-    
+    with transaction.atomic():
+        manuscript.is_paid = True
+        manuscript.save(update_fields=['is_paid'])
+
+        Notification.objects.create(
+            recipient=manuscript.author,
+            message=f"Payment Confirmed: Your payment for '{manuscript.title}' has been verified.",
+            link='/dashboard/my-submissions/'
+        )
+
     _send_notification_email(
         f"Payment Confirmed: {manuscript.title}",
         f"Dear {manuscript.author.get_full_name()},\n\nWe have confirmed your payment for the manuscript '{manuscript.title}'.\nYour manuscript is now ready for publication.\n\nBest regards,\nJHST Editorial Team",
         [manuscript.author.email]
     )
 
-    Notification.objects.create(
-        recipient=manuscript.author,
-        message=f"Payment Confirmed: Your payment for '{manuscript.title}' has been verified.",
-        link='/dashboard/my-submissions/'
-    )
-    
     messages.success(request, f"Payment confirmed for {manuscript.title}.")
     return redirect('dashboard')
 
@@ -404,37 +564,211 @@ def publish_article(request, manuscript_id):
         page_end = request.POST.get('page_end')
         doi = request.POST.get('doi')
         
-        Article.objects.create(
-            manuscript=manuscript, 
-            issue=issue,
-            page_start=page_start if page_start else None,
-            page_end=page_end if page_end else None,
-            doi=doi if doi else None
-        )
+        with transaction.atomic():
+            article = Article.objects.create(
+                manuscript=manuscript,
+                issue=issue,
+                page_start=page_start if page_start else None,
+                page_end=page_end if page_end else None,
+                doi=doi if doi else None
+            )
+
+            # Update manuscript status
+            previous_status = manuscript.status
+            manuscript.status = 'published'
+            manuscript.save(update_fields=['status'])
+            log_status_change(manuscript, previous_status, request.user)
 
-        # Update manuscript status
-        manuscript.status = 'published'
-        manuscript.save()
+            # In-app notification for Author
+            Notification.objects.create(
+                recipient=manuscript.author,
+                message=f"Published: Your manuscript '{manuscript.title}' is now published in {issue}.",
+                link=f"/article/{article.id}/"
+            )
 
         # Notify Author
         _send_notification_email(
             f"Manuscript Published: {manuscript.title}",
-            f"Dear {manuscript.author.get_full_name()},\n\nWe are pleased to inform you that your manuscript '{manuscript.title}' has been published in {issue}.\nYou can view it here: {request.build_absolute_uri(f'/article/{Article.objects.get(manuscript=manuscript).id}/')}\n\nCongratulations!\nJHST Editorial Team",
+            f"Dear {manuscript.author.get_full_name()},\n\nWe are pleased to inform you that your manuscript '{manuscript.title}' has been published in {issue}.\nYou can view it here: {request.build_absolute_uri(f'/article/{article.id}/')}\n\nCongratulations!\nJHST Editorial Team",
             [manuscript.author.email]
         )
 
-        # In-app notification for Author
-        Notification.objects.create(
-            recipient=manuscript.author,
-            message=f"Published: Your manuscript '{manuscript.title}' is now published in {issue}.",
-            link=f"/article/{Article.objects.get(manuscript=manuscript).id}/"
-        )
         messages.success(request, f"Article published to {issue} successfully.")
         return redirect('dashboard')
     
     issues = Issue.objects.all()
     return render(request, 'dashboard/publish_article.html', {'manuscript': manuscript, 'issues': issues})
 
+def _bulk_selection(request):
+    """Manuscripts ticked on the editor dashboard, oldest submission first."""
+    ids = [int(i) for i in request.POST.getlist('manuscript_ids') if i.isdigit()]
+    return Manuscript.objects.filter(id__in=ids).select_related('author').order_by('submitted_date')
+
+def _bulk_redirect(request):
+    next_url = request.POST.get('next', '')
+    return redirect(next_url if next_url.startswith('/dashboard/') else 'dashboard')
+
+@login_required
+@require_POST
+def bulk_assign_reviewer(request):
+    if not request.user.is_editor:
+        return redirect('dashboard')
+
+    reviewer_id = request.POST.get('reviewer', '')
+    if not reviewer_id.isdigit():
+        return HttpResponseBadRequest("Choose a reviewer to assign.")
+    reviewer = User.objects.filter(id=reviewer_id, is_reviewer=True).first()
+    if reviewer is None:
+        raise Http404(f"No reviewer with id {reviewer_id}.")
+    due_date_str = request.POST.get('due_date')
+    if due_date_str:
+        try:
+            due_date = timezone.datetime.strptime(due_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return HttpResponseBadRequest("The due date must be written as YYYY-MM-DD.")
+    else:
+        due_date = timezone.now().date() + timezone.timedelta(days=14)
+
+    with transaction.atomic():
+        selection = list(_bulk_selection(request).exclude(author=reviewer))
+        already_assigned = set(
+            Review.objects.filter(manuscript__in=selection, reviewer=reviewer)
+            .values_list('manuscript_id', flat=True)
+        )
+        manuscripts = [m for m in selection if m.id not in already_assigned]
+
+        Review.objects.bulk_create([
+            Review(manuscript=manuscript, reviewer=reviewer, due_date=due_date)
+            for manuscript in manuscripts
+        ])
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=reviewer,
+                message=f"New Review Assignment: You have been assigned to review '{manuscript.title}'. Due in 14 days.",
+                link='/dashboard/'
+            )
+            for manuscript in manuscripts
+        ])
+
+        newly_submitted = [m for m in manuscripts if m.status == 'submitted']
+        for manuscript in newly_submitted:
+            manuscript.status = 'under_review'
+        Manuscript.objects.bulk_update(newly_submitted, ['status'])
+        log_status_changes([(manuscript, 'submitted') for manuscript in newly_submitted], request.user)
+
+    if manuscripts:
+        titles = '\n'.join(f"- {m.title}" for m in manuscripts)
+        _send_notification_emails([(
+            f"Review Invitation: {len(manuscripts)} manuscript(s)",
+            f"Dear {reviewer.get_full_name()},\n\nYou have been assigned to review the following manuscripts:\n{titles}\n\nPlease log in to the JHST dashboard to accept and complete these reviews by {due_date.strftime('%Y-%m-%d')}.\n\nBest regards,\nJHST Editorial Team",
+            [reviewer.email]
+        )])
+
+    messages.success(request, f"Reviewer {reviewer.username} assigned to {len(manuscripts)} manuscript(s).")
+    return _bulk_redirect(request)
+
+@login_required
+@require_POST
+def bulk_make_decision(request):
+    if not request.user.is_editor:
+        return redirect('dashboard')
+
+    decision = request.POST.get('decision')
+    if decision not in ['accepted', 'rejected']:
+        messages.error(request, "Choose a decision to record.")
+        return _bulk_redirect(request)
+
+    with transaction.atomic():
+        manuscripts = list(_bulk_selection(request).exclude(status__in=['published', decision]))
+        changes = [(manuscript, manuscript.status) for manuscript in manuscripts]
+        for manuscript in manuscripts:
+            manuscript.status = decision
+        Manuscript.objects.bulk_update(manuscripts, ['status'])
+        log_status_changes(changes, request.user)
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=manuscript.author,
+                message=f"Decision Reached: Your manuscript '{manuscript.title}' has been {decision.upper()}.",
+                link='/dashboard/my-submissions/'
+            )
+            for manuscript in manuscripts
+        ])
+
+    fees_url = request.build_absolute_uri('/about/publication-fees/')
+    _send_notification_emails([
+        (
+            f"Decision on Manuscript: {manuscript.title}",
+            f"Dear {manuscript.author.get_full_name()},\n\nA decision has been reached regarding your manuscript '{manuscript.title}': {decision.upper()}.\nPlease log in to your dashboard to view details and reviews.\n\nIMPORTANT: If your manuscript has been accepted, please proceed to pay the publication fee. Instructions can be found here: {fees_url}\n\nBest regards,\nJHST Editorial Team",
+            [manuscript.author.email]
+        )
+        for manuscript in manuscripts
+    ])
+
+    messages.success(request, f"Decision '{decision}' recorded for {len(manuscripts)} manuscript(s).")
+    return _bulk_redirect(request)
+
+@login_required
+@require_POST
+def bulk_publish_articles(request):
+    if not request.user.is_editor:
+        return redirect('dashboard')
+
+    issue_id = request.POST.get('issue', '')
+    if not issue_id.isdigit():
+        return HttpResponseBadRequest("Choose an issue to publish into.")
+    issue = get_object_or_404(Issue.objects.select_related('volume'), id=issue_id)
+    try:
+        pages_per_article = max(1, int(request.POST.get('pages_per_article') or 10))
+    except ValueError:
+        pages_per_article = 10
+
+    with transaction.atomic():
+        manuscripts = list(_bulk_selection(request).filter(status='accepted', article__isnull=True))
+
+        # Continue the issue's page numbering after whatever is already in it.
+        last_page = issue.articles.aggregate(last=Max('page_end'))['last'] or 0
+        articles = []
+        for manuscript in manuscripts:
+            articles.append(Article(
+                manuscript=manuscript,
+                issue=issue,
+                page_start=last_page + 1,
+                page_end=last_page + pages_per_article,
+            ))
+            last_page += pages_per_article
+        Article.objects.bulk_create(articles)
+        # bulk_create sends no post_save, so the derived data is refreshed by hand.
+        transaction.on_commit(invalidate_archive_tree)
+        mark_dirty_on_commit('articles', [article.id for article in articles])
+        transaction.on_commit(lambda: invalidate_feeds('articles'))
+        transaction.on_commit(lambda: index_published([article.id for article in articles]))
+
+        for manuscript in manuscripts:
+            manuscript.status = 'published'
+        Manuscript.objects.bulk_update(manuscripts, ['status'])
+        log_status_changes([(manuscript, 'accepted') for manuscript in manuscripts], request.user)
+
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=article.manuscript.author,
+                message=f"Published: Your manuscript '{article.manuscript.title}' is now published in {issue}.",
+                link=f"/article/{article.id}/"
+            )
+            for article in articles
+        ])
+
+    _send_notification_emails([
+        (
+            f"Manuscript Published: {article.manuscript.title}",
+            f"Dear {article.manuscript.author.get_full_name()},\n\nWe are pleased to inform you that your manuscript '{article.manuscript.title}' has been published in {issue}.\nYou can view it here: {request.build_absolute_uri(f'/article/{article.id}/')}\n\nCongratulations!\nJHST Editorial Team",
+            [article.manuscript.author.email]
+        )
+        for article in articles
+    ])
+
+    messages.success(request, f"{len(articles)} article(s) published to {issue}.")
+    return _bulk_redirect(request)
+
 @login_required
 def dashboard_manuscript_detail(request, manuscript_id):
     if not request.user.is_editor: # Restrict to editor for now as per "action buttons" context
@@ -446,6 +780,8 @@ def dashboard_manuscript_detail(request, manuscript_id):
     return render(request, 'dashboard/manuscript_detail.html', {
         'manuscript': manuscript,
         'reviews': reviews,
+        'similarity_flags': flags_for(manuscript),
+        'screened': hasattr(manuscript, 'signature'),
     })
 
 @login_required
@@ -483,8 +819,7 @@ def manage_volumes(request):
     if not request.user.is_editor:
         return redirect('dashboard')
     
-    volumes = Volume.objects.prefetch_related('issues__articles').order_by('-year', '-number')
-    return render(request, 'dashboard/manage_volumes.html', {'volumes': volumes})
+    return render(request, 'dashboard/manage_volumes.html', {'volumes': get_archive_tree()})
 
 @login_required
 def manage_issue(request, issue_id):
@@ -492,40 +827,121 @@ def manage_issue(request, issue_id):
         return redirect('dashboard')
     
     issue = get_object_or_404(Issue, id=issue_id)
-    return render(request, 'dashboard/manage_issue.html', {'issue': issue})
+    return render(request, 'dashboard/manage_issue.html', {'issue': issue, 'doi_prefix': settings.DOI_PREFIX})
 
-def index(request):
-    latest_issues = Issue.objects.all().order_by('-publication_date')[:5]
-    return render(request, 'journal/index.html', {'latest_issues': latest_issues})
+@login_required
+def export_issue_metadata(request, issue_id):
+    if not request.user.is_editor:
+        return redirect('dashboard')
 
-def issue_detail(request, issue_id):
-    issue = get_object_or_404(Issue, id=issue_id)
-    return render(request, 'journal/issue_detail.html', {'issue': issue})
+    issue = get_object_or_404(Issue.objects.select_related('volume'), id=issue_id)
+    fmt = request.GET.get('format', 'crossref')
+    if fmt not in METADATA_FORMATS:
+        raise Http404("Unknown metadata format")
+    response = streaming_response(request, export_issue(issue, fmt), content_type=METADATA_FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="jhst-v{issue.volume.number}-i{issue.number}-{fmt}.xml"'
+    )
+    return response
 
-def article_detail(request, article_id):
-    article = get_object_or_404(Article, id=article_id)
-    return render(request, 'journal/article_detail.html', {'article': article})
+@login_required
+@require_POST
+def assign_issue_dois(request, issue_id):
+    if not request.user.is_editor:
+        return redirect('dashboard')
 
-def search(request):
+    issue = get_object_or_404(Issue.objects.select_related('volume'), id=issue_id)
+    try:
+        assigned = assign_dois(issue)
+    except (ValueError, DOIConflict) as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f"Assigned {assigned} DOI(s) in {issue}.")
+    return redirect('manage_issue', issue_id=issue.id)
+
+# The high-traffic public pages below are async views. They fetch everything
+# their templates show with the async ORM up front, then render in a thread
+# (templates and context processors are sync), so under ASGI a slow client or
+# a crawler burst doesn't hold a worker.
+_arender = sync_to_async(render)
+
+def _issues_with_articles():
+    return Issue.objects.select_related('volume').prefetch_related(
+        Prefetch('articles', queryset=Article.objects.select_related('manuscript__author')))
+
+async def index(request):
+    latest_issues = [issue async for issue in _issues_with_articles().order_by('-publication_date')[:5]]
+    return await _arender(request, 'journal/index.html', {'latest_issues': latest_issues})
+
+async def issue_detail(request, issue_id):
+    issue = await aget_object_or_404(_issues_with_articles(), id=issue_id)
+    return await _arender(request, 'journal/issue_detail.html', {'issue': issue})
+
+async def article_detail(request, article_id):
+    article = await aget_object_or_404(Article.objects.select_related('manuscript__author', 'issue__volume'),
+                                       id=article_id)
+    await stats.arecord(request, article.id, 'views')
+    return await _arender(request, 'journal/article_detail.html', {
+        'article': article,
+        'related_articles': await arelated_articles(article),
+    })
+
+def article_download(request, article_id):
+    article = get_object_or_404(Article.objects.select_related('manuscript'), id=article_id)
+    if not article.manuscript.file:
+        raise Http404("This article has no file.")
+    stats.record(request, article.id, 'downloads')
+    # The file itself is still served as static media.
+    return redirect(article.manuscript.file.url)
+
+def metrics(request):
+    return render(request, 'journal/metrics.html', {
+        'usage': stats.usage_summary(),
+        'editorial': editorial_summary()['last_12_months'],
+    })
+
+async def search(request):
     query = request.GET.get('q')
     results = []
     if query:
-        results = Article.objects.filter(
+        matches = Article.objects.filter(
             Q(manuscript__title__icontains=query) | 
             Q(manuscript__abstract__icontains=query) |
             Q(manuscript__keywords__icontains=query) |
             Q(manuscript__author__username__icontains=query) |
             Q(manuscript__author__first_name__icontains=query) |
             Q(manuscript__author__last_name__icontains=query)
-        )
-    return render(request, 'journal/search_results.html', {'results': results, 'query': query})
-def archives(request):
-    volumes = Volume.objects.prefetch_related('issues').order_by('-year', '-number')
-    return render(request, 'journal/archives.html', {'volumes': volumes})
-
-def current_issue(request):
-    issue = Issue.objects.order_by('-publication_date').first()
-    return render(request, 'journal/current_issue.html', {'issue': issue})
+        ).select_related('manuscript__author', 'issue__volume')
+        results = [article async for article in matches]
+    return await _arender(request, 'journal/search_results.html', {'results': results, 'query': query})
+
+async def archives(request):
+    return await _arender(request, 'journal/archives.html', {'volumes': await aget_archive_tree()})
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def oai_pmh(request):
+    # Harvesters may use either method; POST carries the same form-encoded arguments.
+    return oai.respond(request, request.GET if request.method == 'GET' else request.POST)
+
+def syndication_feed(request, kind, fmt):
+    if kind not in FEEDS or fmt not in FEED_FORMATS:
+        raise Http404("No such feed")
+    return feed_response(request, kind, fmt)
+
+def sitemap_index(request):
+    return sitemap_file(request, INDEX_FILENAME)
+
+def sitemap_file(request, filename):
+    # Pre-built by build_sitemaps; the front-end server can serve SITEMAP_ROOT directly instead.
+    path = os.path.join(settings.SITEMAP_ROOT, os.path.basename(filename))
+    if not os.path.isfile(path):
+        raise Http404("Sitemap not built yet")
+    return FileResponse(open(path, 'rb'))
+
+async def current_issue(request):
+    issue = await _issues_with_articles().order_by('-publication_date').afirst()
+    return await _arender(request, 'journal/current_issue.html', {'issue': issue})
 
 @login_required
 def mark_notification_read(request, notification_id):
@@ -534,20 +950,24 @@ def mark_notification_read(request, notification_id):
     notification.save()
     return redirect(request.META.get('HTTP_REFERER', 'dashboard'))
 
-def announcements(request):
+def _announcements_page(page):
     announcements_list = Announcement.objects.filter(is_active=True).order_by('-date_created')
     
     # Pagination
     paginator = Paginator(announcements_list, 5) # 5 per page
-    page = request.GET.get('page')
     try:
         announcements = paginator.page(page)
     except PageNotAnInteger:
         announcements = paginator.page(1)
     except EmptyPage:
         announcements = paginator.page(paginator.num_pages)
-        
-    return render(request, 'journal/announcements.html', {'announcements': announcements})
+    announcements.object_list = list(announcements.object_list)
+    return announcements
+
+async def announcements(request):
+    # Paginator is sync-only: count and page are fetched together in one thread hop.
+    announcements = await sync_to_async(_announcements_page)(request.GET.get('page'))
+    return await _arender(request, 'journal/announcements.html', {'announcements': announcements})
 
 def announcement_detail(request, announcement_id):
     announcement = get_object_or_404(Announcement, id=announcement_id)
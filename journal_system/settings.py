@@ -39,6 +39,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "journal.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "journal_system.urls"
@@ -66,9 +67,103 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep each Passenger worker's connection open between requests instead
+        # of reopening the file (and re-running the pragmas) every time.
+        "CONN_MAX_AGE": int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Seconds to wait for a lock before raising "database is locked".
+            "timeout": 20,
+            # atomic() blocks take the write lock up front, so concurrent
+            # writers queue on the busy timeout instead of deadlocking when a
+            # read transaction tries to upgrade. Only atomic() blocks are
+            # affected: reads run in autocommit, and every atomic() in the
+            # app writes (the admin's change forms are the one exception).
+            # `manage.py sqlite_stress` measures the mode on its own.
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# Set by journal_system/asgi.py. WhiteNoise is sync-only: under ASGI Django
+# would run every request through it in a thread, capping concurrency at the
+# thread pool. There the front-end server serves STATIC_ROOT instead.
+# Persistent connections are per thread, and async views run their queries
+# on whichever pool thread is free, so connections would pile up unclosed
+# instead of being reused: close each one at the end of its request.
+if os.environ.get("JHST_ASGI"):
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Optional read replica for anonymous public browsing. JHST_READ_REPLICA is
+# the path of the snapshot written by `manage.py refresh_replica`; leave it
+# unset and every query goes to the primary as before.
+READ_REPLICA_PATH = os.environ.get('JHST_READ_REPLICA')
+REPLICA_DATABASE = "replica"
+if READ_REPLICA_PATH:
+    DATABASES[REPLICA_DATABASE] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{READ_REPLICA_PATH}?mode=ro",
+        # refresh_replica swaps the file atomically; reconnecting per request
+        # is what picks up the new snapshot.
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {"timeout": 5},
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["journal.routers.ReplicaRouter"]
+REPLICA_VIEWS = [
+    'index', 'archives', 'current_issue', 'issue_detail', 'article_detail',
+    'search', 'announcements', 'announcement_detail', 'article_download', 'metrics',
+    'api_articles', 'api_article_detail', 'api_issues', 'api_issue_detail', 'api_volumes', 'api_search',
+]
+# After a POST, keep that client on the primary long enough to read its own write.
+REPLICA_STICKY_SECONDS = 30
+
+# Per-connection SQLite pragmas, applied by journal.db.configure_sqlite.
+# JHST_SQLITE_PROFILE=default leaves SQLite's built-in behaviour untouched.
+SQLITE_PROFILES = {
+    "production": {
+        "journal_mode": "WAL",          # readers no longer block on a writer
+        "synchronous": "NORMAL",        # durable at checkpoints; safe with WAL
+        "busy_timeout": 20000,          # ms, matches OPTIONS["timeout"]
+        "mmap_size": 268435456,         # 256 MiB of memory-mapped reads
+        "cache_size": -65536,           # 64 MiB page cache per connection
+        "temp_store": "MEMORY",
+    },
+    "default": {},
+}
+SQLITE_PRAGMAS = SQLITE_PROFILES[os.environ.get('JHST_SQLITE_PROFILE', 'production')]
+
+# Shared by every worker process (the archive tree, feeds, sessions and the
+# user cache must agree across workers) without running a cache server: a
+# SQLite file of its own, see journal.cache_backend. Cache values through
+# journal.caching.get_or_compute.
+CACHES = {
+    "default": {
+        "BACKEND": "journal.cache_backend.SQLiteCache",
+        "LOCATION": os.path.join(os.environ.get('JHST_CACHE_DIR', os.path.join(BASE_DIR, 'cache')), 'cache.sqlite3'),
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    }
+}
+
+# JHST_SESSION_PROFILE picks where sessions live:
+#   cached_db      - read from the cache, written through to the database (default)
+#   signed_cookies - nothing stored server-side; the session is a signed cookie
+#   db             - Django's default, one database read per request
+SESSION_PROFILES = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}
+SESSION_ENGINE = SESSION_PROFILES[os.environ.get('JHST_SESSION_PROFILE', 'cached_db')]
+# Expired sessions are removed by the nightly `manage.py clearsessions` cron.
+SESSION_COOKIE_AGE = 60 * 60 * 24 * 14
+
+# The logged-in user is cached (journal.backends) so authenticated requests
+# don't query the user table; journal.signals drops the entry on any save.
+AUTHENTICATION_BACKENDS = ["journal.backends.CachedModelBackend"]
+USER_CACHE_SECONDS = 60 * 60
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     { "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator", },
@@ -98,4 +193,49 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = 'journal.User'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
-LOGOUT_REDIRECT_URL = 'index'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'index'
+
+# Reviewer recommendations divide the expertise score by
+# (1 + REVIEWER_LOAD_PENALTY * open reviews).
+REVIEWER_LOAD_PENALTY = 0.25
+
+# review_deadlines: remind reviewers this many days before a review is due,
+# and escalate to the editors once it is this many days overdue.
+REVIEW_REMINDER_DAYS = int(os.environ.get('JHST_REVIEW_REMINDER_DAYS', 3))
+REVIEW_ESCALATION_DAYS = int(os.environ.get('JHST_REVIEW_ESCALATION_DAYS', 7))
+
+JOURNAL_NAME = 'Journal of Hydrocarbon Science and Technology'
+JOURNAL_CONTACT_EMAIL = os.environ.get('JHST_CONTACT_EMAIL', 'editor@jhst.org')
+
+# OAI-PMH provider (journal.oai): identifiers are oai:<identifier>:article/<id>.
+OAI_REPOSITORY_IDENTIFIER = 'jhst.org'
+OAI_PAGE_SIZE = 100
+
+# Absolute URLs in files generated outside a request (sitemaps, feeds, exports).
+SITE_URL = os.environ.get('JHST_SITE_URL', 'https://jhst.org')
+
+# Written by `manage.py build_sitemaps`; served by the sitemap views or directly by Apache.
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_SHARD_SIZE = 50000
+
+# DOI assignment for issue exports (journal.metadata_export). Leave the prefix
+# unset until the journal has its Crossref prefix.
+DOI_PREFIX = os.environ.get('JHST_DOI_PREFIX', '')
+DOI_PATTERN = '{prefix}/jhst.v{volume}i{issue}.{article}'
+JOURNAL_ISSN = os.environ.get('JHST_ISSN', '')
+
+# Cache-Control max-age for the public JSON API (journal.api).
+API_CACHE_SECONDS = 300
+
+# journal.stats writes buffered article view/download counts at most this often per worker.
+STATS_FLUSH_SECONDS = int(os.environ.get('JHST_STATS_FLUSH_SECONDS', 60))
+
+# Near-duplicate screening (journal.similarity): pairs whose estimated overlap
+# of word 5-grams reaches this are flagged to the editors.
+SIMILARITY_THRESHOLD = 0.5
+# Processes per web worker computing signatures of new submissions.
+SIMILARITY_WORKERS = int(os.environ.get('JHST_SIMILARITY_WORKERS', 1))
+
+# TF-IDF matrix behind the related-article lists (journal.related). Written by
+# `manage.py build_related_articles` and extended as articles are published.
+RELATED_INDEX_PATH = os.path.join(BASE_DIR, 'related_index.npz')